@@ -10,20 +10,28 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 import json
+import mmap
+import multiprocessing
 import os
 import tkinter as tk
 from datetime import datetime, timedelta
 from tkinter import filedialog, messagebox, ttk
 
 import pytz
-import requests
-from bs4 import BeautifulSoup
 from PIL import Image, ImageTk
 
 from eigene_truppen_parser import EigeneTruppenParser
-from sos_parser import SosParser
+from sos_parser import SosParser, SosParseStand
 from tab_matching import TabMatching
+from inkrementeller_planer import InkrementellerPlaner
+from zeitfenster_index import WOCHENTAGE, ZeitplanRegel
 from support_parser import SupportParser
+from parse_cache import ParseCache
+from tab_kapazitaet import TabKapazitaet
+from einheiten import UnitRegistry
+from welt_vorlader import WeltVorlader, wenn_fertig
+import dorf_daten
+import zeit
 from bisect import bisect_left
 from collections import Counter
 
@@ -44,30 +52,54 @@ class StammGUI:
         ANWENDER_PFAD = os.path.dirname(os.path.abspath(__file__))
 
     VERLAUF_DATEI = os.path.join(ANWENDER_PFAD, "tabverlauf.json")
+    ZEITPLAN_DATEI = os.path.join(ANWENDER_PFAD, "zeitplaene.json")
     CONFIG_DATEI = os.path.join(ANWENDER_PFAD, "config.json")
+    CACHE_VERZEICHNIS = os.path.join(ANWENDER_PFAD, "cache")
 
     def __init__(self, root):
         self.tk_root = root
         self.tk_root.title(f"Die Stämme Tab-Tool {version} by {author}")
+        dorf_daten.CACHE_VERZEICHNIS = self.CACHE_VERZEICHNIS
 
         self.matches = []
         self.tabgroessen_liste = []
         self.export_button = None
         self.welt_speed = 1.0
         self.einheiten_speed = 1.0
+        # Einheiten der Welt (Laufzeiten aus unit_info), bis die Welteinstellungen geladen sind Standard
+        self.einheiten_register = UnitRegistry.standard()
         self.welt_id = ""
         self.boost_level = 0
         self.zeitfenster_liste = []
+        self.zeitfenster_regeln: list[ZeitplanRegel] = []
         self.zeitfenster_tree = None 
         self.tab_config_display: tk.Listbox | None = None
         self.support_filter_enabled = True
         self.min_send_interval_seconds = 0
+        self.matching_modus = "greedy"
+        self.parallel_enabled = False
+        self.planer: InkrementellerPlaner | None = None
+        self.aktualisieren_button = None
+        self._geplante_angriffe = []
+        self._geplante_truppen = {}
+        # Aus Datei geladene Eingaben: Feld -> (Hinweistext im Feld, geparste Datensätze, Pfad)
+        self.datei_eingaben = {}
+        # Bereits geparster Anfang des SOS-Felds: beim Anhängen wird nur der neue Teil geparst
+        self.sos_parse_stand = SosParseStand()
+        # Parse-Ergebnisse aller Eingabefelder, damit derselbe Text nur einmal geparst wird
+        self.parse_cache = ParseCache()
+        # Welteinstellungen und Dorfdaten der Welt werden im Hintergrund geladen
+        self.vorlader = WeltVorlader()
+        self._wartet_auf_vorladen = False
 
         self.build_gui()
         self.lade_tabverlauf()
+        self.lade_zeitplaene()
         self.dsu_api_key = ""
         self.archer_enabled = False
         self.lade_config()
+        if self.welt_id:
+            self.vorlader.starten(self.welt_id)
 
     def build_gui(self):
         self.text_fields = {}
@@ -115,6 +147,12 @@ class StammGUI:
             result_label = ttk.Label(self.tk_root, text="", foreground="blue", wraplength=500, justify="left", font=("Segoe UI", 9))
             result_label.grid(row=row_offset + 1, column=1, sticky="w", padx=5, pady=(0, 8))
             self.result_labels[label] = result_label
+
+            # Große Exporte direkt aus der Datei lesen statt sie ins Textfeld einzufügen
+            if label in ("SOS Anfrage", "Eigene Truppen"):
+                ttk.Button(
+                    self.tk_root, text="Aus Datei...", command=lambda lbl=label: self.lade_aus_datei(lbl)
+                ).grid(row=row_offset + 1, column=0, sticky="nw", padx=5, pady=(0, 8))
             
             # Event-Handler für Texteingabe
             text.bind("<KeyRelease>", lambda e, lbl=label: self.aktualisiere_parse_ergebnis(lbl))
@@ -163,6 +201,24 @@ class StammGUI:
             command=self._on_support_filter_change
         ).grid(row=6, column=2, columnspan=2, sticky="w", padx=5, pady=(0, 2))
 
+        # Globale Zuordnung statt Greedy (maximiert abgedeckte Angriffe)
+        self.global_modus_var = tk.BooleanVar(value=self.matching_modus == "global")
+        ttk.Checkbutton(
+            self.tk_root,
+            text="Globale Zuordnung (max. Abdeckung)",
+            variable=self.global_modus_var,
+            command=self._on_matching_modus_change
+        ).grid(row=3, column=2, columnspan=2, sticky="w", padx=5, pady=(0, 2))
+
+        # Kandidatensuche auf alle CPU-Kerne verteilen (nur Greedy, Ergebnis identisch)
+        self.parallel_var = tk.BooleanVar(value=self.parallel_enabled)
+        ttk.Checkbutton(
+            self.tk_root,
+            text="Alle CPU-Kerne nutzen",
+            variable=self.parallel_var,
+            command=self._on_parallel_change
+        ).grid(row=1, column=2, columnspan=2, sticky="w", padx=5, pady=(0, 2))
+
         self.einheiten = {
             "Speerträger": "unit_spear.webp",
             "Schwertkämpfer": "unit_sword.webp",
@@ -298,9 +354,15 @@ class StammGUI:
             command=self.zeitfenster_hinzufuegen
         ).grid(row=0, column=8, padx=(10, 10), ipadx=10, sticky="e")
 
+        ttk.Button(
+            bottom_frame,
+            text="Wiederkehrend...",
+            command=self.zeitplan_popup
+        ).grid(row=0, column=9, padx=(0, 10), ipadx=10, sticky="e")
+
         # --- Liste (row 1) ---
         tree_frame = ttk.Frame(bottom_frame)
-        tree_frame.grid(row=1, column=0, columnspan=9, sticky="nsew", padx=5, pady=(10, 5))
+        tree_frame.grid(row=1, column=0, columnspan=10, sticky="nsew", padx=5, pady=(10, 5))
         tree_frame.columnconfigure(0, weight=1)
         tree_frame.rowconfigure(0, weight=1)
 
@@ -324,7 +386,7 @@ class StammGUI:
 
         # --- Button-Leiste (row 2) ---
         action_frame = ttk.Frame(bottom_frame)
-        action_frame.grid(row=2, column=0, columnspan=9, sticky="ew", padx=5, pady=(5, 8))
+        action_frame.grid(row=2, column=0, columnspan=10, sticky="ew", padx=5, pady=(5, 8))
         action_frame.columnconfigure(0, weight=1)
 
         # links
@@ -349,6 +411,11 @@ class StammGUI:
             side="left", padx=(0, 8), ipadx=25, ipady=6
         )
 
+        self.aktualisieren_button = ttk.Button(
+            right_btns, text="Aktualisieren", command=self.aktualisiere_tabs, state="disabled"
+        )
+        self.aktualisieren_button.pack(side="left", padx=(0, 8), ipadx=20, ipady=6)
+
         self.export_button = ttk.Button(right_btns, text="Exportieren", command=self.exportiere, state="disabled")
         self.export_button.pack(side="left", ipadx=20, ipady=6)
 
@@ -359,12 +426,23 @@ class StammGUI:
         if welt_id.isdigit():
             self.welt_id = welt_id
             self.speichere_config()
+            self.vorlader.starten(welt_id)
 
     def _on_support_filter_change(self):
         """Speichert Support-Filter Einstellung"""
         self.support_filter_enabled = self.support_filter_var.get()
         self.speichere_config()
 
+    def _on_matching_modus_change(self):
+        """Speichert den Matching-Modus (greedy/global)"""
+        self.matching_modus = "global" if self.global_modus_var.get() else "greedy"
+        self.speichere_config()
+
+    def _on_parallel_change(self):
+        """Speichert, ob die Berechnung mehrere Prozesse nutzen darf"""
+        self.parallel_enabled = self.parallel_var.get()
+        self.speichere_config()
+
     def _on_min_interval_change(self, event=None):
         """Speichert Mindestabstand zwischen Tabs"""
         try:
@@ -388,7 +466,7 @@ class StammGUI:
         
         try:
             if label == "SOS Anfrage":
-                angriffe = SosParser.parse(eingabe)
+                angriffe = self._geparste_eingabe(label)
                 if angriffe:
                     result_label.config(
                         text=f"✓ {len(angriffe)} Angriff(e) erkannt",
@@ -398,7 +476,7 @@ class StammGUI:
                     result_label.config(text="Keine Angriffe erkannt", foreground="orange")
                     
             elif label == "Eigene Truppen":
-                eigene_dörfer = EigeneTruppenParser.parse(eingabe)
+                eigene_dörfer = self._geparste_eingabe(label)
                 if eigene_dörfer:
                     gesamt_truppen = sum(
                         sum(dorf.truppen.values()) 
@@ -412,7 +490,7 @@ class StammGUI:
                     result_label.config(text="Keine Truppen erkannt", foreground="orange")
                     
             elif label == "Unterstützungen":
-                supports = SupportParser.parse(eingabe)
+                supports = self._geparste_eingabe(label)
                 if supports:
                     result_label.config(
                         text=f"✓ {len(supports)} Unterstützung(en) erkannt",
@@ -425,6 +503,71 @@ class StammGUI:
             result_label.config(text=f"⚠ Fehler beim Parsen: {str(e)}", foreground="red")
 
 
+    def lade_aus_datei(self, label):
+        """
+        Liest einen (ggf. sehr großen) SOS- bzw. Truppen-Export per mmap zeilenweise ein, ohne ihn
+        ins Textfeld zu kopieren. Das Feld zeigt nur einen Hinweis; wird es bearbeitet, gilt wieder der Text.
+        """
+        pfad = filedialog.askopenfilename(
+            title=f"{label} aus Datei laden",
+            filetypes=[("Textdateien", "*.txt"), ("Alle Dateien", "*.*")]
+        )
+        if pfad:
+            self._lies_datei(label, pfad)
+
+    def _lies_datei(self, label, pfad):
+        try:
+            with open(pfad, "rb") as datei:
+                if os.fstat(datei.fileno()).st_size == 0:
+                    daten = []
+                else:
+                    with mmap.mmap(datei.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        daten = list(self._parse_quelle(label, mm))
+        except OSError as e:
+            messagebox.showerror("Datei laden", f"Datei konnte nicht gelesen werden:\n{e}")
+            return
+
+        hinweis = f"[Datei] {os.path.basename(pfad)}"
+        self.datei_eingaben[label] = (hinweis, daten, pfad)
+        text_widget = self.text_fields[label]
+        text_widget.delete("1.0", "end")
+        text_widget.insert("1.0", hinweis)
+        text_widget.config(foreground="black")
+        print(f"[INFO] {len(daten)} Einträge aus {pfad} gelesen")
+
+        if label == "Eigene Truppen":
+            self._on_truppen_change(label)
+        else:
+            self.aktualisiere_parse_ergebnis(label)
+
+    def _geparste_eingabe(self, label):
+        """Geparste Datensätze eines Eingabefelds: aus der geladenen Datei oder aus dem Text im Feld."""
+        text = self.text_fields[label].get("1.0", "end").strip()
+        datei = self.datei_eingaben.get(label)
+        if datei and text == datei[0]:
+            return datei[1]
+        # Feld wurde bearbeitet -> Datei verwerfen
+        self.datei_eingaben.pop(label, None)
+        if not text:
+            return []
+        if label == "SOS Anfrage":
+            return self.parse_cache.parse(
+                SosParser, text, lambda t: SosParser.parse_fortsetzen(self.sos_parse_stand, t)
+            )
+        if label == "Eigene Truppen":
+            return self.parse_cache.parse(
+                EigeneTruppenParser, text,
+                lambda t: EigeneTruppenParser.parse(t, bogenschuetzen=self.archer_enabled), self.archer_enabled
+            )
+        # "heute"/"morgen" ohne Serverzeit beziehen sich auf das aktuelle Datum
+        heute = zeit.als_berlin(zeit.jetzt_ms()).date()
+        return self.parse_cache.parse(SupportParser, text, SupportParser.parse, heute)
+
+    def _parse_quelle(self, label, quelle):
+        if label == "SOS Anfrage":
+            return SosParser.iter_parse(quelle)
+        return EigeneTruppenParser.iter_parse(quelle, bogenschuetzen=self.archer_enabled)
+
     def _on_truppen_change(self, label):
         """Wird aufgerufen wenn sich die Eigene Truppen ändern"""
         self.aktualisiere_parse_ergebnis(label)
@@ -435,16 +578,22 @@ class StammGUI:
         if not self.tab_config_display:
             return
         
-        # Alle Einträge neu aufbauen
+        # Alle Einträge neu aufbauen, Kapazitäten aller Kombinationen in einem Schritt
         self.tab_config_display.delete(0, tk.END)
-        for kombi in self.tabgroessen_liste:
-            beschreibung = [f"{menge}x {einheit}" for einheit, menge in kombi.items()]
-            
-            # Berechne mögliche Tabs
-            anzahl_tabs = self._berechne_moegliche_tabs(kombi)
-            tabs_info = f" → {anzahl_tabs} Tab(s) möglich" if anzahl_tabs is not None else ""
-            
-            self.tab_config_display.insert(tk.END, ", ".join(beschreibung) + tabs_info)
+        kapazitaeten = self._berechne_moegliche_tabs(self.tabgroessen_liste)
+        self.tab_config_display.insert(tk.END, *(
+            self._tab_kombi_text(kombi, kapazitaeten[i] if kapazitaeten else None)
+            for i, kombi in enumerate(self.tabgroessen_liste)
+        ))
+
+    def _tab_kombi_text(self, kombi, kapazitaet):
+        beschreibung = ", ".join(f"{menge}x {einheit}" for einheit, menge in kombi.items())
+        if kapazitaet is None:
+            return beschreibung
+        tabs_info = f" → {kapazitaet.tabs} Tab(s) möglich"
+        if kapazitaet.engpass:
+            tabs_info += f" (Engpass: {kapazitaet.engpass})"
+        return beschreibung + tabs_info
 
 
     def zeige_kontakt_fenster(self):
@@ -538,11 +687,21 @@ class StammGUI:
                 self.archer_enabled = bool(cfg.get("archer_enabled", False))
                 self.support_filter_enabled = bool(cfg.get("support_filter_enabled", True))
                 self.min_send_interval_seconds = int(cfg.get("min_send_interval_seconds", 0))
+                self.matching_modus = cfg.get("matching_modus", "greedy")
+                if self.matching_modus not in ("greedy", "global"):
+                    self.matching_modus = "greedy"
+                self.parallel_enabled = bool(cfg.get("parallel_enabled", False))
                 
                 # Support-Filter Checkbox aktualisieren
                 if hasattr(self, 'support_filter_var'):
                     self.support_filter_var.set(self.support_filter_enabled)
                 
+                if hasattr(self, 'global_modus_var'):
+                    self.global_modus_var.set(self.matching_modus == "global")
+
+                if hasattr(self, 'parallel_var'):
+                    self.parallel_var.set(self.parallel_enabled)
+
                 # Min Send Interval aktualisieren
                 if hasattr(self, 'min_send_interval_entry'):
                     self.min_send_interval_entry.delete(0, tk.END)
@@ -565,6 +724,8 @@ class StammGUI:
                 "welt_id": self.welt_id,
                 "support_filter_enabled": self.support_filter_enabled,
                 "min_send_interval_seconds": self.min_send_interval_seconds,
+                "matching_modus": self.matching_modus,
+                "parallel_enabled": self.parallel_enabled,
             }
             with open(self.CONFIG_DATEI, "w", encoding="utf-8") as f:
                 json.dump(cfg, f, ensure_ascii=False, indent=2)
@@ -639,6 +800,12 @@ class StammGUI:
         def set_archer():
             self.archer_enabled = bool(archer_var.get())
             self.speichere_config()
+            # Truppenspalten haben sich verschoben -> neu einlesen
+            datei = self.datei_eingaben.get("Eigene Truppen")
+            if datei:
+                self._lies_datei("Eigene Truppen", datei[2])
+            else:
+                self._on_truppen_change("Eigene Truppen")
 
         ttk.Checkbutton(
             container,
@@ -649,7 +816,7 @@ class StammGUI:
 
         ttk.Label(
             container,
-            text="Hinweis: Diese Option ist noch nicht final und kann sich im Verhalten ändern, stand jetzt tut sie gar nichts und Bogenschützen werden nicht unterstützt",
+            text="Hinweis: Diese Option ist noch nicht final und kann sich im Verhalten ändern. Stand jetzt werden nur die Bogenschützen-Spalten der Truppenübersicht eingelesen, im Matching werden Bogenschützen nicht unterstützt",
             wraplength=490
         ).grid(row=6, column=0, columnspan=3, sticky="w", pady=(4, 0))
 
@@ -658,10 +825,7 @@ class StammGUI:
         container.columnconfigure(0, weight=1)
 
     def _angriff_key(self, a):
-        return (a.ziel_koord, a.ankunftszeit)
-
-    def _match_key(self, m):
-        return (m.ziel_koord, m.ankunftszeit)
+        return (a.ziel_koord, a.ankunft_ms)
 
     def zeige_berechnung_report(self, original_angriffe, gefiltert_angriffe, verwendete_angriffe, matches, unmatched):
         popup = tk.Toplevel(self.tk_root)
@@ -707,7 +871,7 @@ class StammGUI:
         
         # Export-Text generieren und einfügen
         try:
-            export_text = TabMatching.export_dsultimate(matches, self.welt_id)
+            export_text = TabMatching.export_dsultimate(matches, self.welt_id, self.einheiten_register)
             export_text_widget.insert("1.0", export_text)
         except Exception as e:
             export_text_widget.insert("1.0", f"Fehler beim Generieren des Export-Textes: {e}")
@@ -750,7 +914,7 @@ class StammGUI:
 
         def kopiere_export():
             try:
-                export_text = TabMatching.export_dsultimate(matches, self.welt_id)
+                export_text = TabMatching.export_dsultimate(matches, self.welt_id, self.einheiten_register)
                 self._copy_to_clipboard(export_text)
             except Exception as e:
                 print(f"Fehler beim Kopieren: {e}")
@@ -767,52 +931,30 @@ class StammGUI:
 
     def tab_kombi_hinzufuegen(self):
         kombi = {}
-        beschreibung = []
         for name, entry in self.entry_fields.items():
             if self.checkbox_vars[name].get():
                 try:
                     menge = int(entry.get())
                     if menge > 0:
                         kombi[name] = menge
-                        beschreibung.append(f"{menge}x {name}")
                 except ValueError:
                     continue
         if kombi:
             # Berechne wie viele Tabs möglich sind
-            anzahl_tabs = self._berechne_moegliche_tabs(kombi)
-            tabs_info = f" → {anzahl_tabs} Tab(s) möglich" if anzahl_tabs is not None else ""
+            kapazitaeten = self._berechne_moegliche_tabs([kombi])
             
             self.tabgroessen_liste.append(kombi)
             if self.tab_config_display:
-                self.tab_config_display.insert(tk.END, ", ".join(beschreibung) + tabs_info)
+                self.tab_config_display.insert(tk.END, self._tab_kombi_text(kombi, kapazitaeten and kapazitaeten[0]))
             self.speichere_tabverlauf()
 
-    def _berechne_moegliche_tabs(self, kombi):
-        """Berechnet wie viele Tabs mit dieser Kombination möglich sind"""
+    def _berechne_moegliche_tabs(self, kombis):
+        """Berechnet für alle Kombinationen auf einmal, wie viele Tabs möglich sind (None ohne Truppen)"""
         try:
-            truppen_text = self.text_fields["Eigene Truppen"].get("1.0", "end").strip()
-            if not truppen_text:
-                return None
-            
-            eigene_dörfer = EigeneTruppenParser.parse(truppen_text)
+            eigene_dörfer = self._geparste_eingabe("Eigene Truppen")
             if not eigene_dörfer:
                 return None
-            
-            # Für jedes Dorf einzeln berechnen, wie viele Tabs möglich sind
-            gesamt_tabs = 0
-            for dorf in eigene_dörfer:
-                # Für jede Einheit in der Kombination prüfen, wie oft sie gesendet werden kann
-                max_tabs_dorf = float('inf')
-                for einheit, benötigt in kombi.items():
-                    vorhanden = dorf.truppen.get(einheit, 0)
-                    if benötigt > 0:
-                        tabs_für_einheit = vorhanden // benötigt
-                        max_tabs_dorf = min(max_tabs_dorf, tabs_für_einheit)
-                
-                if max_tabs_dorf != float('inf'):
-                    gesamt_tabs += max_tabs_dorf
-            
-            return int(gesamt_tabs)
+            return TabKapazitaet.berechne(eigene_dörfer, kombis)
         except Exception as e:
             print(f"Fehler beim Berechnen der möglichen Tabs: {e}")
             return None
@@ -837,15 +979,9 @@ class StammGUI:
             if os.path.exists(self.VERLAUF_DATEI):
                 with open(self.VERLAUF_DATEI, "r", encoding="utf-8") as f:
                     daten = json.load(f)
-                    for kombi in daten:
-                        self.tabgroessen_liste.append(kombi)
-                        beschreibung = [f"{menge}x {einheit}" for einheit, menge in kombi.items()]
-                        
-                        # Berechne mögliche Tabs auch beim Laden
-                        anzahl_tabs = self._berechne_moegliche_tabs(kombi)
-                        tabs_info = f" → {anzahl_tabs} Tab(s) möglich" if anzahl_tabs is not None else ""
-                        
-                        self.tab_config_display.insert(tk.END, ", ".join(beschreibung) + tabs_info)
+                    self.tabgroessen_liste.extend(daten)
+                    # Berechne mögliche Tabs auch beim Laden
+                    self._aktualisiere_tab_anzeige()
         except Exception as e:
             print(f"Fehler beim Laden des Verlaufs: {e}")
 
@@ -891,6 +1027,14 @@ class StammGUI:
                 values=(self._format_dt_mit_sekunden(von_dt), self._format_dt_mit_sekunden(bis_dt))
             )
 
+        # Wiederkehrende Regeln mit eigenem iid-Präfix
+        for idx, regel in enumerate(self.zeitfenster_regeln):
+            self.zeitfenster_tree.insert(
+                "", "end",
+                iid=f"r{idx}",
+                values=(f"{regel.beschreibung()} (wiederkehrend)", "")
+            )
+
 
     def zeitfenster_hinzufuegen(self):
         try:
@@ -932,6 +1076,14 @@ class StammGUI:
             messagebox.showinfo("Hinweis", "Bitte ein Zeitfenster in der Liste auswählen.")
             return
 
+        if sel[0].startswith("r"):
+            idx = int(sel[0][1:])
+            if 0 <= idx < len(self.zeitfenster_regeln):
+                self.zeitfenster_regeln.pop(idx)
+                self.speichere_zeitplaene()
+                self._zeitfenster_tree_refresh()
+            return
+
         try:
             idx = int(sel[0])
         except ValueError:
@@ -944,41 +1096,114 @@ class StammGUI:
 
     def zeitfenster_alle_loeschen(self):
         self.zeitfenster_liste.clear()
+        if self.zeitfenster_regeln:
+            self.zeitfenster_regeln.clear()
+            self.speichere_zeitplaene()
         self._zeitfenster_tree_refresh()
 
 
-    def berechne_tabs(self):
+    def lade_zeitplaene(self):
         try:
-            welt_id = self.welt_id_entry.get().strip()
-            if not welt_id.isdigit():
-                print("Ungültige Welt-ID")
-                return
+            if os.path.exists(self.ZEITPLAN_DATEI):
+                with open(self.ZEITPLAN_DATEI, "r", encoding="utf-8") as f:
+                    self.zeitfenster_regeln = [ZeitplanRegel.aus_dict(d) for d in json.load(f)]
+                self._zeitfenster_tree_refresh()
+        except Exception as e:
+            print(f"Fehler beim Laden der Zeitpläne: {e}")
 
-            self.welt_id = welt_id
-            self.lade_geschwindigkeiten(welt_id)
 
-            sos_text = self.text_fields["SOS Anfrage"].get("1.0", "end").strip()
-            truppen_text = self.text_fields["Eigene Truppen"].get("1.0", "end").strip()
+    def speichere_zeitplaene(self):
+        try:
+            with open(self.ZEITPLAN_DATEI, "w", encoding="utf-8") as f:
+                json.dump([r.als_dict() for r in self.zeitfenster_regeln], f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"Fehler beim Speichern der Zeitpläne: {e}")
+
+
+    def zeitplan_popup(self):
+        """Wiederkehrendes Zeitfenster anlegen (z.B. täglich 07:00-23:30 oder Mo-Fr 18:00-24:00)"""
+        popup = tk.Toplevel(self.tk_root)
+        popup.title("Wiederkehrendes Zeitfenster")
+        popup.resizable(False, False)
+
+        container = ttk.Frame(popup, padding=12)
+        container.pack(fill="both", expand=True)
+
+        tage_vars = []
+        for idx, tag in enumerate(WOCHENTAGE):
+            var = tk.BooleanVar(value=True)
+            ttk.Checkbutton(container, text=tag, variable=var).grid(row=0, column=idx, padx=2, sticky="w")
+            tage_vars.append(var)
 
-            original_angriffe = SosParser.parse(sos_text)
-            angriffe = original_angriffe
-            eigene_dörfer = EigeneTruppenParser.parse(truppen_text)
+        ttk.Label(container, text="Von (HH:MM):").grid(row=1, column=0, columnspan=2, sticky="w", pady=(10, 0))
+        von_entry = ttk.Entry(container, width=6)
+        von_entry.insert(0, "07:00")
+        von_entry.grid(row=1, column=2, columnspan=2, sticky="w", pady=(10, 0))
 
-            supports_text = self.text_fields["Unterstützungen"].get("1.0", "end").strip()
-            supports = SupportParser.parse(supports_text) if supports_text else []
+        ttk.Label(container, text="Bis (HH:MM):").grid(row=2, column=0, columnspan=2, sticky="w", pady=(4, 0))
+        bis_entry = ttk.Entry(container, width=6)
+        bis_entry.insert(0, "23:30")
+        bis_entry.grid(row=2, column=2, columnspan=2, sticky="w", pady=(4, 0))
 
+        def hinzufuegen():
+            tage = tuple(idx for idx, var in enumerate(tage_vars) if var.get())
             try:
-                support_filter_seconds = int(self.support_filter_seconds_entry.get().strip())
-            except Exception:
-                support_filter_seconds = 0
+                regel = ZeitplanRegel(tage, von_entry.get().strip(), bis_entry.get().strip())
+            except ValueError as e:
+                messagebox.showerror("Zeitfenster Fehler", str(e), parent=popup)
+                return
+            if regel in self.zeitfenster_regeln:
+                messagebox.showinfo("Hinweis", "Diese Regel ist bereits vorhanden.", parent=popup)
+                return
+            self.zeitfenster_regeln.append(regel)
+            self.speichere_zeitplaene()
+            self._zeitfenster_tree_refresh()
+            popup.destroy()
 
-            # Support-Filter nur anwenden wenn aktiviert
-            if self.support_filter_enabled and supports:
-                angriffe, gefiltert_angriffe = self._filter_angriffe_mit_supports(
-                    angriffe, supports, support_filter_seconds
-                )
-            else:
-                gefiltert_angriffe = []
+        ttk.Button(container, text="Hinzufügen", command=hinzufuegen).grid(row=3, column=0, columnspan=7, sticky="e", pady=(12, 0))
+
+
+    def _nach_vorladen(self, welt_id, weiter):
+        """
+        Ruft weiter() auf, sobald Einstellungen und Dorfdaten der Welt geladen sind (meist
+        sofort, da beim Ändern der Welt-ID vorgeladen). Die Tk-Schleife läuft währenddessen weiter.
+        """
+        if self._wartet_auf_vorladen:
+            return
+        auftraege = self.vorlader.starten(welt_id)
+        self._wartet_auf_vorladen = True
+
+        def fertig():
+            self._wartet_auf_vorladen = False
+            self._uebernehme_einstellungen(auftraege["einstellungen"])
+            if auftraege["koord_index"].exception() is not None:
+                print(f"[WARNUNG] Dorfdaten konnten nicht vorgeladen werden: {auftraege['koord_index'].exception()}")
+            weiter()
+
+        wenn_fertig(self.tk_root.after, auftraege.values(), fertig)
+
+    def _uebernehme_einstellungen(self, future):
+        fehler = future.exception()
+        if fehler is not None:
+            print(f"Fehler beim Laden der Geschwindigkeiten: {fehler}")
+            return
+        einstellungen = future.result()
+        self.welt_speed = einstellungen.welt_speed
+        self.einheiten_speed = einstellungen.einheiten_speed
+        self.einheiten_register = UnitRegistry.aus_welt(einstellungen)
+
+    def berechne_tabs(self):
+        welt_id = self.welt_id_entry.get().strip()
+        if not welt_id.isdigit():
+            print("Ungültige Welt-ID")
+            return
+
+        self.welt_id = welt_id
+        self._nach_vorladen(welt_id, self._berechne_tabs)
+
+    def _berechne_tabs(self):
+        try:
+            original_angriffe, angriffe, gefiltert_angriffe, eigene_dörfer = self._lese_angriffe_und_doerfer()
 
             # Zeitfenster (immer als Liste; wenn leer -> keine Einschränkung)
             tz = pytz.timezone("Europe/Berlin")
@@ -1032,22 +1257,35 @@ class StammGUI:
                 auto_speed_units=auto_speed_units,
                 auto_scouts_enabled=auto_scouts_enabled,
                 auto_scouts_count=auto_scouts_count,
-                min_send_interval_seconds=self.min_send_interval_seconds
+                min_send_interval_seconds=self.min_send_interval_seconds,
+                modus=self.matching_modus,
+                prozesse=(os.cpu_count() or 1) if self.parallel_enabled else 1,
+                zeitfenster_regeln=self.zeitfenster_regeln,
+                einheiten=self.einheiten_register
             )
 
-            
-            angriff_counter = Counter(self._angriff_key(a) for a in angriffe)
-            match_counter = Counter(self._match_key(m) for m in self.matches)
-
-            unmatched = []
-            rest = angriff_counter - match_counter
+            # Plan für spätere Aktualisierungen festhalten (nur das Delta wird dann neu gerechnet)
+            self.planer = InkrementellerPlaner(
+                eigene_dörfer,
+                self.tabgroessen_liste,
+                welt_speed=self.welt_speed,
+                einheiten_speed=self.einheiten_speed,
+                zeitfenster_liste=zeitfenster_liste_tz,
+                boost_level=self.boost_level,
+                auto_speed_units=auto_speed_units,
+                auto_scouts_enabled=auto_scouts_enabled,
+                auto_scouts_count=auto_scouts_count,
+                min_send_interval_seconds=self.min_send_interval_seconds,
+                zeitfenster_regeln=self.zeitfenster_regeln,
+                einheiten=self.einheiten_register
+            )
+            self.planer.uebernehme(angriffe, self.matches)
+            self._geplante_angriffe = list(angriffe)
+            self._geplante_truppen = {d.koordinaten: d.truppen for d in eigene_dörfer}
+            if self.aktualisieren_button:
+                self.aktualisieren_button.config(state="normal")
 
-            if rest:
-                for a in angriffe:
-                    k = self._angriff_key(a)
-                    if rest.get(k, 0) > 0:
-                        unmatched.append(a)
-                        rest[k] -= 1
+            unmatched = self.planer.offene_angriffe
 
             print(f"{len(self.matches)} Tabs gefunden und bereit zum Export")
 
@@ -1067,6 +1305,101 @@ class StammGUI:
             print(f"Fehler bei der Tabberechnung: {e}")
 
 
+    def _lese_angriffe_und_doerfer(self):
+        """Parst SOS, eigene Truppen und Unterstützungen aus der GUI und wendet den Support-Filter an."""
+        original_angriffe = self._geparste_eingabe("SOS Anfrage")
+        angriffe = original_angriffe
+        eigene_dörfer = self._geparste_eingabe("Eigene Truppen")
+
+        supports = self._geparste_eingabe("Unterstützungen")
+
+        try:
+            support_filter_seconds = int(self.support_filter_seconds_entry.get().strip())
+        except Exception:
+            support_filter_seconds = 0
+
+        # Support-Filter nur anwenden wenn aktiviert
+        if self.support_filter_enabled and supports:
+            angriffe, gefiltert_angriffe = self._filter_angriffe_mit_supports(
+                angriffe, supports, support_filter_seconds
+            )
+        else:
+            gefiltert_angriffe = []
+
+        return original_angriffe, angriffe, gefiltert_angriffe, eigene_dörfer
+
+    def aktualisiere_tabs(self):
+        """
+        Arbeitet neue/entfallene SOS-Zeilen und geänderte Truppen in den bestehenden Plan ein,
+        ohne alles neu zu berechnen. Einstellungen (Tabs, Zeitfenster, Boost ...) bleiben die der
+        letzten vollständigen Berechnung.
+        """
+        if self.planer is None:
+            self.berechne_tabs()
+            return
+
+        # Der Bericht enthält den Export-Text und braucht dafür die Dorfdaten
+        self._nach_vorladen(self.welt_id, self._aktualisiere_tabs)
+
+    def _aktualisiere_tabs(self):
+        try:
+            original_angriffe, angriffe, gefiltert_angriffe, eigene_dörfer = self._lese_angriffe_und_doerfer()
+
+            vorher = Counter(self._angriff_key(a) for a in self._geplante_angriffe)
+            jetzt = Counter(self._angriff_key(a) for a in angriffe)
+            neu_rest, weg_rest = jetzt - vorher, vorher - jetzt
+
+            neue_angriffe = []
+            for a in angriffe:
+                k = self._angriff_key(a)
+                if neu_rest.get(k, 0) > 0:
+                    neue_angriffe.append(a)
+                    neu_rest[k] -= 1
+
+            entfernte_angriffe = []
+            for a in self._geplante_angriffe:
+                k = self._angriff_key(a)
+                if weg_rest.get(k, 0) > 0:
+                    entfernte_angriffe.append(a)
+                    weg_rest[k] -= 1
+
+            geaenderte_doerfer = [
+                d for d in eigene_dörfer if self._geplante_truppen.get(d.koordinaten) != d.truppen
+            ]
+            # Nicht mehr in der Truppenübersicht: Tabs dieser Dörfer müssen frei werden
+            entfernte_doerfer = sorted(set(self._geplante_truppen) - {d.koordinaten for d in eigene_dörfer})
+
+            diff = self.planer.aktualisiere(
+                neue_angriffe=neue_angriffe,
+                entfernte_angriffe=entfernte_angriffe,
+                geaenderte_doerfer=geaenderte_doerfer,
+                entfernte_doerfer=entfernte_doerfer
+            )
+            self._geplante_angriffe = list(angriffe)
+            self._geplante_truppen.update({d.koordinaten: d.truppen for d in geaenderte_doerfer})
+            for koord in entfernte_doerfer:
+                del self._geplante_truppen[koord]
+            self.matches = self.planer.matches
+
+            print(
+                f"Aktualisiert: {len(neue_angriffe)} neue / {len(entfernte_angriffe)} entfallene Angriffe, "
+                f"{len(geaenderte_doerfer)} geänderte / {len(entfernte_doerfer)} entfallene Dörfer -> +{len(diff.neu)} / -{len(diff.entfernt)} Tabs"
+            )
+
+            self.zeige_berechnung_report(
+                original_angriffe=original_angriffe,
+                gefiltert_angriffe=gefiltert_angriffe,
+                verwendete_angriffe=angriffe,
+                matches=self.matches,
+                unmatched=self.planer.offene_angriffe
+            )
+
+            if self.export_button:
+                self.export_button.config(state="normal" if self.matches else "disabled")
+
+        except Exception as e:
+            print(f"Fehler bei der Aktualisierung: {e}")
+
     def _unmatched_als_sos_text(self, unmatched):
         """
         Rekonstruiert einen SOS-Text, der von SosParser.parse wieder verstanden wird.
@@ -1114,11 +1447,11 @@ class StammGUI:
 
         support_map = {}
         for s in supports:
-            support_map.setdefault(s.ziel_koord, []).append(s.ankunftszeit)
+            support_map.setdefault(s.ziel_koord, []).append(s.ankunft_ms)
         for k in support_map:
             support_map[k].sort()
 
-        delta = timedelta(seconds=nach_sekunden)
+        delta_ms = nach_sekunden * 1000
 
         kept = []
         removed = []
@@ -1129,8 +1462,8 @@ class StammGUI:
                 kept.append(a)
                 continue
 
-            start = a.ankunftszeit
-            end = a.ankunftszeit + delta
+            start = a.ankunft_ms
+            end = start + delta_ms
 
             i = bisect_left(lst, start)
             if i < len(lst) and lst[i] <= end:
@@ -1144,29 +1477,6 @@ class StammGUI:
 
 
 
-    def lade_geschwindigkeiten(self, welt_id):
-        url = f"https://de{welt_id}.die-staemme.de/page/settings"
-        try:
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            welt_row = soup.find("td", string="Spielgeschwindigkeit")
-            einheit_row = soup.find("td", string="Einheitengeschwindigkeit")
-
-            if not welt_row or not einheit_row:
-                raise ValueError("Konnte Geschwindigkeitsdaten nicht finden.")
-
-            welt_speed = welt_row.find_next_sibling("td").text.strip()
-            einheit_speed = einheit_row.find_next_sibling("td").text.strip()
-
-            print(f"[INFO] Weltgeschwindigkeit: {welt_speed}, Einheitengeschwindigkeit: {einheit_speed}")
-
-            self.welt_speed = float(welt_speed)
-            self.einheiten_speed = float(einheit_speed)
-        except Exception as e:
-            print(f"Fehler beim Laden der Geschwindigkeiten: {e}")
-
-
     def datum_popup(self, title, entry_widget):
         popup = tk.Toplevel(self.tk_root)
         popup.title(title)
@@ -1248,6 +1558,9 @@ class StammGUI:
         ttk.Button(container, text="Übernehmen", command=übernehmen).pack(pady=(5, 10))
 
     def exportiere(self):
+        self._nach_vorladen(self.welt_id, self._zeige_export_auswahl)
+
+    def _zeige_export_auswahl(self):
         # kleines Auswahlfenster: TXT oder DSU API
         popup = tk.Toplevel(self.tk_root)
         popup.title("Export")
@@ -1277,7 +1590,7 @@ class StammGUI:
 
     def _export_txt(self):
         try:
-            export_text = TabMatching.export_dsultimate(self.matches, self.welt_id)
+            export_text = TabMatching.export_dsultimate(self.matches, self.welt_id, self.einheiten_register)
             pfad = filedialog.asksaveasfilename(
                 defaultextension=".txt",
                 filetypes=[("Textdateien", "*.txt")],
@@ -1314,6 +1627,7 @@ class StammGUI:
                 tribe_skill=tribe_skill,
                 support_boost=0.0,
                 ms=500,
+                einheiten=self.einheiten_register,
             )
 
             edit_link = result.get("edit", "")
@@ -1332,9 +1646,12 @@ class StammGUI:
 
 # GUI starten
 if __name__ == "__main__":
+    # Nötig für den Prozess-Pool in der PyInstaller-.exe (Windows startet Worker neu)
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = StammGUI(root)
     root.iconbitmap(resource_path("support.ico")) 
     root.mainloop()
+    app.vorlader.beenden()
 
 
@@ -0,0 +1,83 @@
+"""
+Benchmark: skalare Distanzberechnung vs. vektorisierte DistanzMatrix, danach das komplette
+finde_tabs skalar vs. vektorisiert=True (Distanzmatrix + Abschick-Zeilen pro Laufzeit).
+
+Aufruf (aus dem Projektverzeichnis):
+    python benchmarks/bench_distanz_matrix.py                 # 5000 Dörfer x 5000 Ziele
+    python benchmarks/bench_distanz_matrix.py --voll          # skalaren Pfad komplett messen statt hochrechnen
+    python benchmarks/bench_distanz_matrix.py --ohne-matching # nur die Distanzen
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_global_modus import erzeuge_szenario
+from distanz_matrix import DistanzMatrix
+from distanz_rechner import DistanzRechner
+from tab_matching import TabMatching
+import zeit
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--doerfer", type=int, default=5000)
+    parser.add_argument("--ziele", type=int, default=5000)
+    parser.add_argument("--stichprobe", type=int, default=200, help="Ziele für die skalare Messung")
+    parser.add_argument("--voll", action="store_true")
+    parser.add_argument("--ohne-matching", action="store_true", help="finde_tabs nicht messen")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    doerfer = [f"{rng.randint(0, 999):03d}|{rng.randint(0, 999):03d}" for _ in range(args.doerfer)]
+    ziele = [f"{rng.randint(0, 999):03d}|{rng.randint(0, 999):03d}" for _ in range(args.ziele)]
+
+    stichprobe = ziele if args.voll else ziele[:args.stichprobe]
+    t0 = time.perf_counter()
+    for ziel in stichprobe:
+        for dorf in doerfer:
+            DistanzRechner.berechne_distanz(dorf, ziel)
+    skalar = (time.perf_counter() - t0) * len(ziele) / len(stichprobe)
+
+    t0 = time.perf_counter()
+    matrix = DistanzMatrix(doerfer, ziele)
+    vektor = time.perf_counter() - t0
+
+    hinweis = "" if args.voll else f" (hochgerechnet aus {len(stichprobe)} Zielen)"
+    print(f"{args.doerfer} Dörfer x {args.ziele} Ziele = {args.doerfer * args.ziele:,} Paare")
+    print(f"Skalar (berechne_distanz):   {skalar:8.2f} s{hinweis}")
+    print(f"Vektorisiert (DistanzMatrix): {vektor:8.2f} s")
+    print(f"Speed-up Distanzen:           {skalar / vektor:8.1f}x")
+
+    if not args.ohne_matching:
+        matching(args.ziele, args.doerfer)
+
+
+def matching(anzahl_angriffe: int, anzahl_doerfer: int):
+    angriffe, doerfer = erzeuge_szenario(anzahl_angriffe, anzahl_doerfer, 0)
+    tabgroessen = [{"Speerträger": 1000, "Schwertkämpfer": 1000}, {"Schwere Kavallerie": 500}]
+
+    # Gleiches "jetzt" für beide Läufe, damit die Tabs vergleichbar sind
+    jetzt = zeit.jetzt_ms()
+    ergebnisse = {}
+    print(f"finde_tabs mit {len(angriffe)} Angriffen x {len(doerfer)} Dörfern:")
+    for name, vektorisiert in (("skalar", False), ("vektorisiert", True)):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), mock.patch("zeit.jetzt_ms", return_value=jetzt):
+            matches = TabMatching.finde_tabs(angriffe, doerfer, tabgroessen, vektorisiert=vektorisiert)
+        dauer = time.perf_counter() - start
+        ergebnisse[name] = (dauer, [(m.herkunft.koordinaten, m.ziel_koord, m.abschick_ms) for m in matches])
+        print(f"  {name:12s}: {len(matches):5d} Tabs in {dauer:8.2f} s")
+
+    (skalar, erwartet), (vektor, tabs) = ergebnisse["skalar"], ergebnisse["vektorisiert"]
+    print(f"  Gleiche Tabs: {'ja' if tabs == erwartet else 'nein'}, Speed-up: {skalar / vektor:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: Greedy vs. globale Zuordnung (Abdeckung und Laufzeit).
+
+Aufruf (aus dem Projektverzeichnis):
+    python benchmarks/bench_global_modus.py                     # 2000 Angriffe x 5000 Dörfer
+    python benchmarks/bench_global_modus.py --angriffe 500 --doerfer 1000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import zeit
+from eigene_truppen_parser import EigenesDorf
+from tab_matching import Angriff, TabMatching
+
+
+def erzeuge_szenario(anzahl_angriffe: int, anzahl_doerfer: int, seed: int = 0):
+    rng = random.Random(seed)
+    jetzt = zeit.als_berlin(zeit.jetzt_ms())
+
+    def koord(zentrum=500, streuung=60):
+        return f"{min(999, max(0, int(rng.gauss(zentrum, streuung)))):03d}|{min(999, max(0, int(rng.gauss(zentrum, streuung)))):03d}"
+
+    doerfer = [
+        EigenesDorf(
+            dorf_name=f"Dorf {i}",
+            koordinaten=koord(),
+            truppen={
+                "Speerträger": rng.randint(0, 3000),
+                "Schwertkämpfer": rng.randint(0, 3000),
+                "Axtkämpfer": rng.randint(0, 3),
+                "Späher": rng.randint(0, 50),
+                "Leichte Kavallerie": rng.randint(0, 3),
+                "Schwere Kavallerie": rng.randint(0, 500),
+                "Rammböcke": 0,
+                "Katapulte": rng.randint(0, 2),
+            },
+        )
+        for i in range(anzahl_doerfer)
+    ]
+    ziele = [koord(streuung=40) for _ in range(max(1, anzahl_angriffe // 4))]
+    angriffe = [
+        Angriff(ziel_koord=rng.choice(ziele), ankunftszeit=jetzt + timedelta(minutes=rng.randint(30, 12 * 60)))
+        for _ in range(anzahl_angriffe)
+    ]
+    return angriffe, doerfer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--angriffe", type=int, default=2000)
+    parser.add_argument("--doerfer", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    angriffe, doerfer = erzeuge_szenario(args.angriffe, args.doerfer, args.seed)
+    tabgroessen = [{"Speerträger": 1000, "Schwertkämpfer": 1000}]
+
+    print(f"{len(angriffe)} Angriffe x {len(doerfer)} Dörfer")
+    for modus in ("greedy", "global"):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            matches = TabMatching.finde_tabs(angriffe, doerfer, tabgroessen, modus=modus)
+        dauer = time.perf_counter() - start
+        print(f"{modus:7s}: {len(matches):5d}/{len(angriffe)} abgedeckt ({len(matches) / len(angriffe):6.1%}) in {dauer:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark: sequentieller Greedy vs. Kandidatensuche im Prozess-Pool (prozesse=...).
+Die Ergebnisgleichheit prüfen die Tests (eingefrorene Zeit), hier laufen beide Varianten
+mit leicht unterschiedlichem "jetzt".
+
+Aufruf (aus dem Projektverzeichnis):
+    python benchmarks/bench_parallel.py                         # 10000 Angriffe x 5000 Dörfer, alle Kerne
+    python benchmarks/bench_parallel.py --angriffe 2000 --prozesse 4
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_global_modus import erzeuge_szenario
+from tab_matching import TabMatching
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--angriffe", type=int, default=10000)
+    parser.add_argument("--doerfer", type=int, default=5000)
+    parser.add_argument("--prozesse", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    angriffe, doerfer = erzeuge_szenario(args.angriffe, args.doerfer, args.seed)
+    tabgroessen = [{"Speerträger": 1000, "Schwertkämpfer": 1000}]
+
+    print(f"{len(angriffe)} Angriffe x {len(doerfer)} Dörfer, {args.prozesse} Prozesse")
+    for name, prozesse in (("sequentiell", 1), ("parallel", max(2, args.prozesse))):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            matches = TabMatching.finde_tabs(angriffe, doerfer, tabgroessen, prozesse=prozesse)
+        dauer = time.perf_counter() - start
+        print(f"{name:11s}: {len(matches):5d} Tabs in {dauer:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
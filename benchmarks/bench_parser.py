@@ -0,0 +1,71 @@
+"""
+Benchmark: Kosten pro Zeile von SosParser und SupportParser auf großen Eingaben.
+
+Aufruf (aus dem Projektverzeichnis):
+    python benchmarks/bench_parser.py                           # 100000 Angriffszeilen
+    python benchmarks/bench_parser.py --zeilen 20000 --tage 3
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sos_parser import SosParser
+from support_parser import SupportParser
+
+
+def erzeuge_sos(zeilen: int, tage: int, rng: random.Random) -> str:
+    text = []
+    for i in range(zeilen):
+        if i % 20 == 0:
+            text.append(f"[b]Dorf:[/b] [coord]{rng.randint(0, 999):03d}|{rng.randint(0, 999):03d}[/coord]")
+        datum = f"{25 + rng.randrange(tage):02d}.01.26"
+        uhrzeit = f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+        text.append(
+            f"[command]attack[/command] Axtkämpfer [coord]{rng.randint(0, 999):03d}|{rng.randint(0, 999):03d}[/coord]"
+            f" --> Ankunftszeit: {datum} {uhrzeit}"
+        )
+    return "\n".join(text)
+
+
+def erzeuge_supports(zeilen: int, rng: random.Random) -> str:
+    text = ["Serverzeit: 23:21:42 24/01/2026"]
+    for _ in range(zeilen):
+        wann = rng.choice(["heute um", "morgen um", "25.01.26", "26.01.2026"])
+        text.append(
+            f"Unterstützung Dorf ({rng.randint(0, 999):03d}|{rng.randint(0, 999):03d}) K55 "
+            f"{wann} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+        )
+    return "\n".join(text)
+
+
+def messen(name: str, funktion, text: str, zeilen: int):
+    gc.collect()
+    start = time.perf_counter()
+    ergebnis = funktion(text)
+    dauer = time.perf_counter() - start
+    print(f"{name:20s}: {len(ergebnis):7d} in {dauer:6.2f} s = {dauer / zeilen * 1e6:6.2f} µs/Zeile")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zeilen", type=int, default=100000)
+    parser.add_argument("--tage", type=int, default=2, help="verschiedene Ankunftsdaten im Korpus")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sos_text = erzeuge_sos(args.zeilen, args.tage, rng)
+    support_text = erzeuge_supports(args.zeilen, rng)
+
+    print(f"{args.zeilen} Zeilen, {args.tage} verschiedene Daten")
+    messen("SosParser.parse", SosParser.parse, sos_text, args.zeilen)
+    messen("SupportParser.parse", SupportParser.parse, support_text, args.zeilen)
+
+
+if __name__ == "__main__":
+    main()
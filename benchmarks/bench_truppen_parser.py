@@ -0,0 +1,98 @@
+"""
+Benchmark: EigeneTruppenParser (zeilenweiser Tokenizer) vs. früherer Regex-Parser
+(Regex über den gesamten Text, re.split pro Dorf, Ausgabe pro Dorf).
+
+Aufruf (aus dem Projektverzeichnis):
+    python benchmarks/bench_truppen_parser.py                   # 20000 Dörfer
+    python benchmarks/bench_truppen_parser.py --doerfer 5000 --bogen
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eigene_truppen_parser import EigeneTruppenParser, EigenesDorf
+
+
+def regex_parse(text: str):
+    """Der frühere Parser (EigeneTruppenParser.parse vor dem Tokenizer), unverändert bis auf den Namen."""
+    doerfer = []
+
+    # Muster: Dorfname (xxx|yyy) Kxx eigene <truppen...>
+    dorf_block_pattern = re.compile(r'(.*?)\((\d{3}\|\d{3})\)\s*K\d+\s*eigene\s*([\d\s]+)')
+
+    for match in dorf_block_pattern.finditer(text):
+        name = match.group(1).strip()
+        koord = match.group(2)
+        truppen_raw = match.group(3).strip()
+
+        # Truppen aufteilen (alle Zahlen)
+        truppen_split = list(filter(None, re.split(r'\s+', truppen_raw)))
+
+        if len(truppen_split) < 8:
+            print(f"WARNUNG: Dorf '{name}' ({koord}) hat unerwartet wenig Werte: {truppen_split}")
+            continue
+
+        truppen = {
+            "Speerträger": int(truppen_split[0]),
+            "Schwertkämpfer": int(truppen_split[1]),
+            "Axtkämpfer": int(truppen_split[2]),
+            "Späher": int(truppen_split[3]),
+            "Leichte Kavallerie": int(truppen_split[4]),
+            "Schwere Kavallerie": int(truppen_split[5]),
+            "Rammböcke": int(truppen_split[6]),
+            "Katapulte": int(truppen_split[7])
+        }
+
+        print(f"Gelesen: {name} ({koord}) -> {truppen}")
+
+        doerfer.append(EigenesDorf(dorf_name=name, koordinaten=koord, truppen=truppen))
+
+    return doerfer
+
+
+def erzeuge_export(anzahl: int, spalten: int, rng: random.Random) -> str:
+    zeilen = []
+    for i in range(anzahl):
+        x, y = rng.randint(0, 999), rng.randint(0, 999)
+        werte = "\t".join(str(rng.randint(0, 12000)) for _ in range(spalten + 2))  # + Paladin, AG
+        zeilen.append(f"Dorf {i:05d} ({x:03d}|{y:03d}) K{y // 100}{x // 100}\teigene\t{werte}\tBefehle")
+        zeilen.append(f"\tim Dorf\t{werte}\tTruppen")
+    return "\n".join(zeilen)
+
+
+def messen(name: str, funktion, text: str) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        doerfer = funktion(text)
+    dauer = time.perf_counter() - start
+    print(f"{name:22s}: {len(doerfer):6d} Dörfer in {dauer:6.3f} s")
+    return dauer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--doerfer", type=int, default=20000)
+    parser.add_argument("--bogen", action="store_true", help="Export einer Bogenschützen-Welt (10 Truppenspalten)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    text = erzeuge_export(args.doerfer, 10 if args.bogen else 8, random.Random(args.seed))
+    print(f"{args.doerfer} Dörfer, {len(text) / 1e6:.1f} MB Text (Ausgaben nach StringIO umgeleitet)")
+
+    tokenizer = messen("Tokenizer", lambda t: EigeneTruppenParser.parse(t, bogenschuetzen=args.bogen), text)
+    if not args.bogen:
+        regex = messen("Regex (früher)", regex_parse, text)
+        print(f"Speed-up: {regex / tokenizer:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
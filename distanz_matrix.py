@@ -0,0 +1,141 @@
+from typing import Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ist optional
+    np = None
+
+
+class DistanzMatrix:
+    """
+    Vektorisierte Distanzberechnung (optional, benötigt NumPy).
+    Parst alle Dorf- und Zielkoordinaten einmal in int-Arrays und berechnet die komplette
+    Distanzmatrix Ziele x Dörfer in einem Schritt (eine Zeile pro Ziel, damit der Zugriff
+    pro Angriff zusammenhängend im Speicher liegt). Die Werte sind bitgleich zu
+    DistanzRechner.berechne_distanz (IEEE-Wurzel auf exakten Ganzzahl-Quadraten).
+    kandidaten() filtert darauf pro Angriff alle Tabs als Arrays (Abschick-Zeilen pro Laufzeit,
+    Ledger-Bestände, Zeitfenster) statt einzeln in einer Python-Schleife.
+    """
+
+    def __init__(self, dorf_koordinaten: List[str], ziel_koordinaten: List[str]):
+        if np is None:
+            raise RuntimeError("NumPy ist nicht installiert – vektorisierte Berechnung nicht verfügbar.")
+
+        # Ziele deduplizieren: viele Angriffe laufen auf dasselbe Dorf
+        self.ziel_zeile: Dict[str, int] = {}
+        for koord in ziel_koordinaten:
+            self.ziel_zeile.setdefault(koord, len(self.ziel_zeile))
+
+        self.dorf_xy = DistanzMatrix.parse_koordinaten(dorf_koordinaten)
+        self.ziel_xy = DistanzMatrix.parse_koordinaten(list(self.ziel_zeile))
+
+        # int32 reicht (max. 2 * 999^2), in-place hält den Speicher bei 5k x 5k im Rahmen
+        dx = self.dorf_xy[None, :, 0] - self.ziel_xy[:, None, 0]
+        dy = self.dorf_xy[None, :, 1] - self.ziel_xy[:, None, 1]
+        dx *= dx
+        dy *= dy
+        dx += dy
+        del dy
+        self.distanzen = np.sqrt(dx, dtype=np.float64)
+
+    @staticmethod
+    def verfuegbar() -> bool:
+        return np is not None
+
+    @staticmethod
+    def parse_koordinaten(koordinaten: List[str]):
+        if not koordinaten:
+            return np.empty((0, 2), dtype=np.int32)
+        return np.array([k.split("|") for k in koordinaten], dtype=np.int32).reshape(-1, 2)
+
+    def zeile(self, ziel_koord: str):
+        return self.distanzen[self.ziel_zeile[ziel_koord]]
+
+    def im_umkreis(self, ziel_koord: str, radius: float) -> Tuple[List[int], List[float]]:
+        """Dorf-Indizes (aufsteigend) und Distanzen aller Dörfer mit Distanz <= radius."""
+        if radius < 0:
+            return [], []
+        zeile = self.zeile(ziel_koord)
+        indizes = np.flatnonzero(zeile <= radius)
+        return indizes.tolist(), zeile[indizes].tolist()
+
+    @staticmethod
+    def abschick_zeilen(distanzen, ankunft: int, laufzeiten) -> Dict[float, "np.ndarray"]:
+        """
+        Abschickzeiten (Epoch-ms, int64) für alle übergebenen Distanzen in einem Schritt, eine Zeile
+        pro Laufzeit (Minuten pro Feld). Bitgleich zu ankunft - round(distanz * lz * 60000):
+        gleiche Multiplikationsreihenfolge, np.rint rundet wie round() auf die gerade Zahl.
+        """
+        d = np.asarray(distanzen, dtype=np.float64)
+        return {lz: ankunft - np.rint(d * lz * 60000).astype(np.int64) for lz in laufzeiten}
+
+    def kandidaten(self, ziel_koord: str, radius: float, ankunft: int, now_ms: int, ledger, varianten, zeitfenster):
+        """
+        Alle möglichen Tabs eines Ziels als Arrays in einem Schritt (Gegenstück zur Schleife in
+        MatchKontext.kandidaten): Dörfer im Umkreis (ohne das Ziel selbst), eine Abschick-Zeile pro
+        Laufzeit, Bestände aus dem Ledger, Zeitfenster per searchsorted.
+        varianten: (Ledger-Bedarf, Zusatz-Spalte, Laufzeit) in Vorlagen-Reihenfolge.
+        Rückgabe: (Abschickzeit, Distanz, Dorf-Index, Varianten-Nr.), ungeordnet (siehe reihenfolge).
+        """
+        if radius < 0:
+            return DistanzMatrix._leer()
+        zeile = self.zeile(ziel_koord)
+        dorf_idx = np.flatnonzero((zeile <= radius) & (zeile > 0))
+        if not dorf_idx.size:
+            return DistanzMatrix._leer()
+
+        distanzen = zeile[dorf_idx]
+        # Nur die Zeilen der Dörfer im Umkreis kopieren; die Sicht auf das array('i') endet sofort
+        bestand = np.frombuffer(ledger.daten, dtype=np.intc).reshape(-1, ledger.breite)[dorf_idx]
+        zeilen = DistanzMatrix.abschick_zeilen(distanzen, ankunft, {lz for _, _, lz in varianten})
+
+        erlaubt = {}
+        if not zeitfenster.unbeschraenkt:
+            von = np.asarray(zeitfenster.von, dtype=np.int64)
+            bis = np.asarray(zeitfenster.bis, dtype=np.int64)
+            for lz, abschick in zeilen.items():
+                i = np.searchsorted(von, abschick, side="right") - 1
+                erlaubt[lz] = (i >= 0) & (abschick <= bis[np.maximum(i, 0)])
+
+        teile = []
+        for nr, (bedarf, zusatz_idx, lz) in enumerate(varianten):
+            ok = zeilen[lz] >= now_ms
+            if lz in erlaubt:
+                ok &= erlaubt[lz]
+            if zusatz_idx is not None:
+                ok &= bestand[:, zusatz_idx] > 0
+            for idx, menge in bedarf:
+                ok &= bestand[:, idx] >= menge
+            pos = np.flatnonzero(ok)
+            teile.append((zeilen[lz][pos], pos, np.full(pos.size, nr)))
+
+        if not teile:
+            return DistanzMatrix._leer()
+        abschick, pos, nr = (np.concatenate(spalte) for spalte in zip(*teile))
+        return abschick, distanzen[pos], dorf_idx[pos], nr
+
+    @staticmethod
+    def _leer():
+        return np.empty(0, np.int64), np.empty(0, np.float64), np.empty(0, np.intp), np.empty(0, np.intp)
+
+    @staticmethod
+    def reihenfolge(kandidaten, nach_abschick: bool = True):
+        """
+        Indizes der Kandidaten nach (Abschickzeit, Distanz, Dorf, Variante) wie bester_kandidat,
+        sonst nach (Dorf, Variante) wie die skalare Erzeugung.
+        """
+        abschick, distanzen, dorf_idx, nr = kandidaten
+        if nach_abschick:
+            return np.lexsort((nr, dorf_idx, distanzen, abschick))
+        return np.lexsort((nr, dorf_idx))
+
+    @staticmethod
+    def bester(kandidaten) -> int | None:
+        """Index des ersten Kandidaten in reihenfolge(), ohne alles zu sortieren (None, wenn leer)."""
+        abschick, distanzen, dorf_idx, nr = kandidaten
+        if not abschick.size:
+            return None
+        gleich = np.flatnonzero(abschick == abschick.min())
+        if gleich.size == 1:
+            return int(gleich[0])
+        return int(gleich[np.lexsort((nr[gleich], dorf_idx[gleich], distanzen[gleich]))[0]])
@@ -0,0 +1,259 @@
+import gzip
+import io
+import json
+import os
+import time
+import zlib
+from typing import Dict, Iterable, Iterator
+
+import requests
+
+import netz
+from koord_index import KoordIndex
+
+# Ablage der heruntergeladenen Weltdaten (die GUI setzt das Verzeichnis neben die Anwendung)
+CACHE_VERZEICHNIS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+# Die Server erzeugen village.txt höchstens stündlich neu
+TTL_SEKUNDEN = 3600
+_CHUNK = 1 << 16
+
+# Welt -> (zuletzt geprüft [s], mtime_ns der Cache-Datei, KoordIndex)
+_memo: Dict[str, tuple] = {}
+
+
+class _MitschreibenderStrom(io.RawIOBase):
+    """Liest die Chunks der HTTP-Antwort und schreibt jeden Chunk beim Lesen zugleich in die Cache-Datei."""
+
+    def __init__(self, chunks: Iterator[bytes], ablage):
+        self._chunks = chunks
+        self._ablage = ablage
+        self._rest = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, puffer) -> int:
+        while not self._rest:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            if self._ablage is not None:
+                self._ablage.write(chunk)
+            self._rest = memoryview(chunk)
+        n = min(len(puffer), len(self._rest))
+        puffer[:n] = self._rest[:n]
+        self._rest = self._rest[n:]
+        return n
+
+    def rest_speichern(self):
+        """Nach dem Parsen den Rest der Antwort nur noch ablegen (ohne Ablage nicht weiterlesen)."""
+        if self._ablage is None:
+            return
+        for chunk in self._chunks:
+            self._ablage.write(chunk)
+
+
+class DorfDaten:
+    """
+    map/village.txt.gz pro Welt mit Plattencache: innerhalb von TTL_SEKUNDEN ohne Netzzugriff,
+    danach bedingt neu angefragt (If-None-Match / If-Modified-Since, meist 304 ohne Inhalt).
+    Ein Download wird in einem Durchlauf gespeichert, entpackt und zeilenweise in einen KoordIndex
+    (village_grid_<mtime>.bin, per mmap geladen) geschrieben; der Index wird im Prozess gemerkt.
+    Jede Version der village.txt.gz bekommt eine eigene Rasterdatei: eine gemappte Datei lässt sich
+    unter Windows weder ersetzen noch löschen, solange noch ein Index aus ihr verwendet wird.
+    """
+
+    @staticmethod
+    def url(welt_id: str) -> str:
+        return f"https://de{welt_id}.die-staemme.de/map/village.txt.gz"
+
+    @staticmethod
+    def _pfade(welt_id: str):
+        ordner = os.path.join(CACHE_VERZEICHNIS, f"de{welt_id}")
+        return (
+            os.path.join(ordner, "village.txt.gz"),
+            os.path.join(ordner, "village.meta.json"),
+        )
+
+    @staticmethod
+    def _raster_datei(datei: str, mtime: int) -> str:
+        """Rasterdatei zur village.txt.gz mit dieser mtime (ns)."""
+        return os.path.join(os.path.dirname(datei), f"village_grid_{mtime}.bin")
+
+    @staticmethod
+    def koord_index(welt_id: str, benoetigt: Iterable[str] | None = None) -> KoordIndex:
+        """
+        benoetigt: Koordinaten, die der Aufrufer braucht. Nur wenn der Download nicht auf der Platte
+        abgelegt werden kann, endet das Parsen, sobald alle aufgelöst sind (Index dann nicht vollständig,
+        wird weder gespeichert noch gemerkt). Mit Plattencache wird immer der vollständige Index gebaut,
+        gespeichert und gemerkt, damit weitere Exporte weder neu laden noch neu entpacken.
+        """
+        jetzt = time.time()
+        gemerkt = _memo.get(welt_id)
+        if gemerkt and jetzt - gemerkt[0] < TTL_SEKUNDEN:
+            return gemerkt[2]
+
+        datei, meta_datei = DorfDaten._pfade(welt_id)
+        meta = DorfDaten._lies_meta(meta_datei) if os.path.exists(datei) else {}
+        geprueft = meta.get("geprueft", 0)
+
+        index = None
+        if jetzt - geprueft >= TTL_SEKUNDEN:
+            antwort = DorfDaten._anfragen(welt_id, meta_datei, meta)
+            if antwort is not None:
+                index = DorfDaten._herunterladen(welt_id, antwort, meta, benoetigt)
+            geprueft = jetzt
+
+        mtime = os.stat(datei).st_mtime_ns if os.path.exists(datei) else None
+        if index is None:
+            if gemerkt and gemerkt[1] == mtime:
+                index = gemerkt[2]
+            else:
+                raster_datei = DorfDaten._raster_datei(datei, mtime)
+                index = DorfDaten._lade_index(raster_datei)
+                if index is None:
+                    with gzip.open(datei, "rb") as entpackt:
+                        index = KoordIndex.aus_zeilen(entpackt)
+                    DorfDaten._speichere_index(index, raster_datei)
+
+        if index.vollstaendig:
+            _memo[welt_id] = (geprueft, mtime, index)
+        return index
+
+    @staticmethod
+    def _lade_index(raster_datei: str):
+        """Gespeichertes Raster zur aktuellen village.txt.gz (None, wenn es fehlt oder kaputt ist)."""
+        try:
+            return KoordIndex.laden(raster_datei)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _speichere_index(index: KoordIndex, raster_datei: str):
+        if not index.vollstaendig:
+            return
+        try:
+            index.speichern(raster_datei)
+        except OSError as e:
+            print(f"[WARNUNG] Koordinaten-Index konnte nicht gespeichert werden: {e}")
+            return
+        DorfDaten._alte_raster_entfernen(raster_datei)
+
+    @staticmethod
+    def _alte_raster_entfernen(raster_datei: str):
+        """
+        Löscht Raster älterer Versionen. Unter Windows schlägt das fehl, solange ein Index sie
+        noch gemappt hat; sie werden dann beim nächsten Speichern erneut versucht.
+        """
+        ordner = os.path.dirname(raster_datei)
+        for name in os.listdir(ordner):
+            pfad = os.path.join(ordner, name)
+            if name.startswith("village_grid") and name.endswith(".bin") and pfad != raster_datei:
+                try:
+                    os.remove(pfad)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _anfragen(welt_id: str, meta_datei: str, meta: dict):
+        """Bedingte Anfrage. Rückgabe: Antwort mit Status 200 (Inhalt noch ungelesen) oder None (Cache verwenden)."""
+        url = DorfDaten.url(welt_id)
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            response = netz.get(url, headers=headers, stream=True)
+        except requests.RequestException as e:
+            if meta:
+                print(f"[WARNUNG] Dorfdaten nicht erreichbar ({e}), verwende Cache von {url}")
+                return None
+            raise RuntimeError(f"Download der Dorfdaten fehlgeschlagen ({e}, URL: {url})") from e
+
+        if response.status_code == 200:
+            return response
+        response.close()
+        if response.status_code == 304 and meta:
+            DorfDaten._schreibe_meta(meta_datei, {**meta, "geprueft": time.time()})
+            return None
+        if meta:
+            print(f"[WARNUNG] Dorfdaten: Status {response.status_code}, verwende Cache von {url}")
+            return None
+        raise RuntimeError(f"Download der Dorfdaten fehlgeschlagen (Status: {response.status_code}, URL: {url})")
+
+    @staticmethod
+    def _herunterladen(welt_id: str, response, meta: dict, benoetigt: Iterable[str] | None):
+        """
+        Legt die Antwort chunkweise ab und baut dabei aus dem entpackten Strom den KoordIndex, ohne
+        Antwort, entpackte Daten oder Zeilenliste komplett im Speicher zu halten.
+        Rückgabe None, wenn der Download abbricht und die ältere Cache-Datei verwendet werden kann.
+        """
+        url = DorfDaten.url(welt_id)
+        datei, meta_datei = DorfDaten._pfade(welt_id)
+        tmp = datei + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(datei), exist_ok=True)
+            ablage = open(tmp, "wb")
+        except OSError as e:
+            print(f"[WARNUNG] Dorfdaten konnten nicht zwischengespeichert werden: {e}")
+            ablage = None
+
+        try:
+            strom = _MitschreibenderStrom(iter(response.iter_content(_CHUNK)), ablage)
+            with gzip.GzipFile(fileobj=io.BufferedReader(strom, _CHUNK)) as entpackt:
+                # Vorzeitiges Ende spart nur etwas, wenn der Rest nicht ohnehin abgelegt wird
+                index = KoordIndex.aus_zeilen(entpackt, benoetigt if ablage is None else None)
+            strom.rest_speichern()
+        except (requests.RequestException, OSError, EOFError, zlib.error) as e:
+            if ablage is not None:
+                ablage.close()
+                os.remove(tmp)
+            if meta:
+                print(f"[WARNUNG] Download der Dorfdaten abgebrochen ({e}), verwende Cache von {url}")
+                return None
+            raise RuntimeError(f"Download der Dorfdaten fehlgeschlagen ({e}, URL: {url})") from e
+        finally:
+            response.close()
+
+        print(f"[INFO] Dorfdaten geladen: {url}")
+        if ablage is None:
+            return index
+        ablage.close()
+        try:
+            os.replace(tmp, datei)
+            mtime = os.stat(datei).st_mtime_ns
+        except OSError as e:
+            print(f"[WARNUNG] Dorfdaten konnten nicht zwischengespeichert werden: {e}")
+            return index
+        DorfDaten._schreibe_meta(meta_datei, {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "geprueft": time.time(),
+        })
+        # Raster unter der mtime der neuen .gz ablegen, damit es beim nächsten Start zu ihr gehört
+        DorfDaten._speichere_index(index, DorfDaten._raster_datei(datei, mtime))
+        return index
+
+    @staticmethod
+    def _lies_meta(meta_datei: str) -> dict:
+        try:
+            with open(meta_datei, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            return meta if isinstance(meta, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _schreibe_meta(meta_datei: str, meta: dict):
+        try:
+            with open(meta_datei, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+        except OSError as e:
+            print(f"[WARNUNG] Cache-Metadaten konnten nicht gespeichert werden: {e}")
+
+    @staticmethod
+    def vergessen():
+        """Vergisst die im Prozess gemerkten Zuordnungen (der Plattencache bleibt)."""
+        _memo.clear()
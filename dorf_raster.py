@@ -0,0 +1,76 @@
+from typing import Dict, List, Tuple
+
+
+def parse_koord(koord: str) -> Tuple[int, int]:
+    x, y = koord.split("|")
+    return int(x), int(y)
+
+
+def kontinent_von(koord: str) -> int:
+    """Kontinent wie im Spiel: K = Hunderter von y, dann Hunderter von x (500|430 -> K45)."""
+    x, y = parse_koord(koord)
+    return (y // 100) * 10 + x // 100
+
+
+class DorfRaster:
+    """
+    Gleichmäßiges Raster über die eigenen Dörfer.
+    Wird einmal pro Berechnung aufgebaut und liefert pro Angriff nur die Dörfer,
+    die innerhalb eines Radius um das Ziel liegen.
+    """
+
+    ZELLE = 20
+
+    def __init__(self, koordinaten: List[str], zelle: int = ZELLE):
+        self.zelle = zelle
+        self.punkte: List[Tuple[int, int]] = [parse_koord(k) for k in koordinaten]
+        self._zellen: Dict[Tuple[int, int], List[int]] = {}
+
+        for idx, (x, y) in enumerate(self.punkte):
+            self._zellen.setdefault((x // zelle, y // zelle), []).append(idx)
+
+    def __len__(self) -> int:
+        return len(self.punkte)
+
+    def hinzufuegen(self, koord: str) -> int:
+        """Fügt ein Dorf hinten an (neuer Index = bisherige Länge)."""
+        idx = len(self.punkte)
+        x, y = parse_koord(koord)
+        self.punkte.append((x, y))
+        self._zellen.setdefault((x // self.zelle, y // self.zelle), []).append(idx)
+        return idx
+
+    def im_umkreis(self, ziel_koord: str, radius: float) -> List[int]:
+        """
+        Indizes aller Dörfer mit Distanz <= radius zum Ziel, in Eingabereihenfolge
+        (wichtig, damit Gleichstände wie bisher nach Dorf-Reihenfolge aufgelöst werden).
+        """
+        if radius < 0 or not self.punkte:
+            return []
+
+        zx, zy = parse_koord(ziel_koord)
+        r2 = radius * radius
+
+        x_von, x_bis = int((zx - radius) // self.zelle), int((zx + radius) // self.zelle)
+        y_von, y_bis = int((zy - radius) // self.zelle), int((zy + radius) // self.zelle)
+
+        # Großer Radius: lieber direkt über alle belegten Zellen laufen
+        if (x_bis - x_von + 1) * (y_bis - y_von + 1) >= len(self._zellen):
+            zellen = self._zellen.values()
+        else:
+            zellen = [
+                self._zellen[(cx, cy)]
+                for cx in range(x_von, x_bis + 1)
+                for cy in range(y_von, y_bis + 1)
+                if (cx, cy) in self._zellen
+            ]
+
+        treffer = []
+        for indizes in zellen:
+            for idx in indizes:
+                x, y = self.punkte[idx]
+                if (x - zx) ** 2 + (y - zy) ** 2 <= r2:
+                    treffer.append(idx)
+
+        treffer.sort()
+        return treffer
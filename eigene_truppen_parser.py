@@ -1,6 +1,12 @@
-import re
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import Dict, Iterator, List
+
+from einheiten import UnitRegistry
+from zeilen_quelle import iter_zeilen
+
+# Spalten der Truppenübersicht ("eigene"-Zeile), mit und ohne Bogenschützen-Welt
+SPALTEN = UnitRegistry.standard().spalten(bogenschuetzen=False)
+SPALTEN_BOGEN = UnitRegistry.standard().spalten(bogenschuetzen=True)
 
 @dataclass
 class EigenesDorf:
@@ -8,40 +14,116 @@ class EigenesDorf:
     koordinaten: str
     truppen: Dict[str, int]
     rest_truppen: Dict[str, int] | None = None
+    kontinent: int | None = None
 
 class EigeneTruppenParser:
+    VERSION = 2  # bei geändertem Parse-Ergebnis erhöhen (Schlüssel im ParseCache)
+
     @staticmethod
-    def parse(text: str) -> List[EigenesDorf]:
-        doerfer = []
+    def parse(text: str, bogenschuetzen: bool = False) -> List[EigenesDorf]:
+        return list(EigeneTruppenParser.iter_parse(text, bogenschuetzen))
 
-        # Muster: Dorfname (xxx|yyy) Kxx eigene <truppen...>
-        dorf_block_pattern = re.compile(r'(.*?)\((\d{3}\|\d{3})\)\s*K\d+\s*eigene\s*([\d\s]+)')
+    @staticmethod
+    def _kopf(kopf: str):
+        """'Dorfname (xxx|yyy) Kxx' -> (Name, Koordinaten, Kontinent) oder None."""
+        kopf = kopf.rstrip()
+        k = len(kopf)
+        while k and kopf[k - 1].isdecimal():
+            k -= 1
+        if k == len(kopf) or k == 0 or kopf[k - 1] != "K":
+            return None
+        koord_teil = kopf[:k - 1].rstrip()
+        if len(koord_teil) < 9 or koord_teil[-9] != "(" or koord_teil[-1] != ")" or koord_teil[-5] != "|":
+            return None
+        koord = koord_teil[-8:-1]
+        if not (koord[:3].isdecimal() and koord[4:].isdecimal()):
+            return None
+        return koord_teil[:-9].strip(), koord, int(kopf[k:])
 
-        for match in dorf_block_pattern.finditer(text):
-            name = match.group(1).strip()
-            koord = match.group(2)
-            truppen_raw = match.group(3).strip()
+    @staticmethod
+    def iter_parse(quelle, bogenschuetzen: bool = False) -> Iterator[EigenesDorf]:
+        """
+        Ein Durchlauf über die Zeilen aus str, Datei oder mmap (siehe iter_zeilen):
+        'Dorfname (xxx|yyy) Kxx eigene <Truppen...>'. Kopf, "eigene" und Truppenwerte dürfen auf
+        mehrere Zeilen umbrechen (ein unvollständiges Dorf am Zeilenende wird in die nächste Zeile
+        übertragen), und eine Zeile darf mehrere Dörfer enthalten. Ohne Ausgabe pro Dorf; Dörfer mit
+        zu wenigen Werten werden übersprungen und am Ende einmal gemeldet.
+        bogenschuetzen: Truppenspalten einer Welt mit (berittenen) Bogenschützen (SPALTEN_BOGEN).
+        """
+        spalten = SPALTEN_BOGEN if bogenschuetzen else SPALTEN
+        anzahl = len(spalten)
+        kopf_von = EigeneTruppenParser._kopf
+        uebersprungen = []
+        # Unvollständiges Dorf vom Zeilenende: Kopf, ggf. mit "eigene" und ersten Werten
+        uebertrag = ""
+        wartet_auf_eigene = False
 
-            # Truppen aufteilen (alle Zahlen)
-            truppen_split = list(filter(None, re.split(r'\s+', truppen_raw)))
+        for zeile in iter_zeilen(quelle):
+            if uebertrag:
+                anfang = zeile.lstrip()
+                if not anfang:
+                    continue
+                if anfang.startswith("eigene") if wartet_auf_eigene else anfang[0].isdecimal():
+                    zeile = f"{uebertrag} {zeile}"
+                elif not wartet_auf_eigene:
+                    uebersprungen.append(EigeneTruppenParser._dorf_text(uebertrag))
+                uebertrag = ""
 
-            if len(truppen_split) < 8:
-                print(f"WARNUNG: Dorf '{name}' ({koord}) hat unerwartet wenig Werte: {truppen_split}")
-                continue
+            while True:
+                # "eigene" kann auch im Dorfnamen stehen -> erstes Vorkommen mit gültigem Kopf davor
+                pos = zeile.find("eigene")
+                kopf = None
+                while pos >= 0:
+                    kopf = kopf_von(zeile[:pos])
+                    if kopf:
+                        break
+                    pos = zeile.find("eigene", pos + 1)
+                if not kopf:
+                    # Kopf am Zeilenende, "eigene" folgt in der nächsten Zeile
+                    if kopf_von(zeile):
+                        uebertrag, wartet_auf_eigene = zeile, True
+                    break
 
-            truppen = {
-                "Speerträger": int(truppen_split[0]),
-                "Schwertkämpfer": int(truppen_split[1]),
-                "Axtkämpfer": int(truppen_split[2]),
-                "Späher": int(truppen_split[3]),
-                "Leichte Kavallerie": int(truppen_split[4]),
-                "Schwere Kavallerie": int(truppen_split[5]),
-                "Rammböcke": int(truppen_split[6]),
-                "Katapulte": int(truppen_split[7])
-            }
+                teile = zeile[pos + 6:].split(None, anzahl)
+                n = 0
+                while n < anzahl and n < len(teile) and teile[n].isdecimal():
+                    n += 1
 
-            print(f"Gelesen: {name} ({koord}) -> {truppen}")
+                name, koord, kontinent = kopf
+                if n == anzahl:
+                    yield EigenesDorf(
+                        dorf_name=name, koordinaten=koord, truppen=dict(zip(spalten, map(int, teile[:anzahl]))), kontinent=kontinent
+                    )
+                    # Rest der Zeile; weitere Spalten (Paladin, AG ...) gehören noch zu diesem Dorf
+                    zeile = teile[anzahl] if len(teile) > anzahl else ""
+                    while zeile[:1].isdecimal():
+                        zahl = zeile.split(None, 1)
+                        if not zahl[0].isdecimal():
+                            break
+                        zeile = zahl[1] if len(zahl) > 1 else ""
+                elif n == len(teile):
+                    # Zeile endet mitten in den Werten, sie gehen in der nächsten Zeile weiter
+                    uebertrag, wartet_auf_eigene = zeile, False
+                    break
+                else:
+                    uebersprungen.append(f"{name} ({koord})")
+                    zeile = zeile[pos + 6:].split(None, n)[-1]
 
-            doerfer.append(EigenesDorf(dorf_name=name, koordinaten=koord, truppen=truppen))
+        if uebertrag and not wartet_auf_eigene:
+            uebersprungen.append(EigeneTruppenParser._dorf_text(uebertrag))
+        if uebersprungen:
+            print(
+                f"WARNUNG: {len(uebersprungen)} Dorf/Dörfer mit unerwartet wenig Werten übersprungen "
+                f"(erwartet {anzahl}): {', '.join(uebersprungen[:5])}{' ...' if len(uebersprungen) > 5 else ''}"
+            )
 
-        return doerfer
\ No newline at end of file
+    @staticmethod
+    def _dorf_text(uebertrag: str) -> str:
+        """'Name (xxx|yyy)' eines übertragenen, unvollständigen Dorfes für die Warnung."""
+        pos = uebertrag.find("eigene")
+        while pos >= 0:
+            kopf = EigeneTruppenParser._kopf(uebertrag[:pos])
+            if kopf:
+                return f"{kopf[0]} ({kopf[1]})"
+            pos = uebertrag.find("eigene", pos + 1)
+        return uebertrag.strip()
@@ -1,38 +1,39 @@
 # einheiten.py
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Iterator, List
 
-# Basislaufzeiten pro Feld bei Weltgeschwindigkeit = 1 und Einheitengeschwindigkeit = 1
-laufzeiten_pro_feld = {
-    "Speerträger": 18,
-    "Schwertkämpfer": 22,
-    "Axtkämpfer": 18,
-    "Späher": 9,
-    "Leichte Kavallerie": 10,
-    "Schwere Kavallerie": 11,
-    "Rammböcke": 30,
-    "Katapulte": 30
-}
-
-# Alias-Namen (z. B. aus GUI, User-Eingaben, DSUltimate) → korrekter Name im Dictionary
-einheiten_aliases = {
-    "speertraeger": "Speerträger",
-    "speerträger": "Speerträger",
-    "schwertkaempfer": "Schwertkämpfer",
-    "schwertkämpfer": "Schwertkämpfer",
-    "axtkaempfer": "Axtkämpfer",
-    "axtkämpfer": "Axtkämpfer",
-    "spaeher": "Späher",
-    "späher": "Späher",
-    "leichte kavallerie": "Leichte Kavallerie",
-    "schwere kavallerie": "Schwere Kavallerie",
-    "rammboecke": "Rammböcke",
-    "rammböcke": "Rammböcke",
-    "katapulte": "Katapulte"
-}
 
+@dataclass(frozen=True)
+class Einheit:
+    name: str                 # deutscher Name wie in der Truppenübersicht
+    ds_key: str               # Name im Spiel (unit_info, village.txt) und bei DS-Ultimate
+    minuten_pro_feld: float   # bei Weltgeschwindigkeit = 1 und Einheitengeschwindigkeit = 1
+    dsu_id: int               # slowest_unit im DS-Ultimate-Angriffsplaner
+    index: int = -1           # dichte Spalte (Ledger, Registry), vergibt UnitRegistry
+    bogen: bool = False       # nur auf Welten mit Bogenschützen
+    uebersicht: bool = True   # eigene Spalte vor den Katapulten in der Truppenübersicht
+    aktiv: bool = True        # auf der Welt vorhanden (siehe UnitRegistry.aus_welt)
 
-def get_laufzeit(name: str, welt_speed: float = 1.0, einheiten_speed: float = 1.0, boost_multiplier: float = 1.0) -> float:
-    # zuerst Normalisierung: lowercase + Sonderzeichen ersetzen
-    key = (
+
+# Alle Einheiten in Spiel-Reihenfolge; die Reihenfolge bestimmt den dichten Index
+_STANDARD = [
+    Einheit("Speerträger", "spear", 18, 0),
+    Einheit("Schwertkämpfer", "sword", 22, 1),
+    Einheit("Axtkämpfer", "axe", 18, 2),
+    Einheit("Bogenschützen", "archer", 18, 3, bogen=True),
+    Einheit("Späher", "spy", 9, 4),
+    Einheit("Leichte Kavallerie", "light", 10, 5),
+    Einheit("Berittene Bogenschützen", "marcher", 10, 6, bogen=True),
+    Einheit("Schwere Kavallerie", "heavy", 11, 7),
+    Einheit("Rammböcke", "ram", 30, 8),
+    Einheit("Katapulte", "catapult", 30, 9),
+    Einheit("Paladin", "knight", 10, 10, uebersicht=False),
+    Einheit("Adelsgeschlecht", "snob", 35, 11, uebersicht=False),
+]
+
+
+def _normalisieren(name: str) -> str:
+    return (
         name.strip()
         .lower()
         .replace("ä", "ae")
@@ -40,14 +41,134 @@ def get_laufzeit(name: str, welt_speed: float = 1.0, einheiten_speed: float = 1.
         .replace("ü", "ue")
     )
 
-    # Mapping prüfen
-    if key in einheiten_aliases:
-        name = einheiten_aliases[key]
-    else:
-        # Falls nicht im Mapping: versuche trotzdem ersten Buchstaben groß zu schreiben
-        name = key.capitalize()
 
-    if name not in laufzeiten_pro_feld:
-        raise ValueError(f"Einheit '{name}' nicht bekannt (aus Originaleingabe: '{key}')")
+class UnitRegistry:
+    """
+    Alle Einheiten einer Welt mit dichtem Index, Laufzeit, DS-Key und DS-Ultimate-ID.
+    Nachschlagen über den deutschen Namen, den DS-Key oder (nur für Benutzereingaben) einen
+    normalisierten Alias ist jeweils ein dict-Zugriff; die Aliase werden einmal beim Aufbau erzeugt.
+    Der Index ist für alle Welten gleich (aus_welt deaktiviert fehlende Einheiten nur), damit
+    Ledger-Spalten und an Worker-Prozesse übergebene Zeilen unabhängig von der Welt passen.
+    """
+
+    def __init__(self, einheiten: Iterable[Einheit]):
+        self.einheiten = tuple(replace(e, index=idx) for idx, e in enumerate(einheiten))
+        self.namen: List[str] = [e.name for e in self.einheiten]
+        self._nach_name: Dict[str, Einheit] = {e.name: e for e in self.einheiten}
+        self._nach_ds_key: Dict[str, Einheit] = {e.ds_key: e for e in self.einheiten}
+        self._nach_alias: Dict[str, Einheit] = {}
+        for e in self.einheiten:
+            for alias in (e.name.lower(), _normalisieren(e.name), e.ds_key):
+                self._nach_alias.setdefault(alias, e)
+
+    @staticmethod
+    def standard() -> "UnitRegistry":
+        return STANDARD
+
+    @staticmethod
+    def aus_welt(einstellungen) -> "UnitRegistry":
+        """
+        Aus gespeicherten Welteinstellungen (siehe WeltEinstellungen): Laufzeiten aus get_unit_info,
+        auf Geschwindigkeit 1 zurückgerechnet; Einheiten, die die Welt nicht kennt, sind inaktiv.
+        """
+        minuten = einstellungen.minuten_pro_feld
+        if not minuten:
+            return STANDARD
+        faktor = einstellungen.welt_speed * einstellungen.einheiten_speed
+        return UnitRegistry(
+            replace(e, minuten_pro_feld=round(minuten[e.ds_key] * faktor, 6)) if e.ds_key in minuten
+            else replace(e, aktiv=False)
+            for e in STANDARD.einheiten
+        )
+
+    def __len__(self) -> int:
+        return len(self.einheiten)
+
+    def __iter__(self) -> Iterator[Einheit]:
+        return iter(self.einheiten)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._nach_name
+
+    def __getitem__(self, name: str) -> Einheit:
+        return self._nach_name[name]
+
+    def get(self, name: str, default=None):
+        return self._nach_name.get(name, default)
+
+    def index(self, name: str) -> int:
+        return self._nach_name[name].index
+
+    def nach_ds_key(self, ds_key: str) -> Einheit:
+        return self._nach_ds_key[ds_key]
+
+    def suche(self, eingabe: str) -> Einheit | None:
+        """Deutscher Name direkt, sonst Alias (Groß-/Kleinschreibung, ae/oe/ue, DS-Key)."""
+        einheit = self._nach_name.get(eingabe)
+        if einheit is None:
+            einheit = self._nach_alias.get(_normalisieren(eingabe))
+        return einheit
+
+    def spalten(self, bogenschuetzen: bool = False) -> List[str]:
+        """Truppenspalten der Übersicht ("eigene"-Zeile), mit oder ohne Bogenschützen."""
+        return [e.name for e in self.einheiten if e.uebersicht and (bogenschuetzen or not e.bogen)]
+
+
+STANDARD = UnitRegistry(_STANDARD)
+
+# Basislaufzeiten pro Feld bei Weltgeschwindigkeit = 1 und Einheitengeschwindigkeit = 1
+laufzeiten_pro_feld = {e.name: e.minuten_pro_feld for e in STANDARD}
+
+# Alias-Namen (z. B. aus GUI, User-Eingaben, DSUltimate) → korrekter Name im Dictionary
+einheiten_aliases = {alias: e.name for alias, e in STANDARD._nach_alias.items()}
+
+
+def get_laufzeit(name: str, welt_speed: float = 1.0, einheiten_speed: float = 1.0, boost_multiplier: float = 1.0) -> float:
+    einheit = STANDARD.suche(name)
+    if einheit is None:
+        raise ValueError(f"Einheit '{name.strip()}' nicht bekannt (aus Originaleingabe: '{_normalisieren(name)}')")
+
+    return einheit.minuten_pro_feld / (welt_speed * einheiten_speed * boost_multiplier)
+
+
+class TravelTimeTable:
+    """
+    Pro Berechnung einmal kompilierte Laufzeiten (Minuten pro Feld) für feste
+    welt_speed / einheiten_speed / boost_multiplier.
+    Erwartet bereits normalisierte Einheitennamen (Namen der UnitRegistry),
+    damit im Matching keine Alias-Auflösung mehr nötig ist.
+    einheiten: Registry der Welt (Standard: alle Einheiten mit den Basislaufzeiten).
+    """
+
+    def __init__(
+        self,
+        welt_speed: float = 1.0,
+        einheiten_speed: float = 1.0,
+        boost_multiplier: float = 1.0,
+        einheiten: UnitRegistry | None = None
+    ):
+        faktor = welt_speed * einheiten_speed * boost_multiplier
+        self.minuten_pro_feld = {
+            e.name: e.minuten_pro_feld / faktor for e in (einheiten or STANDARD) if e.aktiv
+        }
+        self._langsamste = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.minuten_pro_feld
+
+    def laufzeit(self, name: str) -> float:
+        return self.minuten_pro_feld[name]
 
-    return laufzeiten_pro_feld[name] / (welt_speed * einheiten_speed * boost_multiplier)
+    def langsamste(self, einheiten) -> tuple:
+        """
+        (langsamste Einheit, Laufzeit) für eine Einheiten-Kombination.
+        Bei Gleichstand gewinnt - wie bei max() - die zuerst genannte Einheit.
+        """
+        key = tuple(einheiten)
+        eintrag = self._langsamste.get(key)
+        if eintrag is None:
+            if not key:
+                raise ValueError("Leere Einheiten-Kombination hat keine Laufzeit")
+            name = max(key, key=self.minuten_pro_feld.__getitem__)
+            eintrag = self._langsamste[key] = (name, self.minuten_pro_feld[name])
+        return eintrag
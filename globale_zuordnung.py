@@ -0,0 +1,145 @@
+import heapq
+import time
+from typing import Dict, List, Set, Tuple
+
+
+class GlobaleZuordnung:
+    """
+    Globale Zuordnung Angriffe -> (Dorf, Tab-Variante) als Alternative zum Greedy.
+
+    Modell: bipartiter Graph Angriffe x Dörfer. Pro Angriff bleiben nur wenige Kanten übrig
+    (die nächsten Dörfer und die mit der frühesten Abschickzeit, siehe _kandidaten_fuer).
+    Die Kapazität eines Dorfes ist sein Truppenbestand im Ledger (mehrdimensional, daher
+    kein klassisches Min-Cost-Flow): Angriffe werden mit Augmenting Paths zugeordnet -
+    passt ein Angriff in kein Dorf mehr, wird ein dort bereits eingeplanter Angriff in ein
+    anderes seiner Dörfer verschoben. Das maximiert die Zahl abgedeckter Angriffe; bei
+    gleicher Abdeckung wird immer das nähere Dorf bevorzugt.
+    """
+
+    # Begrenzung pro Augmenting-Suche, damit auch große Pläne in Sekunden fertig werden
+    MAX_TIEFE = 40
+    MAX_BESUCHE = 256
+
+    def __init__(self, kontext, max_doerfer: int = 12):
+        self.kontext = kontext
+        self.max_doerfer = max_doerfer
+        self.kandidaten: List[List[Tuple[int, List[tuple]]]] = []
+        self.zuteilung: Dict[int, Tuple[int, object]] = {}
+        self.am_dorf: Dict[int, Set[int]] = {}
+        self._angriffe = []
+        self._ankunft = []
+
+    def _kandidaten_fuer(self, angriff, ankunft: int) -> Tuple[int, List[Tuple[int, List[tuple]]]]:
+        """
+        (Anzahl erreichbarer Dörfer, dünne Kandidatenliste [(Dorf, [(Abschick, Variante), ...])]):
+        die max_doerfer nächsten Dörfer plus die max_doerfer Dörfer mit der frühesten
+        Abschickzeit (die Wahl des Greedy), nächstes Dorf zuerst.
+        """
+        kontext = self.kontext
+        dorf_indizes, distanzen = kontext.doerfer_in_reichweite(angriff.ziel_koord, kontext.reichweite(ankunft))
+
+        pro_dorf: Dict[int, List[tuple]] = {}
+        distanz_von: Dict[int, float] = {}
+        fruehester: Dict[int, int] = {}
+        for abschick, distanz, dorf_idx, variante in kontext.kandidaten(angriff.ziel_koord, ankunft, dorf_indizes, distanzen):
+            pro_dorf.setdefault(dorf_idx, []).append((abschick, variante))
+            distanz_von[dorf_idx] = distanz
+            if dorf_idx not in fruehester or abschick < fruehester[dorf_idx]:
+                fruehester[dorf_idx] = abschick
+
+        naechste = heapq.nsmallest(self.max_doerfer, pro_dorf, key=lambda d: (distanz_von[d], d))
+        frueheste = heapq.nsmallest(self.max_doerfer, pro_dorf, key=lambda d: (fruehester[d], distanz_von[d], d))
+        auswahl = sorted(set(naechste) | set(frueheste), key=lambda d: (distanz_von[d], d))
+        return len(pro_dorf), [(d, sorted(pro_dorf[d], key=lambda o: o[0])) for d in auswahl]
+
+    def _zuteilen(self, angriff_idx: int, dorf_idx: int, abschick, variante):
+        match = self.kontext.baue_match(
+            self._angriffe[angriff_idx].ziel_koord, self._ankunft[angriff_idx], abschick, dorf_idx, variante
+        )
+        self.kontext.buche(dorf_idx, match)
+        self.zuteilung[angriff_idx] = (dorf_idx, match)
+        self.am_dorf.setdefault(dorf_idx, set()).add(angriff_idx)
+
+    def _freigeben(self, angriff_idx: int):
+        dorf_idx, match = self.zuteilung.pop(angriff_idx)
+        self.kontext.storniere(dorf_idx, match)
+        self.am_dorf[dorf_idx].discard(angriff_idx)
+        return match
+
+    def _wiederherstellen(self, angriff_idx: int, dorf_idx: int, match):
+        self.kontext.buche(dorf_idx, match)
+        self.zuteilung[angriff_idx] = (dorf_idx, match)
+        self.am_dorf[dorf_idx].add(angriff_idx)
+
+    def _erste_passende(self, dorf_idx: int, optionen):
+        for abschick, variante in optionen:
+            if self.kontext.passt(dorf_idx, variante) and self.kontext.sende_slots.frei(abschick):
+                return abschick, variante
+        return None
+
+    def _erweitern(self, angriff_idx: int, besucht: Set[int], tiefe: int = 0) -> bool:
+        optionen = self.kandidaten[angriff_idx]
+
+        # 1. Dorf mit freier Kapazität (nächstes zuerst)
+        for dorf_idx, varianten in optionen:
+            if dorf_idx in besucht:
+                continue
+            treffer = self._erste_passende(dorf_idx, varianten)
+            if treffer:
+                self._zuteilen(angriff_idx, dorf_idx, *treffer)
+                return True
+
+        if tiefe >= GlobaleZuordnung.MAX_TIEFE:
+            return False
+
+        # 2. Einen dort eingeplanten Angriff in eines seiner anderen Dörfer verschieben
+        for dorf_idx, varianten in optionen:
+            if dorf_idx in besucht or len(besucht) >= GlobaleZuordnung.MAX_BESUCHE:
+                continue
+            besucht.add(dorf_idx)
+
+            for anderer in sorted(self.am_dorf.get(dorf_idx, ())):
+                match = self._freigeben(anderer)
+                treffer = self._erste_passende(dorf_idx, varianten)
+                if treffer:
+                    # dorf_idx ist jetzt besucht -> niemand in der Rekursion bucht dort; den Sende-Slot
+                    # von treffer während der Rekursion reservieren, damit er gültig bleibt
+                    slots = self.kontext.sende_slots
+                    slots.belegen(treffer[0])
+                    verschoben = self._erweitern(anderer, besucht, tiefe + 1)
+                    slots.freigeben(treffer[0])
+                    if verschoben:
+                        self._zuteilen(angriff_idx, dorf_idx, *treffer)
+                        return True
+                self._wiederherstellen(anderer, dorf_idx, match)
+
+        return False
+
+    def zuordnen(self, angriffe) -> list:
+        start = time.perf_counter()
+        kontext = self.kontext
+
+        self._angriffe = list(angriffe)
+        self._ankunft = [kontext.ankunft(a) for a in self._angriffe]
+        erreichbar = []
+        self.kandidaten = []
+        for angriff, ankunft in zip(self._angriffe, self._ankunft):
+            anzahl, kandidaten = self._kandidaten_fuer(angriff, ankunft)
+            erreichbar.append(anzahl)
+            self.kandidaten.append(kandidaten)
+
+        # Am stärksten eingeschränkte Angriffe (wenigste erreichbare Dörfer) zuerst
+        reihenfolge = sorted(
+            (i for i, k in enumerate(self.kandidaten) if k),
+            key=lambda i: (erreichbar[i], i)
+        )
+        # Mindestabstand: kontext.sende_slots, jede Zuteilung belegt ihren Slot
+        for angriff_idx in reihenfolge:
+            self._erweitern(angriff_idx, set())
+
+        matches = [self.zuteilung[i][1] for i in range(len(self._angriffe)) if i in self.zuteilung]
+        print(
+            f"[INFO] Globale Zuordnung: {len(matches)}/{len(self._angriffe)} Angriffe abgedeckt "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+        return matches
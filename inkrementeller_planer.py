@@ -0,0 +1,339 @@
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Set, Tuple
+
+from distanz_rechner import DistanzRechner
+from dorf_raster import DorfRaster, parse_koord
+from tab_matching import Angriff, MatchKontext, TabMatch
+from truppen_ledger import TruppenLedger
+import zeit
+
+
+@dataclass
+class PlanDiff:
+    """Änderungen am Plan durch eine Aktualisierung (ein umgeplanter Angriff steht in beiden Listen)."""
+    neu: List[TabMatch] = field(default_factory=list)
+    entfernt: List[TabMatch] = field(default_factory=list)
+
+
+class _AngriffsRaster:
+    """
+    Offene Angriffe nach Zielkoordinate in Rasterzellen (wie DorfRaster), damit nach einer
+    Änderung nur die Angriffe rund um die Dörfer mit frei gewordenen Truppen geprüft werden.
+    """
+
+    def __init__(self, zelle: int = DorfRaster.ZELLE):
+        self.zelle = zelle
+        self._zellen: Dict[Tuple[int, int], Set[int]] = {}
+
+    def _zelle_von(self, koord: str) -> Tuple[int, int]:
+        x, y = parse_koord(koord)
+        return x // self.zelle, y // self.zelle
+
+    def hinzufuegen(self, angriff_id: int, koord: str):
+        self._zellen.setdefault(self._zelle_von(koord), set()).add(angriff_id)
+
+    def entfernen(self, angriff_id: int, koord: str):
+        zelle = self._zelle_von(koord)
+        ids = self._zellen.get(zelle)
+        if ids is not None:
+            ids.discard(angriff_id)
+            if not ids:
+                del self._zellen[zelle]
+
+    def im_umkreis(self, koord: str, radius: float) -> Set[int]:
+        """Angriffe in allen Zellen, die den Kreis um koord berühren (grob, Distanz prüft der Aufrufer)."""
+        if radius < 0 or not self._zellen:
+            return set()
+
+        x, y = parse_koord(koord)
+        x_von, x_bis = int((x - radius) // self.zelle), int((x + radius) // self.zelle)
+        y_von, y_bis = int((y - radius) // self.zelle), int((y + radius) // self.zelle)
+
+        if (x_bis - x_von + 1) * (y_bis - y_von + 1) >= len(self._zellen):
+            zellen = self._zellen.values()
+        else:
+            zellen = [
+                self._zellen[(cx, cy)]
+                for cx in range(x_von, x_bis + 1)
+                for cy in range(y_von, y_bis + 1)
+                if (cx, cy) in self._zellen
+            ]
+        return set().union(*zellen)
+
+
+class InkrementellerPlaner:
+    """
+    Hält einen Tab-Plan über mehrere Berechnungen hinweg (Zuordnung + Truppen-Ledger) und
+    arbeitet nur Änderungen ein: neue/entfallene Angriffe und geänderte, neue oder entfallene Dörfer.
+    Neu geplant werden nur die betroffenen Angriffe - neue Angriffe, Angriffe, deren Dorf
+    Truppen verloren hat, und offene Angriffe in Reichweite eines Dorfes mit frei gewordenen
+    Truppen. Alle anderen Tabs bleiben unverändert.
+    """
+
+    def __init__(
+        self,
+        eigene_dörfer,
+        tabgroessen_liste: List[Dict[str, int]],
+        welt_speed: float = 1.0,
+        einheiten_speed: float = 1.0,
+        zeitfenster_liste=None,
+        boost_level: float = 1.0,
+        auto_speed_units: Dict[str, bool] | None = None,
+        auto_scouts_enabled: bool = True,
+        auto_scouts_count: int = 5,
+        min_send_interval_seconds: int = 0,
+        zeitfenster_regeln=None,
+        einheiten=None
+    ):
+        self.kontext = MatchKontext(
+            [], eigene_dörfer, tabgroessen_liste,
+            welt_speed=welt_speed,
+            einheiten_speed=einheiten_speed,
+            zeitfenster_liste=zeitfenster_liste,
+            boost_level=boost_level,
+            enabled_speed_units=MatchKontext.aktive_speed_einheiten(auto_speed_units),
+            auto_scouts_enabled=auto_scouts_enabled,
+            auto_scouts_count=auto_scouts_count,
+            zeitfenster_regeln=zeitfenster_regeln,
+            min_send_interval_seconds=min_send_interval_seconds,
+            einheiten=einheiten
+        )
+        self.dorf_index: Dict[str, int] = {dorf.koordinaten: idx for idx, dorf in enumerate(self.kontext.doerfer)}
+
+        # Angriffe bekommen eine laufende ID (Eingangsreihenfolge), gleiche SOS-Zeilen sind erlaubt
+        self.angriffe: Dict[int, Angriff] = {}
+        self.zuteilung: Dict[int, Tuple[int, TabMatch]] = {}
+        self.am_dorf: Dict[int, Set[int]] = {}
+        self._schluessel: Dict[tuple, List[int]] = {}
+        self._naechste_id = 0
+        # Offene (nicht zugeteilte) Angriffe räumlich, plus späteste Ankunft als Obergrenze der Reichweite
+        self._offen_raster = _AngriffsRaster()
+        self._spaeteste_ankunft: int | None = None
+
+    @property
+    def matches(self) -> List[TabMatch]:
+        """Aktueller Plan in Eingangsreihenfolge der Angriffe."""
+        return [self.zuteilung[i][1] for i in self.angriffe if i in self.zuteilung]
+
+    @property
+    def offene_angriffe(self) -> List[Angriff]:
+        return [a for i, a in self.angriffe.items() if i not in self.zuteilung]
+
+    def _schluessel_von(self, angriff) -> tuple:
+        return angriff.ziel_koord, self.kontext.ankunft(angriff)
+
+    def _registriere(self, angriff) -> int:
+        angriff_id = self._naechste_id
+        self._naechste_id += 1
+        self.angriffe[angriff_id] = angriff
+        self._schluessel.setdefault(self._schluessel_von(angriff), []).append(angriff_id)
+        self._offen_raster.hinzufuegen(angriff_id, angriff.ziel_koord)
+        ankunft = self.kontext.ankunft(angriff)
+        if self._spaeteste_ankunft is None or ankunft > self._spaeteste_ankunft:
+            self._spaeteste_ankunft = ankunft
+        self.kontext.horizont_erweitern(ankunft)
+        return angriff_id
+
+    def _zuteilen(self, angriff_id: int, dorf_idx: int, match: TabMatch):
+        self.kontext.buche(dorf_idx, match)
+        self.zuteilung[angriff_id] = (dorf_idx, match)
+        self.am_dorf.setdefault(dorf_idx, set()).add(angriff_id)
+        self._offen_raster.entfernen(angriff_id, self.angriffe[angriff_id].ziel_koord)
+
+    def _freigeben(self, angriff_id: int) -> Tuple[int, TabMatch]:
+        dorf_idx, match = self.zuteilung.pop(angriff_id)
+        self.kontext.storniere(dorf_idx, match)
+        self.am_dorf[dorf_idx].discard(angriff_id)
+        if angriff_id in self.angriffe:
+            self._offen_raster.hinzufuegen(angriff_id, self.angriffe[angriff_id].ziel_koord)
+        return dorf_idx, match
+
+    def _plane(self, angriff_id: int) -> TabMatch | None:
+        angriff = self.angriffe[angriff_id]
+        ankunft = self.kontext.ankunft(angriff)
+        bester = self.kontext.bester_kandidat(angriff.ziel_koord, ankunft)
+        if not bester:
+            return None
+
+        abschick, _, dorf_idx, variante = bester
+        match = self.kontext.baue_match(angriff.ziel_koord, ankunft, abschick, dorf_idx, variante)
+        self._zuteilen(angriff_id, dorf_idx, match)
+        return match
+
+    def _fehlbestand(self, dorf_idx: int) -> bool:
+        """Ob ein Tab-Bestand des Dorfes negativ ist. Auto-Späher zählen nicht, sie kürzt _spaeher_kuerzen."""
+        return any(menge < 0 for name, menge in self.kontext.ledger.zeile(dorf_idx).items() if name != "Späher")
+
+    def _spaeher_kuerzen(self, dorf_idx: int, diff: PlanDiff):
+        """
+        Fehlen nur Späher, bleiben die Tabs bestehen: die Auto-Späher der spätestens abzuschickenden
+        Tabs werden gekürzt (wie beim Planen: so viele wie vorhanden), geänderte Tabs stehen im Diff.
+        """
+        ledger = self.kontext.ledger
+        spaeher_idx = self.kontext.spaeher_idx
+        fehlend = -ledger.bestand(dorf_idx, spaeher_idx)
+        if fehlend <= 0:
+            return
+
+        spaeteste_zuerst = sorted(
+            self.am_dorf.get(dorf_idx, ()), key=lambda i: (self.zuteilung[i][1].abschick_ms, i), reverse=True
+        )
+        for angriff_id in spaeteste_zuerst:
+            alt = self.zuteilung[angriff_id][1]
+            anzahl = alt.einheiten.get("Späher", 0)
+            if not anzahl:
+                continue
+            weniger = min(anzahl, fehlend)
+            einheiten = dict(alt.einheiten)
+            if anzahl > weniger:
+                einheiten["Späher"] = anzahl - weniger
+            else:
+                del einheiten["Späher"]
+            neu = replace(alt, herkunft=self.kontext.doerfer[dorf_idx], einheiten=einheiten)
+            ledger.gutschreiben(dorf_idx, ((spaeher_idx, weniger),))
+            self.zuteilung[angriff_id] = (dorf_idx, neu)
+            diff.entfernt.append(alt)
+            diff.neu.append(neu)
+            fehlend -= weniger
+            if not fehlend:
+                break
+
+    def _offen_in_reichweite(self, dorf_indizes: Set[int]) -> Set[int]:
+        """
+        Offene Angriffe, die mindestens eines der Dörfer rechtzeitig erreicht. Über das Raster werden
+        nur Angriffe im Umkreis der größten Reichweite (späteste Ankunft) geprüft, nicht alle offenen.
+        """
+        if self._spaeteste_ankunft is None:
+            return set()
+        radius = self.kontext.reichweite(self._spaeteste_ankunft)
+        treffer = set()
+        for dorf_idx in dorf_indizes:
+            dorf_koord = self.kontext.doerfer[dorf_idx].koordinaten
+            for angriff_id in self._offen_raster.im_umkreis(dorf_koord, radius) - treffer:
+                angriff = self.angriffe[angriff_id]
+                reichweite = self.kontext.reichweite(self.kontext.ankunft(angriff))
+                if DistanzRechner.berechne_distanz(dorf_koord, angriff.ziel_koord) <= reichweite:
+                    treffer.add(angriff_id)
+        return treffer
+
+    def uebernehme(self, angriffe: Iterable[Angriff], matches: Iterable[TabMatch]):
+        """
+        Übernimmt einen fertigen Plan (z.B. aus TabMatching.finde_tabs) als Ausgangszustand,
+        ohne neu zu rechnen. Matches werden über (Ziel, Ankunft) ihren Angriffen zugeordnet.
+        """
+        for angriff in angriffe:
+            self._registriere(angriff)
+
+        for match in matches:
+            kandidaten = self._schluessel.get((match.ziel_koord, match.ankunft_ms), [])
+            angriff_id = next((i for i in kandidaten if i not in self.zuteilung), None)
+            dorf_idx = self.dorf_index.get(match.herkunft.koordinaten)
+            if angriff_id is None or dorf_idx is None:
+                print(f"[WARN] Tab {match.herkunft.koordinaten} -> {match.ziel_koord} passt zu keinem Angriff/Dorf")
+                continue
+            self._zuteilen(angriff_id, dorf_idx, match)
+
+    def aktualisiere(
+        self,
+        neue_angriffe: Iterable[Angriff] = (),
+        entfernte_angriffe: Iterable[Angriff] = (),
+        geaenderte_doerfer: Iterable = (),
+        entfernte_doerfer: Iterable[str] = ()
+    ) -> PlanDiff:
+        """
+        Arbeitet ein Delta in den Plan ein und gibt die geänderten Tabs zurück.
+        Geänderte Dörfer werden über ihre Koordinaten erkannt, unbekannte Koordinaten sind neue Dörfer.
+        entfernte_doerfer: Koordinaten von Dörfern, die nicht mehr in der Truppenübersicht stehen;
+        ihre Tabs werden aufgegeben und der Bestand auf 0 gesetzt.
+        """
+        start = time.perf_counter()
+        kontext = self.kontext
+        kontext.now_ms = zeit.jetzt_ms()
+
+        diff = PlanDiff()
+        # Angriff -> (Dorf, Tab) vor der Freigabe, um unverändert neu geplante Tabs zu erkennen
+        freigegeben: Dict[int, Tuple[int, TabMatch]] = {}
+        offen: Set[int] = set()
+        frei: Set[int] = set()
+
+        for angriff in entfernte_angriffe:
+            ids = self._schluessel.get(self._schluessel_von(angriff), [])
+            if not ids:
+                print(f"[WARN] Zu entfernender Angriff auf {angriff.ziel_koord} ist nicht im Plan")
+                continue
+            # Lieber einen offenen Angriff streichen als einen eingeplanten
+            angriff_id = next((i for i in ids if i not in self.zuteilung), ids[-1])
+            ids.remove(angriff_id)
+            del self.angriffe[angriff_id]
+            offen.discard(angriff_id)
+            if angriff_id in self.zuteilung:
+                dorf_idx, match = self._freigeben(angriff_id)
+                diff.entfernt.append(match)
+                frei.add(dorf_idx)
+            else:
+                self._offen_raster.entfernen(angriff_id, angriff.ziel_koord)
+
+        for koord in entfernte_doerfer:
+            dorf_idx = self.dorf_index.get(koord)
+            if dorf_idx is None:
+                print(f"[WARN] Zu entfernendes Dorf {koord} ist nicht im Plan")
+                continue
+            for angriff_id in sorted(self.am_dorf.get(dorf_idx, ())):
+                freigegeben[angriff_id] = self._freigeben(angriff_id)
+                diff.entfernt.append(freigegeben[angriff_id][1])
+                offen.add(angriff_id)
+            # Index bleibt reserviert, taucht das Dorf wieder auf, zählt es als geändertes Dorf
+            kontext.ledger.setze_dorf(dorf_idx, {})
+            frei.discard(dorf_idx)
+
+        for dorf in geaenderte_doerfer:
+            dorf_idx = self.dorf_index.get(dorf.koordinaten)
+            if dorf_idx is None:
+                dorf_idx = kontext.dorf_hinzufuegen(dorf)
+                self.dorf_index[dorf.koordinaten] = dorf_idx
+                frei.add(dorf_idx)
+                continue
+
+            # Neuer Bestand minus das, was bereits geplante Tabs aus diesem Dorf binden
+            kontext.doerfer[dorf_idx] = dorf
+            kontext.ledger.setze_dorf(dorf_idx, dorf.truppen)
+            for angriff_id in self.am_dorf.get(dorf_idx, ()):
+                kontext.ledger.abbuchen(dorf_idx, TruppenLedger.bedarf(self.zuteilung[angriff_id][1].einheiten))
+
+            # Zu wenig Truppen: spätestens abzuschickende Tabs zuerst aufgeben
+            while self.am_dorf.get(dorf_idx) and self._fehlbestand(dorf_idx):
+                angriff_id = max(self.am_dorf[dorf_idx], key=lambda i: (self.zuteilung[i][1].abschick_ms, i))
+                freigegeben[angriff_id] = self._freigeben(angriff_id)
+                diff.entfernt.append(freigegeben[angriff_id][1])
+                offen.add(angriff_id)
+            self._spaeher_kuerzen(dorf_idx, diff)
+            frei.add(dorf_idx)
+
+        for angriff in neue_angriffe:
+            offen.add(self._registriere(angriff))
+
+        # Offene Angriffe nur dann erneut versuchen, wenn ein Dorf mit freien Truppen sie erreicht
+        if frei:
+            offen |= self._offen_in_reichweite(frei)
+
+        for angriff_id in sorted(offen):
+            match = self._plane(angriff_id)
+            if match is None:
+                continue
+            if angriff_id in freigegeben:
+                alt_idx, alt = freigegeben[angriff_id]
+                # Gleicher Tab wie vorher -> keine Änderung (herkunft ist nach einer
+                # Truppenänderung ein neues Dorf-Objekt und zählt deshalb nicht mit)
+                if (alt_idx, alt.abschick_ms, alt.einheiten) == (
+                    self.zuteilung[angriff_id][0], match.abschick_ms, match.einheiten
+                ):
+                    diff.entfernt.remove(alt)
+                    continue
+            diff.neu.append(match)
+
+        print(
+            f"[INFO] Plan aktualisiert: +{len(diff.neu)} / -{len(diff.entfernt)} Tabs "
+            f"({len(offen)} Angriffe neu bewertet) in {time.perf_counter() - start:.3f}s"
+        )
+        return diff
@@ -0,0 +1,134 @@
+import mmap
+import os
+from array import array
+from collections.abc import Mapping
+from typing import Iterable, List
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ist optional
+    np = None
+
+GROESSE = 1000  # Koordinaten 000-999 in x und y
+
+
+class KoordIndex(Mapping):
+    """
+    Koord -> Dorf-ID als dichtes int32-Raster zelle[x * 1000 + y] (0 = kein Dorf), 4 MB pro Welt.
+    Wird als Rohdatei gespeichert und per mmap geladen, ohne zehntausende String-Schlüssel.
+    Mit NumPy ist raster[x, y] ein (memmap-)Array und ids() löst alle Koordinaten in einem Schritt auf.
+    Verhält sich sonst wie ein dict mit Schlüsseln "xxx|yyy".
+    """
+
+    def __init__(self, zellen, vollstaendig: bool = True):
+        self._zellen = zellen
+        self.raster = zellen.reshape(GROESSE, GROESSE) if np is not None else None
+        # False, wenn aus_zeilen nach den benötigten Koordinaten vorzeitig aufgehört hat
+        self.vollstaendig = vollstaendig
+
+    @staticmethod
+    def aus_zeilen(zeilen: Iterable[str | bytes], benoetigt: Iterable[str] | None = None) -> "KoordIndex":
+        """
+        Aus den Zeilen (str oder bytes) von village.txt: id,name,x,y,spieler,punkte,rang.
+        benoetigt: hört auf, sobald alle diese Koordinaten gefunden sind (Index dann unvollständig).
+        """
+        zellen = array("i", bytes(4 * GROESSE * GROESSE))
+        offen = None
+        if benoetigt is not None:
+            offen = set()
+            for koord in benoetigt:
+                try:
+                    offen.add(KoordIndex._zelle(koord))
+                except ValueError:
+                    continue
+
+        vollstaendig = True
+        for zeile in zeilen:
+            if offen is not None and not offen:
+                vollstaendig = False
+                break
+            teile = zeile.split(b"," if isinstance(zeile, bytes) else ",", 4)
+            if len(teile) < 4:
+                continue
+            try:
+                dorf_id, x, y = int(teile[0]), int(teile[2]), int(teile[3])
+            except ValueError:
+                continue
+            if 0 <= x < GROESSE and 0 <= y < GROESSE:
+                zelle = x * GROESSE + y
+                zellen[zelle] = dorf_id
+                if offen is not None:
+                    offen.discard(zelle)
+
+        if np is not None:
+            return KoordIndex(np.frombuffer(zellen, dtype=np.int32), vollstaendig)
+        return KoordIndex(zellen, vollstaendig)
+
+    @staticmethod
+    def laden(pfad: str) -> "KoordIndex":
+        if os.path.getsize(pfad) != 4 * GROESSE * GROESSE:
+            raise ValueError(f"Koordinaten-Index hat falsche Größe: {pfad}")
+        if np is not None:
+            return KoordIndex(np.memmap(pfad, dtype=np.int32, mode="r"))
+        with open(pfad, "rb") as datei:
+            return KoordIndex(memoryview(mmap.mmap(datei.fileno(), 0, access=mmap.ACCESS_READ)).cast("i"))
+
+    def speichern(self, pfad: str):
+        tmp = pfad + ".tmp"
+        with open(tmp, "wb") as datei:
+            datei.write(memoryview(self._zellen).cast("B"))
+        os.replace(tmp, pfad)
+
+    @staticmethod
+    def _zelle(koord: str) -> int:
+        x, _, y = koord.partition("|")
+        x, y = int(x), int(y)
+        if not (0 <= x < GROESSE and 0 <= y < GROESSE):
+            raise ValueError(koord)
+        return x * GROESSE + y
+
+    def ids(self, koordinaten: List[str]) -> List[int]:
+        """Dorf-IDs zu allen Koordinaten in einem Schritt (0 = unbekannt)."""
+        if np is None or not koordinaten:
+            return [self.get(koord, 0) for koord in koordinaten]
+        # Ein String + ein split ist deutlich schneller als ein split pro Koordinate
+        werte = "|".join(koordinaten).replace("|", " ").split()
+        try:
+            if len(werte) != 2 * len(koordinaten):
+                raise ValueError
+            xy = np.array(werte, dtype=np.int32).reshape(-1, 2)
+        except ValueError:  # einzelne ungültige Koordinaten -> einzeln auflösen
+            return [self.get(koord, 0) for koord in koordinaten]
+        gueltig = ((xy >= 0) & (xy < GROESSE)).all(axis=1)
+        ids = np.zeros(len(koordinaten), dtype=np.int32)
+        ids[gueltig] = self.raster[xy[gueltig, 0], xy[gueltig, 1]]
+        return ids.tolist()
+
+    def __getitem__(self, koord: str) -> int:
+        try:
+            dorf_id = int(self._zellen[self._zelle(koord)])
+        except (ValueError, AttributeError):
+            raise KeyError(koord) from None
+        if not dorf_id:
+            raise KeyError(koord)
+        return dorf_id
+
+    def __iter__(self):
+        if np is not None:
+            zellen = np.flatnonzero(self._zellen).tolist()
+        else:
+            zellen = (zelle for zelle, dorf_id in enumerate(self._zellen) if dorf_id)
+        for zelle in zellen:
+            yield f"{zelle // GROESSE:03d}|{zelle % GROESSE:03d}"
+
+    def __len__(self) -> int:
+        if np is not None:
+            return int(np.count_nonzero(self._zellen))
+        return sum(1 for dorf_id in self._zellen if dorf_id)
+
+
+def koord_ids(koord_to_id: Mapping, koordinaten: List[str]) -> List[int]:
+    """IDs zu allen Koordinaten (0 = unbekannt), vektorisiert für KoordIndex, sonst per dict.get."""
+    if isinstance(koord_to_id, KoordIndex):
+        return koord_to_id.ids(koordinaten)
+    return [koord_to_id.get(koord, 0) for koord in koordinaten]
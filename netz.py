@@ -0,0 +1,115 @@
+"""
+Gemeinsame HTTP-Schicht für alle Spiel- und DS-Ultimate-Anfragen: eine requests.Session pro Host
+(Keep-Alive, Verbindungspool), begrenzte Timeouts, Wiederholung mit exponentiellem Backoff bei
+Verbindungsfehlern und 5xx sowie Zähler für Anfragen, Fehler, Dauer und Bytes pro Host.
+"""
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (Verbindungsaufbau, Lesen) in Sekunden - keine Anfrage darf die GUI unbegrenzt blockieren
+TIMEOUT = (5, 30)
+WIEDERHOLUNGEN = 3
+BACKOFF_FAKTOR = 0.5  # Wartezeiten 0 s, 1 s, 2 s, ... (urllib3), Retry-After wird ignoriert
+WIEDERHOLEN_BEI_STATUS = (500, 502, 503, 504)
+POOL_GROESSE = 4
+
+
+@dataclass
+class Statistik:
+    anfragen: int = 0
+    fehler: int = 0
+    sekunden: float = 0.0
+    bytes: int = 0
+
+
+_sessions: Dict[str, requests.Session] = {}
+_statistik: Dict[str, Statistik] = {}
+_lock = threading.Lock()
+
+
+def _host(url: str) -> str:
+    teile = urlsplit(url)
+    return f"{teile.scheme}://{teile.netloc}"
+
+
+def session(url: str) -> requests.Session:
+    """Die (gemeinsame) Session für den Host von url."""
+    host = _host(url)
+    with _lock:
+        s = _sessions.get(host)
+        if s is None:
+            # Status-/Lesefehler nur bei GET wiederholen (POST ist nicht idempotent),
+            # Verbindungsfehler (Anfrage nie angekommen) bei allen Methoden
+            retry = Retry(
+                total=WIEDERHOLUNGEN,
+                backoff_factor=BACKOFF_FAKTOR,
+                status_forcelist=WIEDERHOLEN_BEI_STATUS,
+                allowed_methods=frozenset({"GET", "HEAD"}),
+                respect_retry_after_header=False,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_GROESSE, max_retries=retry)
+            s = requests.Session()
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            _sessions[host] = s
+        return s
+
+
+def anfrage(methode: str, url: str, timeout=TIMEOUT, **kwargs) -> requests.Response:
+    """
+    Wie requests.request über die Session des Hosts. Bei stream=True zählt die Content-Length
+    (der Inhalt wird vom Aufrufer gelesen), sonst die tatsächlich empfangenen Bytes.
+    """
+    start = time.perf_counter()
+    try:
+        response = session(url).request(methode, url, timeout=timeout, **kwargs)
+    except requests.RequestException:
+        _zaehlen(url, time.perf_counter() - start, 0, fehler=True)
+        raise
+
+    if kwargs.get("stream"):
+        groesse = int(response.headers.get("Content-Length") or 0)
+    else:
+        groesse = len(response.content)
+    _zaehlen(url, time.perf_counter() - start, groesse, fehler=response.status_code >= 400)
+    return response
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return anfrage("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return anfrage("POST", url, **kwargs)
+
+
+def _zaehlen(url: str, sekunden: float, groesse: int, fehler: bool):
+    with _lock:
+        statistik = _statistik.setdefault(_host(url), Statistik())
+        statistik.anfragen += 1
+        statistik.fehler += int(fehler)
+        statistik.sekunden += sekunden
+        statistik.bytes += groesse
+
+
+def statistik() -> Dict[str, Statistik]:
+    """Momentaufnahme der Zähler pro Host."""
+    with _lock:
+        return {host: replace(werte) for host, werte in _statistik.items()}
+
+
+def zuruecksetzen():
+    """Schließt alle Sessions und setzt die Zähler zurück."""
+    with _lock:
+        for s in _sessions.values():
+            s.close()
+        _sessions.clear()
+        _statistik.clear()
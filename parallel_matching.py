@@ -0,0 +1,135 @@
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from dorf_raster import kontinent_von, parse_koord
+from eigene_truppen_parser import EigenesDorf
+from truppen_ledger import EINHEITEN
+
+
+def _kandidaten_partition(auftrag: dict) -> List[Tuple[int, list, bool]]:
+    """
+    Worker (eigener Prozess): Kandidaten für die Angriffe einer Partition gegen deren Dörfer
+    (Kontinent + Halo) mit dem Truppenstand vom Start der Berechnung.
+    Liefert pro Angriff die top_k besten (Abschickzeit, Distanz, Dorf-Index, Vorlage, Variante)
+    in Greedy-Reihenfolge und ob die Liste abgeschnitten wurde.
+    """
+    from tab_matching import MatchKontext
+
+    globale_idx = [idx for idx, _, _ in auftrag["doerfer"]]
+    doerfer = [
+        EigenesDorf(dorf_name="", koordinaten=koord, truppen=dict(zip(EINHEITEN, zeile)))
+        for _, koord, zeile in auftrag["doerfer"]
+    ]
+    kontext = MatchKontext([], doerfer, **auftrag["einstellungen"])
+    kontext.now_ms = auftrag["now_ms"]
+    kontext.horizont_erweitern(max(ankunft for _, _, ankunft in auftrag["angriffe"]))
+
+    position = {
+        id(variante): (v, w)
+        for v, varianten in enumerate(kontext.tab_vorlagen)
+        for w, variante in enumerate(varianten)
+    }
+    top_k = auftrag["top_k"]
+
+    ergebnisse = []
+    for angriff_idx, ziel_koord, ankunft in auftrag["angriffe"]:
+        beste = [
+            (abschick, distanz, globale_idx[dorf_idx], *position[id(variante)])
+            for abschick, distanz, dorf_idx, variante in kontext.beste_kandidaten(ziel_koord, ankunft, top_k + 1)
+        ]
+        ergebnisse.append((angriff_idx, beste[:top_k], len(beste) > top_k))
+    return ergebnisse
+
+
+class ParallelesMatching:
+    """
+    Verteilt die Kandidatensuche des Greedy auf mehrere Prozesse.
+    Partitioniert wird nach Kontinent des Ziels; jede Partition bekommt die Dörfer ihres
+    Kontinents plus einen Halo in Höhe der größten Reichweite ihrer Angriffe - damit sieht
+    jeder Worker alle Dörfer, die für seine Angriffe überhaupt in Frage kommen.
+    Die Truppenkonflikte (auch über Kontinentgrenzen) löst danach der normale Greedy-Durchlauf:
+    er nimmt pro Angriff den ersten vorberechneten Kandidaten, den der aktuelle Ledger noch
+    hergibt und dessen Sende-Slot frei ist, und rechnet nur dann komplett neu, wenn alle top_k aufgebraucht sind.
+    Das Ergebnis ist identisch zur sequentiellen Berechnung.
+    """
+
+    def __init__(self, kontext, einstellungen: dict, prozesse: int, top_k: int = 8):
+        self.kontext = kontext
+        self.einstellungen = einstellungen
+        self.prozesse = prozesse
+        self.top_k = top_k
+        self.ergebnisse: Dict[int, Tuple[list, bool]] = {}
+        self.nachberechnet = 0
+
+    def partitionen(self, angriffe) -> List[dict]:
+        kontext = self.kontext
+        ankunft = [kontext.ankunft(a) for a in angriffe]
+
+        nach_kontinent: Dict[int, List[int]] = {}
+        for i, angriff in enumerate(angriffe):
+            nach_kontinent.setdefault(kontinent_von(angriff.ziel_koord), []).append(i)
+
+        punkte = [parse_koord(dorf.koordinaten) for dorf in kontext.doerfer]
+        heimat = [
+            getattr(dorf, "kontinent", None) if getattr(dorf, "kontinent", None) is not None else kontinent_von(dorf.koordinaten)
+            for dorf in kontext.doerfer
+        ]
+
+        # Große Kontinente in mehrere Aufträge teilen, damit alle Prozesse ausgelastet sind
+        stueck = max(1, math.ceil(len(angriffe) / (self.prozesse * 4)))
+
+        auftraege = []
+        for kontinent, indizes in nach_kontinent.items():
+            halo = max(kontext.reichweite(ankunft[i]) for i in indizes)
+            if halo < 0:
+                continue
+
+            x_von, y_von = (kontinent % 10) * 100 - halo, (kontinent // 10) * 100 - halo
+            x_bis, y_bis = x_von + 99 + 2 * halo, y_von + 99 + 2 * halo
+            doerfer = [
+                (idx, kontext.doerfer[idx].koordinaten, tuple(kontext.ledger.zeile(idx).values()))
+                for idx, (x, y) in enumerate(punkte)
+                if heimat[idx] == kontinent or (x_von <= x <= x_bis and y_von <= y <= y_bis)
+            ]
+
+            for start in range(0, len(indizes), stueck):
+                auftraege.append({
+                    "doerfer": doerfer,
+                    "angriffe": [(i, angriffe[i].ziel_koord, ankunft[i]) for i in indizes[start:start + stueck]],
+                    "einstellungen": self.einstellungen,
+                    "now_ms": kontext.now_ms,
+                    "top_k": self.top_k,
+                })
+        return auftraege
+
+    def vorbereiten(self, angriffe):
+        start = time.perf_counter()
+        auftraege = self.partitionen(angriffe)
+
+        with ProcessPoolExecutor(max_workers=self.prozesse) as pool:
+            for ergebnisse in pool.map(_kandidaten_partition, auftraege):
+                for angriff_idx, kandidaten, abgeschnitten in ergebnisse:
+                    self.ergebnisse[angriff_idx] = (kandidaten, abgeschnitten)
+
+        print(
+            f"[INFO] Kandidaten für {len(self.ergebnisse)} Angriffe in {len(auftraege)} Partitionen "
+            f"({self.prozesse} Prozesse) in {time.perf_counter() - start:.2f}s"
+        )
+
+    def bester_kandidat(self, angriff_idx: int, ziel_koord: str, ankunft: int):
+        """Wie MatchKontext.bester_kandidat, aber aus den vorberechneten Kandidaten des Angriffs."""
+        kontext = self.kontext
+        kandidaten, abgeschnitten = self.ergebnisse.get(angriff_idx, ([], False))
+
+        for abschick, distanz, dorf_idx, v, w in kandidaten:
+            variante = kontext.tab_vorlagen[v][w]
+            if kontext.passt(dorf_idx, variante) and kontext.sende_slots.frei(abschick):
+                return abschick, distanz, dorf_idx, variante
+
+        if abgeschnitten:
+            # Alle top_k schon verbraucht -> mit aktuellem Ledger vollständig neu bewerten
+            self.nachberechnet += 1
+            return kontext.bester_kandidat(ziel_koord, ankunft)
+        return None
@@ -0,0 +1,41 @@
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class ParseCache:
+    """
+    LRU-Cache für Parse-Ergebnisse der Eingabefelder. Schlüssel: Parser (Name + Version),
+    zusätzliche Optionen (z.B. Bogenschützen-Spalten) und ein Hash des Texts - jeder
+    unterschiedliche Text wird damit genau einmal geparst.
+    Die Ergebnisse werden geteilt und dürfen von Aufrufern nicht verändert werden.
+    """
+
+    def __init__(self, max_eintraege: int = 16):
+        self.max_eintraege = max_eintraege
+        self._eintraege: OrderedDict = OrderedDict()
+        self.treffer = 0
+        self.fehlversuche = 0
+
+    @staticmethod
+    def _hash(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def parse(self, parser, text: str, parse: Callable[[str], list], *optionen: Hashable) -> list:
+        """Ergebnis von parse(text) aus dem Cache oder neu geparst; parser braucht ein VERSION-Attribut."""
+        schluessel = (parser.__name__, parser.VERSION, optionen, self._hash(text))
+        ergebnis = self._eintraege.get(schluessel)
+        if ergebnis is not None:
+            self.treffer += 1
+            self._eintraege.move_to_end(schluessel)
+            return ergebnis
+
+        self.fehlversuche += 1
+        ergebnis = parse(text)
+        self._eintraege[schluessel] = ergebnis
+        if len(self._eintraege) > self.max_eintraege:
+            self._eintraege.popitem(last=False)
+        return ergebnis
+
+    def leeren(self):
+        self._eintraege.clear()
@@ -0,0 +1,37 @@
+from bisect import bisect_left, insort
+from typing import List
+
+
+class SendeSlotPlaner:
+    """
+    Alle eingeplanten Abschickzeiten eines Plans, sortiert (Epoch-ms).
+    Beantwortet "hält t zu beiden zeitlichen Nachbarn den Mindestabstand ein?" per bisect
+    in O(log n) - unabhängig davon, in welcher Reihenfolge die Tabs eingeplant wurden.
+    Mit Mindestabstand 0 ist jeder Zeitpunkt frei und es wird nichts gespeichert.
+    """
+
+    def __init__(self, mindestabstand_sekunden: float = 0):
+        self.mindestabstand = int(mindestabstand_sekunden * 1000)
+        self.aktiv = self.mindestabstand > 0
+        self.zeiten: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.zeiten)
+
+    def frei(self, t: int) -> bool:
+        if not self.aktiv:
+            return True
+        pos = bisect_left(self.zeiten, t)
+        if pos < len(self.zeiten) and self.zeiten[pos] - t < self.mindestabstand:
+            return False
+        if pos > 0 and t - self.zeiten[pos - 1] < self.mindestabstand:
+            return False
+        return True
+
+    def belegen(self, t: int):
+        if self.aktiv:
+            insort(self.zeiten, t)
+
+    def freigeben(self, t: int):
+        if self.aktiv:
+            del self.zeiten[bisect_left(self.zeiten, t)]
@@ -1,9 +1,15 @@
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List
+from typing import Iterator, List
 
-from pytz import timezone
+import zeit
+from zeilen_quelle import iter_zeilen
+
+ZIELDORF_PATTERN = re.compile(r"\[b\]Dorf:\[/b\]\s*\[coord\](\d{3}\|\d{3})\[/coord\]")
+ANGRIFF_PATTERN = re.compile(
+    r"\[command\]attack[^\[]*\[/command\](.*?)\[coord\](\d{3}\|\d{3})\[/coord\] --> Ankunftszeit: (\d{2}\.\d{2}\.\d{2}) (\d{2}:\d{2}:\d{2})"
+)
 
 
 @dataclass
@@ -11,37 +17,80 @@ class Angriff:
     ziel_koord: str
     ankunftszeit: datetime
     einheit: str
+    ankunft_ms: int | None = None
+
+    def __post_init__(self):
+        if self.ankunft_ms is None:
+            self.ankunft_ms = zeit.epoch_ms(self.ankunftszeit)
+
+
+@dataclass
+class SosParseStand:
+    """Bereits geparster Textanfang (bis einschließlich letztem Zeilenumbruch) samt Parserzustand."""
+    text: str = ""
+    zeilen: int = 0
+    zieldorf: str | None = None
+    angriffe: List[Angriff] = field(default_factory=list)
 
 class SosParser:
+    VERSION = 1  # bei geändertem Parse-Ergebnis erhöhen (Schlüssel im ParseCache)
+
     @staticmethod
     def parse(text: str) -> List[Angriff]:
-        angriffe = []
-        aktives_zieldorf = None
+        return list(SosParser.iter_parse(text))
 
-        zeilen = text.splitlines()
-        zieldorf_pattern = re.compile(r"\[b\]Dorf:\[/b\]\s*\[coord\](\d{3}\|\d{3})\[/coord\]")
-        angriff_pattern = re.compile(
-            r"\[command\]attack[^\[]*\[/command\](.*?)\[coord\](\d{3}\|\d{3})\[/coord\] --> Ankunftszeit: (\d{2}\.\d{2}\.\d{2}) (\d{2}:\d{2}:\d{2})"
-        )
+    @staticmethod
+    def parse_fortsetzen(stand: SosParseStand, text: str) -> List[Angriff]:
+        """
+        Parst nur den Teil von text, der über stand.text hinausgeht (z.B. ein angehängter SOS-Block),
+        und führt ihn mit stand.angriffe zusammen. Abgeschlossene Zeilen werden in stand übernommen;
+        die letzte, evtl. noch unvollständige Zeile wird beim nächsten Aufruf erneut gelesen.
+        Ist der bekannte Anfang nicht mehr Präfix von text (Text bearbeitet), wird neu begonnen.
+        """
+        if not text.startswith(stand.text):
+            stand.text, stand.zeilen, stand.zieldorf, stand.angriffe = "", 0, None, []
+
+        anfang = len(stand.text)
+        ende = text.rfind("\n", anfang) + 1
+        if ende:
+            neu = text[anfang:ende]
+            stand.angriffe.extend(SosParser.iter_parse(neu, stand))
+            stand.text = text[:ende]
+            stand.zeilen += neu.count("\n")
+        else:
+            ende = anfang
 
-        berlin = timezone("Europe/Berlin")
+        offen = SosParseStand(zieldorf=stand.zieldorf)
+        return stand.angriffe + list(SosParser.iter_parse(text[ende:], offen))
 
-        for zeile in zeilen:
-            ziel_match = zieldorf_pattern.search(zeile)
+    @staticmethod
+    def iter_parse(quelle, stand: SosParseStand | None = None) -> Iterator[Angriff]:
+        """
+        Liest Zeile für Zeile aus str, Datei oder mmap (siehe iter_zeilen) und liefert die Angriffe einzeln.
+        stand: setzt das aktive Zieldorf aus vorangegangenem Text fort und wird mit ihm aktualisiert.
+        """
+        aktives_zieldorf = stand.zieldorf if stand is not None else None
+
+        for zeile in iter_zeilen(quelle):
+            ziel_match = ZIELDORF_PATTERN.search(zeile)
             if ziel_match:
                 aktives_zieldorf = ziel_match.group(1)
+                if stand is not None:
+                    stand.zieldorf = aktives_zieldorf
                 continue
 
-            angriff_match = angriff_pattern.search(zeile)
+            angriff_match = ANGRIFF_PATTERN.search(zeile)
             if angriff_match and aktives_zieldorf:
                 einheit = angriff_match.group(1).strip()
                 datum = angriff_match.group(3)
                 uhrzeit = angriff_match.group(4)
                 try:
-                    dt = datetime.strptime(datum + " " + uhrzeit, "%d.%m.%y %H:%M:%S")
-                    ankunft = berlin.localize(dt)
-                    angriffe.append(Angriff(ziel_koord=aktives_zieldorf, ankunftszeit=ankunft, einheit=einheit))
+                    # Datum gecacht (wiederholt sich über tausende Zeilen), Uhrzeit von Hand
+                    ankunft_ms = zeit.wand_zu_epoch(zeit.datum_wand_ms(datum) + zeit.uhrzeit_ms(uhrzeit))
                 except ValueError:
                     print(f"Fehler beim Parsen: {datum} {uhrzeit}")
-
-        return angriffe
+                    continue
+                yield Angriff(
+                    ziel_koord=aktives_zieldorf, ankunftszeit=zeit.als_berlin(ankunft_ms), einheit=einheit,
+                    ankunft_ms=ankunft_ms
+                )
@@ -1,85 +1,84 @@
 import re
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List, Optional
 
-import pytz
+import zeit
+
+# Beispiel: "Serverzeit: 23:21:42 16/01/2026"
+SERVERZEIT_PATTERN = re.compile(r"Serverzeit:\s*(\d{2}:\d{2}:\d{2})\s+(\d{2}/\d{2}/\d{4})")
+KOORD_PATTERN = re.compile(r"\((\d{3}\|\d{3})\)")
+# Eine Suche liefert Tagwort ("heute"/"morgen") bzw. absolutes Datum (TT.MM.JJ / TT.MM.JJJJ) und Uhrzeit
+ANKUNFT_PATTERN = re.compile(
+    r"\b(?:(heute|morgen)\s+um|(\d{2}\.\d{2}\.(?:\d{4}|\d{2})))\s+(\d{2}:\d{2}:\d{2})\b",
+    flags=re.IGNORECASE,
+)
 
 
 @dataclass
 class Unterstützung:
     ziel_koord: str
     ankunftszeit: datetime  # tz-aware Europe/Berlin
+    ankunft_ms: int | None = None
+
+    def __post_init__(self):
+        if self.ankunft_ms is None:
+            self.ankunft_ms = zeit.epoch_ms(self.ankunftszeit)
 
 
 class SupportParser:
+    VERSION = 1  # bei geändertem Parse-Ergebnis erhöhen (Schlüssel im ParseCache)
+
     @staticmethod
-    def _parse_serverzeit(text: str, tz) -> Optional[datetime]:
-        # Beispiel: "Serverzeit: 23:21:42 16/01/2026"
-        m = re.search(r"Serverzeit:\s*(\d{2}:\d{2}:\d{2})\s+(\d{2}/\d{2}/\d{4})", text)
+    def _parse_serverdatum(text: str) -> Optional[int]:
+        """Datum der Serverzeit als Wanduhrzeit von Mitternacht (ms) oder None."""
+        m = SERVERZEIT_PATTERN.search(text)
         if not m:
             return None
-        time_s, date_s = m.group(1), m.group(2)
-        dt = datetime.strptime(f"{date_s} {time_s}", "%d/%m/%Y %H:%M:%S")
-        return tz.localize(dt)
+        try:
+            return zeit.datum_wand_ms(m.group(2))
+        except ValueError:
+            return None
 
     @staticmethod
-    def _parse_ankunft(ankunft_str: str, server_dt: datetime, tz) -> Optional[datetime]:
-        s = (ankunft_str or "").strip().lower()
-
-        m = re.search(r"\b(heute|morgen)\s+um\s+(\d{2}:\d{2}:\d{2})\b", s)
-        if m:
-            tagwort = m.group(1)
-            time_s = m.group(2)
-            base_date = server_dt.date()
-            if tagwort == "morgen":
-                base_date = base_date + timedelta(days=1)
-            dt_naiv = datetime.strptime(f"{base_date.isoformat()} {time_s}", "%Y-%m-%d %H:%M:%S")
-            return tz.localize(dt_naiv)
-
-        # optional: falls absolute Angaben vorkommen
-        m = re.search(r"\b(\d{2}\.\d{2}\.\d{2})\s+(\d{2}:\d{2}:\d{2})\b", s)
-        if m:
-            dt_naiv = datetime.strptime(f"{m.group(1)} {m.group(2)}", "%d.%m.%y %H:%M:%S")
-            return tz.localize(dt_naiv)
-
-        m = re.search(r"\b(\d{2}\.\d{2}\.\d{4})\s+(\d{2}:\d{2}:\d{2})\b", s)
-        if m:
-            dt_naiv = datetime.strptime(f"{m.group(1)} {m.group(2)}", "%d.%m.%Y %H:%M:%S")
-            return tz.localize(dt_naiv)
-
-        return None
+    def _parse_ankunft(ankunft_match, server_tag: int) -> Optional[int]:
+        """Ankunft aus einem ANKUNFT_PATTERN-Treffer als Epoch-ms ("heute"/"morgen" relativ zum Serverdatum)."""
+        tagwort, datum, uhrzeit = ankunft_match.groups()
+        try:
+            if tagwort:
+                tag = server_tag + (zeit.TAG_MS if tagwort.lower() == "morgen" else 0)
+            else:
+                tag = zeit.datum_wand_ms(datum)
+            return zeit.wand_zu_epoch(tag + zeit.uhrzeit_ms(uhrzeit))
+        except ValueError:
+            return None
 
     @staticmethod
     def parse(text: str) -> List[Unterstützung]:
-        tz = pytz.timezone("Europe/Berlin")
-        server_dt = SupportParser._parse_serverzeit(text, tz) or datetime.now(tz)
+        server_tag = SupportParser._parse_serverdatum(text)
+        if server_tag is None:
+            heute = zeit.als_berlin(zeit.jetzt_ms()).date()
+            server_tag = zeit.datum_wand_ms(heute.strftime("%d.%m.%Y"))
 
         supports: List[Unterstützung] = []
 
-        coord_re = re.compile(r"\((\d{3}\|\d{3})\)")
-        ankunft_re = re.compile(
-            r"\b(heute\s+um\s+\d{2}:\d{2}:\d{2}|morgen\s+um\s+\d{2}:\d{2}:\d{2}|\d{2}\.\d{2}\.\d{2}\s+\d{2}:\d{2}:\d{2}|\d{2}\.\d{2}\.\d{4}\s+\d{2}:\d{2}:\d{2})\b",
-            flags=re.IGNORECASE,
-        )
-
         for line in text.splitlines():
             if "Unterstützung" not in line:
                 continue
 
-            coord_m = coord_re.search(line)
+            coord_m = KOORD_PATTERN.search(line)
             if not coord_m:
                 continue
             ziel_koord = coord_m.group(1)
 
-            ankunft_m = ankunft_re.search(line)
+            ankunft_m = ANKUNFT_PATTERN.search(line)
             if not ankunft_m:
                 continue
 
-            ankunft_dt = SupportParser._parse_ankunft(ankunft_m.group(1), server_dt, tz)
-            if not ankunft_dt:
+            ankunft_ms = SupportParser._parse_ankunft(ankunft_m, server_tag)
+            if ankunft_ms is None:
                 continue
 
-            supports.append(Unterstützung(ziel_koord=ziel_koord, ankunftszeit=ankunft_dt))
+            supports.append(Unterstützung(ziel_koord=ziel_koord, ankunftszeit=zeit.als_berlin(ankunft_ms), ankunft_ms=ankunft_ms))
 
         return supports
@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+from typing import Dict, List
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ist optional
+    np = None
+
+
+@dataclass
+class Kapazitaet:
+    tabs: int
+    engpass: str | None  # Einheit, die für sich genommen die wenigsten Tabs zulässt
+
+
+class TabKapazitaet:
+    """
+    Mögliche Tabs für alle Tab-Kombinationen auf einmal. Pro Dorf und Kombination zählt das
+    Minimum von vorhanden // benötigt über die Einheiten der Kombination, summiert über alle Dörfer.
+    Mit NumPy in einem Schritt über Dörfer x Kombinationen x Einheiten, sonst in reinem Python.
+    """
+
+    @staticmethod
+    def berechne(doerfer, kombis: List[Dict[str, int]]) -> List[Kapazitaet]:
+        # Spaltenreihenfolge = erstes Auftreten; bei gleichem Engpass gewinnt die frühere Einheit
+        einheiten = list(dict.fromkeys(e for kombi in kombis for e, menge in kombi.items() if menge > 0))
+        if np is None or not einheiten:
+            return [TabKapazitaet._berechne_einzeln(doerfer, kombi, einheiten) for kombi in kombis]
+
+        truppen = np.array(
+            [[dorf.truppen.get(e, 0) for e in einheiten] for dorf in doerfer], dtype=np.int64
+        ).reshape(len(doerfer), len(einheiten))
+        bedarf = np.array([[max(kombi.get(e, 0), 0) for e in einheiten] for kombi in kombis], dtype=np.int64)
+        benoetigt = bedarf > 0
+
+        # Dörfer x Kombinationen x Einheiten; nicht benötigte Einheiten begrenzen nicht
+        quoten = truppen[:, None, :] // np.where(benoetigt, bedarf, 1)[None, :, :]
+        quoten[:, ~benoetigt] = np.iinfo(np.int64).max
+        tabs = np.where(benoetigt.any(axis=1), quoten.min(axis=2).sum(axis=0), 0)
+
+        quoten[:, ~benoetigt] = 0
+        engpass = np.where(benoetigt, quoten.sum(axis=0), np.iinfo(np.int64).max).argmin(axis=1)
+
+        return [
+            Kapazitaet(int(tabs[k]), einheiten[engpass[k]] if benoetigt[k].any() else None)
+            for k in range(len(kombis))
+        ]
+
+    @staticmethod
+    def _berechne_einzeln(doerfer, kombi: Dict[str, int], einheiten: List[str]) -> Kapazitaet:
+        benoetigt = [(e, kombi[e]) for e in einheiten if kombi.get(e, 0) > 0]
+        if not benoetigt:
+            return Kapazitaet(0, None)
+
+        tabs = 0
+        summen = dict.fromkeys((e for e, _ in benoetigt), 0)
+        for dorf in doerfer:
+            quoten = [dorf.truppen.get(e, 0) // menge for e, menge in benoetigt]
+            tabs += min(quoten)
+            for (e, _), quote in zip(benoetigt, quoten):
+                summen[e] += quote
+        return Kapazitaet(tabs, min(summen, key=summen.get))
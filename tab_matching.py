@@ -1,23 +1,32 @@
 import base64
-import copy
-import gzip
+import heapq
+import itertools
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from io import BytesIO
 from typing import Dict, List
-import requests
-
-import pytz
-import requests
 
+import netz
+from distanz_matrix import DistanzMatrix
 from distanz_rechner import DistanzRechner
+from dorf_daten import DorfDaten
+from dorf_raster import DorfRaster
+from koord_index import KoordIndex, koord_ids
 from eigene_truppen_parser import EigenesDorf
-from einheiten import get_laufzeit
+from einheiten import TravelTimeTable, UnitRegistry
+from sende_slots import SendeSlotPlaner
+from truppen_ledger import TruppenLedger
+from zeitfenster_index import ZeitfensterIndex
+import zeit
 
 @dataclass
 class Angriff:
     ziel_koord: str
     ankunftszeit: datetime
+    ankunft_ms: int | None = None
+
+    def __post_init__(self):
+        if self.ankunft_ms is None:
+            self.ankunft_ms = zeit.epoch_ms(self.ankunftszeit)
 
 @dataclass
 class TabMatch:
@@ -27,10 +36,30 @@ class TabMatch:
     ankunftszeit: datetime
     einheiten: Dict[str, int]
     einheit_kuerzel: str
-
-class TabMatching:
-    @staticmethod
-    def finde_tabs(
+    abschick_ms: int | None = None
+    ankunft_ms: int | None = None
+
+    def __post_init__(self):
+        if self.abschick_ms is None:
+            self.abschick_ms = zeit.epoch_ms(self.abschickzeit)
+        if self.ankunft_ms is None:
+            self.ankunft_ms = zeit.epoch_ms(self.ankunftszeit)
+
+class MatchKontext:
+    """
+    Alles, was pro Berechnung einmal vorbereitet wird: Truppen-Ledger, Laufzeiten-Tabelle,
+    Kandidaten-Vorlagen je Tabgröße, Raster bzw. Distanzmatrix und belegte Sende-Slots.
+    Wird von der Greedy-Suche und der globalen Zuordnung gemeinsam genutzt.
+    Alle Zeiten intern als int Epoch-ms (siehe zeit), datetimes erst in baue_match.
+    """
+
+    # Default Einheiten die für Geschwindigkeit relevant sind (nicht tabrelevant, aber beeinflussen Laufzeit)
+    LAUFZEIT_EINHEITEN = ["Axtkämpfer", "Leichte Kavallerie", "Katapulte", "Schwertkämpfer"]
+    # Einheiten die für die Tab-Größe relevant sind, alle anderen ignorieren wir für die Tabs
+    TABRELEVANTE_EINHEITEN = ["Speerträger", "Schwertkämpfer", "Schwere Kavallerie"]
+
+    def __init__(
+        self,
         angriffe: List[Angriff],
         eigene_dörfer: List[EigenesDorf],
         tabgroessen_liste: List[Dict[str, int]],
@@ -38,126 +67,357 @@ class TabMatching:
         einheiten_speed: float = 1.0,
         zeitfenster_liste=None,
         boost_level: float = 1.0,
-        auto_speed_units: Dict[str, bool] | None = None,
+        enabled_speed_units: List[str] | None = None,
         auto_scouts_enabled: bool = True,
         auto_scouts_count: int = 5,
-        min_send_interval_seconds: int = 0
-    ) -> List[TabMatch]:
-        print(f"[INFO] {len(angriffe)} Angriffe, {len(eigene_dörfer)} eigene Dörfer verarbeitet")
-        
-        name_mapping = {
-            "speerträger": "Speerträger",
-            "schwertkämpfer": "Schwertkämpfer",
-            "axtkämpfer": "Axtkämpfer",
-            "späher": "Späher",
-            "leichte kavallerie": "Leichte Kavallerie",
-            "schwere kavallerie": "Schwere Kavallerie",
-            "katapulte": "Katapulte"
-        }
+        vektorisiert: bool = False,
+        zeitfenster_regeln=None,
+        min_send_interval_seconds: int = 0,
+        einheiten: UnitRegistry | None = None
+    ):
+        self.now_ms = zeit.jetzt_ms()
+        self.zeitfenster_liste = zeitfenster_liste
+        self.zeitfenster_regeln = tuple(zeitfenster_regeln or ())
+        self.zeitfenster = ZeitfensterIndex(zeitfenster_liste, self.zeitfenster_regeln)
+        self._horizont_ende = None
+        self.sende_slots = SendeSlotPlaner(min_send_interval_seconds)
+        if angriffe:
+            self.horizont_erweitern(max(self.ankunft(a) for a in angriffe))
+        self.auto_scouts_enabled = auto_scouts_enabled
+        self.auto_scouts_count = auto_scouts_count
+        if enabled_speed_units is None:
+            enabled_speed_units = list(MatchKontext.LAUFZEIT_EINHEITEN)
+
+        # Restbestände nur im Ledger - die übergebenen Dörfer bleiben unverändert
+        self.doerfer = list(eigene_dörfer)
+        self.ledger = TruppenLedger(self.doerfer)
+        register = einheiten or UnitRegistry.standard()
+        self.spaeher_idx = register.index("Späher")
+
+        laufzeiten = TravelTimeTable(welt_speed, einheiten_speed, boost_level, register)
+
+        # Kandidaten hängen nur von Tabgröße + Auto-Speed-Einheit ab -> einmal pro Lauf kompilieren:
+        # pro Tabgröße Liste von (Einheiten, Ledger-Bedarf, Zusatz-Spalte, langsamste Einheit, Laufzeit)
+        self.tab_vorlagen = []
+        for tabgroessen in tabgroessen_liste:
+            tab_einheiten = {}
+            for e, menge in tabgroessen.items():
+                einheit = register.suche(e)
+                if einheit and einheit.name in MatchKontext.TABRELEVANTE_EINHEITEN:
+                    tab_einheiten[einheit.name] = menge
+
+            varianten = []
+            if tab_einheiten:
+                varianten.append((tab_einheiten, TruppenLedger.bedarf(tab_einheiten), None, *laufzeiten.langsamste(tab_einheiten)))
+
+            # Auto-Speed: Füge nur die aktivierten Geschwindigkeits-Einheiten hinzu
+            for zusatz in enabled_speed_units:
+                if zusatz not in tab_einheiten and zusatz in laufzeiten:
+                    erweitert = tab_einheiten.copy()
+                    erweitert[zusatz] = 1
+                    varianten.append((erweitert, TruppenLedger.bedarf(erweitert), register.index(zusatz), *laufzeiten.langsamste(erweitert)))
+            self.tab_vorlagen.append(varianten)
+
+        # Schnellste mögliche Kandidaten-Laufzeit -> maximale Reichweite
+        self.schnellste_lz = min((lz for varianten in self.tab_vorlagen for *_, lz in varianten), default=None)
+        # Alle Varianten in Vorlagen-Reihenfolge, für die vektorisierte Kandidatensuche
+        self.varianten = [variante for varianten in self.tab_vorlagen for variante in varianten]
+        self._varianten_spalten = [(bedarf, zusatz_idx, lz) for _, bedarf, zusatz_idx, _, lz in self.varianten]
+
+        # Vektorisiert: komplette Distanzmatrix vorab (NumPy), sonst Raster + skalare Distanz
+        self.matrix = None
+        if vektorisiert:
+            if DistanzMatrix.verfuegbar():
+                self.matrix = DistanzMatrix([dorf.koordinaten for dorf in self.doerfer], [a.ziel_koord for a in angriffe])
+            else:
+                print("[WARN] NumPy nicht installiert – verwende skalare Distanzberechnung")
+        self._raster = None
 
-        # Default Einheiten die für Geschwindigkeit relevant sind (nicht tabrelevant, aber beeinflussen Laufzeit)
-        laufzeit_einheiten = ["Axtkämpfer", "Leichte Kavallerie", "Katapulte", "Schwertkämpfer"]
-        # Einheiten die für die Tab-Größe relevant sind, alle anderen ignorieren wir für die Tabs
-        tabrelevante_einheiten = ["Speerträger", "Schwertkämpfer", "Schwere Kavallerie"]
-        
+    @staticmethod
+    def aktive_speed_einheiten(auto_speed_units: Dict[str, bool] | None) -> List[str]:
         if auto_speed_units is None:
             # Standard: alle Laufzeit-Einheiten aktiviert
-            auto_speed_units = {einheit: True for einheit in laufzeit_einheiten}
-        
-        enabled_speed_units = [name for name, enabled in auto_speed_units.items() if enabled]
-        print(f"[INFO] Auto-Speed-Einheiten: {enabled_speed_units}, Auto-Scouts: {auto_scouts_enabled} (Anzahl: {auto_scouts_count})")
+            auto_speed_units = {einheit: True for einheit in MatchKontext.LAUFZEIT_EINHEITEN}
+        return [name for name, enabled in auto_speed_units.items() if enabled]
+
+    @property
+    def raster(self) -> DorfRaster:
+        if self._raster is None:
+            self._raster = DorfRaster([dorf.koordinaten for dorf in self.doerfer])
+        return self._raster
+
+    def dorf_hinzufuegen(self, dorf) -> int:
+        """Nimmt ein weiteres eigenes Dorf auf (Ledger, Raster) und gibt dessen Index zurück."""
+        self.doerfer.append(dorf)
+        dorf_idx = self.ledger.anhaengen(dorf.truppen)
+        if self._raster is not None:
+            self._raster.hinzufuegen(dorf.koordinaten)
+        # Die Distanzmatrix kennt das neue Dorf nicht -> ab jetzt Raster
+        self.matrix = None
+        return dorf_idx
+
+    def horizont_erweitern(self, bis: int):
+        """
+        Wiederkehrende Zeitfenster-Regeln bis einschließlich des Tages von bis expandieren
+        (Abschickzeiten liegen nie nach der Ankunft). Nur neu aufbauen, wenn bis über den
+        bisherigen Horizont hinausgeht.
+        """
+        if not self.zeitfenster_regeln or (self._horizont_ende is not None and bis <= self._horizont_ende):
+            return
+        tag = zeit.als_berlin(bis).date() + timedelta(days=1)
+        self._horizont_ende = zeit.lokal_ms(tag.year, tag.month, tag.day)
+        self.zeitfenster = ZeitfensterIndex(
+            self.zeitfenster_liste, self.zeitfenster_regeln, horizont=(self.now_ms, self._horizont_ende)
+        )
 
-        matches = []
+    @staticmethod
+    def ankunft(angriff) -> int:
+        """Ankunftszeit als Epoch-ms (naive datetimes gelten als Berliner Zeit)."""
+        ankunft_ms = getattr(angriff, "ankunft_ms", None)
+        return ankunft_ms if ankunft_ms is not None else zeit.epoch_ms(angriff.ankunftszeit)
 
-        dorf_copies = []
-        for dorf in eigene_dörfer:
-            dorf_copy = copy.deepcopy(dorf)
-            dorf_copy.rest_truppen = copy.deepcopy(dorf.truppen)
-            dorf_copies.append(dorf_copy)
+    def reichweite(self, ankunft: int) -> float:
+        """
+        Weiter entfernte Dörfer schaffen es selbst mit der schnellsten Einheit nicht mehr rechtzeitig.
+        Früheste Abschickzeit ist jetzt bzw. der Beginn des nächsten Zeitfensters.
+        """
+        if self.schnellste_lz is None:
+            return -1.0
+        frueheste = self.zeitfenster.naechster_erlaubter_ms(self.now_ms)
+        if frueheste is None:
+            return -1.0
+        return (ankunft - frueheste) / 60000 / self.schnellste_lz + 1e-6
+
+    def doerfer_in_reichweite(self, ziel_koord: str, reichweite: float):
+        """(Dorf-Indizes in Eingabereihenfolge, Distanzen) aller Dörfer innerhalb der Reichweite."""
+        if self.matrix is not None and ziel_koord in self.matrix.ziel_zeile:
+            return self.matrix.im_umkreis(ziel_koord, reichweite)
+        dorf_indizes = self.raster.im_umkreis(ziel_koord, reichweite)
+        return dorf_indizes, [
+            DistanzRechner.berechne_distanz(self.doerfer[i].koordinaten, ziel_koord)
+            for i in dorf_indizes
+        ]
 
-        berlin_tz = pytz.timezone("Europe/Berlin")
-        now = berlin_tz.localize(datetime.now())
+    def _vektor_kandidaten(self, ziel_koord: str, ankunft: int):
+        """Kandidaten-Arrays aus der Distanzmatrix (siehe DistanzMatrix.kandidaten) oder None ohne Matrix."""
+        if self.matrix is None or ziel_koord not in self.matrix.ziel_zeile:
+            return None
+        return self.matrix.kandidaten(
+            ziel_koord, self.reichweite(ankunft), ankunft, self.now_ms,
+            self.ledger, self._varianten_spalten, self.zeitfenster
+        )
 
-        for angriff in angriffe:
-            moegliche_tabs = []
-            for dorf in dorf_copies:
-                if dorf.koordinaten == angriff.ziel_koord:
-                    continue
+    def _als_kandidat(self, vektor, i: int) -> tuple:
+        abschick, distanzen, dorf_idx, nr = vektor
+        return int(abschick[i]), float(distanzen[i]), int(dorf_idx[i]), self.varianten[nr[i]]
+
+    def kandidaten(self, ziel_koord: str, ankunft: int, dorf_indizes, distanzen):
+        """
+        Alle unter dem aktuellen Ledger möglichen Tabs als (Abschickzeit in ms, Distanz, Dorf-Index, Variante),
+        in Dorf- und Vorlagen-Reihenfolge.
+        Mit Distanzmatrix kommen sie vektorisiert aus DistanzMatrix.kandidaten (dorf_indizes und
+        distanzen sind dann dieselben wie dort und werden nicht gebraucht).
+        """
+        vektor = self._vektor_kandidaten(ziel_koord, ankunft)
+        if vektor is not None:
+            for i in DistanzMatrix.reihenfolge(vektor, nach_abschick=False).tolist():
+                yield self._als_kandidat(vektor, i)
+            return
+
+        ledger = self.ledger
+        now_ms = self.now_ms
+        enthaelt = self.zeitfenster.enthaelt_ms
+        for dorf_idx, distanz in zip(dorf_indizes, distanzen):
+            if self.doerfer[dorf_idx].koordinaten == ziel_koord:
+                continue
+
+            for varianten in self.tab_vorlagen:
+                for variante in varianten:
+                    _, bedarf, zusatz_idx, _, lz = variante
+                    if zusatz_idx is not None and ledger.bestand(dorf_idx, zusatz_idx) <= 0:
+                        continue
+
+                    # Prüfen, ob die tabrelevanten Einheiten vorhanden sind (Späher NICHT relevant für Ausschluss)
+                    if not ledger.reicht(dorf_idx, bedarf):
+                        continue
+
+                    abschick = ankunft - round(distanz * lz * 60000)
 
-                distanz = DistanzRechner.berechne_distanz(dorf.koordinaten, angriff.ziel_koord)
-                ankunftszeit = angriff.ankunftszeit
-                if ankunftszeit.tzinfo is None:
-                    ankunftszeit = pytz.timezone("Europe/Berlin").localize(ankunftszeit)
-
-                for tabgroessen in tabgroessen_liste:
-                    tab_einheiten = {
-                        name_mapping[e.lower()]: menge for e, menge in tabgroessen.items()
-                        if e.lower() in name_mapping and name_mapping[e.lower()] in tabrelevante_einheiten
-                    }
-
-                    kandidaten = [tab_einheiten.copy()]
-                    
-                    # Auto-Speed: Füge nur die aktivierten Geschwindigkeits-Einheiten hinzu
-                    for zusatz in enabled_speed_units:
-                        if zusatz not in tab_einheiten and dorf.rest_truppen.get(zusatz, 0) > 0:
-                            erweitert = tab_einheiten.copy()
-                            erweitert[zusatz] = 1
-                            kandidaten.append(erweitert)
-
-                    for kandidat in kandidaten:
-                        kandidat_mit_spaeh = kandidat.copy()
-                        
-                        # Auto-Scouts: Füge Späher hinzu, wenn aktiviert
-                        if auto_scouts_enabled:
-                            verfuegbare_spaeh = dorf.rest_truppen.get("Späher", 0)
-                            if verfuegbare_spaeh >= auto_scouts_count:
-                                kandidat_mit_spaeh["Späher"] = auto_scouts_count
-                            elif verfuegbare_spaeh > 0:
-                                kandidat_mit_spaeh["Späher"] = verfuegbare_spaeh  # So viele wie möglich
-
-                        # Prüfen, ob die tabrelevanten Einheiten vorhanden sind (Späher NICHT relevant für Ausschluss)
-                        if not all(dorf.rest_truppen.get(e, 0) >= m for e, m in kandidat.items()):
-                            continue
-
-                        if not kandidat:
-                            continue
-
-                        lz = max(get_laufzeit(e, welt_speed, einheiten_speed, boost_level) for e in kandidat)
-                        abschick = ankunftszeit - timedelta(minutes=distanz * lz)
-
-                        # Zeitfensterprüfung
-                        if abschick < now:
-                            continue
-                        if not TabMatching.pruefe_in_einem_beliebigen_zeitfenster(abschick, zeitfenster_liste):
-                            continue
-
-                        tab = TabMatch(
-                            herkunft=dorf,
-                            ziel_koord=angriff.ziel_koord,
-                            abschickzeit=abschick,
-                            ankunftszeit=ankunftszeit,
-                            einheiten=kandidat_mit_spaeh,
-                            einheit_kuerzel=max(kandidat, key=lambda e: get_laufzeit(e, welt_speed, einheiten_speed, boost_level))
-                        )
-                        moegliche_tabs.append((abschick, distanz, tab))
-
-            if moegliche_tabs:
-                moegliche_tabs.sort(key=lambda t: (t[0], t[1]))
-                _, _, bester_match = moegliche_tabs[0]
-
-                # Prüfe Mindestabstand zu vorherigen Tabs
-                if min_send_interval_seconds > 0 and matches:
-                    last_send_time = matches[-1].abschickzeit
-                    time_diff = (bester_match.abschickzeit - last_send_time).total_seconds()
-                    if time_diff < min_send_interval_seconds:
-                        # Tab zu nah am vorherigen - überspringen
+                    # Zeitfensterprüfung
+                    if abschick < now_ms:
                         continue
+                    if not enthaelt(abschick):
+                        continue
+
+                    yield abschick, distanz, dorf_idx, variante
+
+    def bester_kandidat(self, ziel_koord: str, ankunft: int):
+        """
+        Frühester Tab (Abschickzeit, Distanz, Dorf-Index, Variante) für ein Ziel oder None.
+        Nur das laufende Minimum wird gehalten; striktes < -> bei Gleichstand gewinnt der erste
+        Kandidat in Dorf-/Vorlagen-Reihenfolge (wie beim früheren stabilen Sortieren).
+        Kandidaten ohne freien Sende-Slot werden übersprungen (der nächstbeste gewinnt).
+        """
+        vektor = self._vektor_kandidaten(ziel_koord, ankunft)
+        if vektor is not None:
+            if not self.sende_slots.aktiv:
+                i = DistanzMatrix.bester(vektor)
+                return None if i is None else self._als_kandidat(vektor, i)
+            return next(self._vektor_mit_slot(vektor), None)
+
+        dorf_indizes, distanzen = self.doerfer_in_reichweite(ziel_koord, self.reichweite(ankunft))
+        sende_slots = self.sende_slots
+        bester = None
+        for kandidat in self.kandidaten(ziel_koord, ankunft, dorf_indizes, distanzen):
+            abschick, distanz = kandidat[0], kandidat[1]
+            if bester is None or abschick < bester_abschick or (abschick == bester_abschick and distanz < bester_distanz):
+                # Slot nur prüfen, wenn der Kandidat überhaupt besser wäre
+                if not sende_slots.frei(abschick):
+                    continue
+                bester, bester_abschick, bester_distanz = kandidat, abschick, distanz
+        return bester
+
+    def beste_kandidaten(self, ziel_koord: str, ankunft: int, k: int) -> list:
+        """Die k frühesten Tabs in derselben Reihenfolge wie bester_kandidat (begrenzter Heap statt Sortieren)."""
+        vektor = self._vektor_kandidaten(ziel_koord, ankunft)
+        if vektor is not None:
+            return list(itertools.islice(self._vektor_mit_slot(vektor), k))
+        dorf_indizes, distanzen = self.doerfer_in_reichweite(ziel_koord, self.reichweite(ankunft))
+        kandidaten = self.kandidaten(ziel_koord, ankunft, dorf_indizes, distanzen)
+        if self.sende_slots.aktiv:
+            kandidaten = (t for t in kandidaten if self.sende_slots.frei(t[0]))
+        return heapq.nsmallest(k, kandidaten, key=lambda t: (t[0], t[1]))
+
+    def _vektor_mit_slot(self, vektor):
+        """Vektorisierte Kandidaten in der Reihenfolge von bester_kandidat, nur mit freiem Sende-Slot."""
+        for i in DistanzMatrix.reihenfolge(vektor).tolist():
+            kandidat = self._als_kandidat(vektor, i)
+            if self.sende_slots.frei(kandidat[0]):
+                yield kandidat
+
+    def passt(self, dorf_idx: int, variante) -> bool:
+        """Ob die Variante mit dem aktuellen Restbestand des Dorfes noch geschickt werden kann."""
+        _, bedarf, zusatz_idx, _, _ = variante
+        if zusatz_idx is not None and self.ledger.bestand(dorf_idx, zusatz_idx) <= 0:
+            return False
+        return self.ledger.reicht(dorf_idx, bedarf)
+
+    def baue_match(self, ziel_koord: str, ankunft: int, abschick: int, dorf_idx: int, variante) -> TabMatch:
+        kandidat, _, _, einheit_kuerzel, _ = variante
+        kandidat_mit_spaeh = kandidat.copy()
+
+        # Auto-Scouts: Füge Späher hinzu, wenn aktiviert
+        if self.auto_scouts_enabled:
+            verfuegbare_spaeh = self.ledger.bestand(dorf_idx, self.spaeher_idx)
+            if verfuegbare_spaeh >= self.auto_scouts_count:
+                kandidat_mit_spaeh["Späher"] = self.auto_scouts_count
+            elif verfuegbare_spaeh > 0:
+                kandidat_mit_spaeh["Späher"] = verfuegbare_spaeh  # So viele wie möglich
+
+        return TabMatch(
+            herkunft=self.doerfer[dorf_idx],
+            ziel_koord=ziel_koord,
+            abschickzeit=zeit.als_berlin(abschick),
+            ankunftszeit=zeit.als_berlin(ankunft),
+            einheiten=kandidat_mit_spaeh,
+            einheit_kuerzel=einheit_kuerzel,
+            abschick_ms=abschick,
+            ankunft_ms=ankunft
+        )
+
+    def buche(self, dorf_idx: int, match: TabMatch):
+        self.ledger.abbuchen(dorf_idx, TruppenLedger.bedarf(match.einheiten))
+        self.sende_slots.belegen(match.abschick_ms)
+
+    def storniere(self, dorf_idx: int, match: TabMatch):
+        self.ledger.gutschreiben(dorf_idx, TruppenLedger.bedarf(match.einheiten))
+        self.sende_slots.freigeben(match.abschick_ms)
 
-                for einheit, menge in bester_match.einheiten.items():
-                    bester_match.herkunft.rest_truppen[einheit] -= menge
 
+class TabMatching:
+    @staticmethod
+    def finde_tabs(
+        angriffe: List[Angriff],
+        eigene_dörfer: List[EigenesDorf],
+        tabgroessen_liste: List[Dict[str, int]],
+        welt_speed: float = 1.0,
+        einheiten_speed: float = 1.0,
+        zeitfenster_liste=None,
+        boost_level: float = 1.0,
+        auto_speed_units: Dict[str, bool] | None = None,
+        auto_scouts_enabled: bool = True,
+        auto_scouts_count: int = 5,
+        min_send_interval_seconds: int = 0,
+        vektorisiert: bool = False,
+        zeitfenster_regeln=None,
+        modus: str = "greedy",
+        global_kandidaten: int = 12,
+        prozesse: int = 1,
+        parallel_top_k: int = 8,
+        einheiten: UnitRegistry | None = None
+    ) -> List[TabMatch]:
+        """
+        modus="greedy": Angriffe in Eingabereihenfolge, jeder bekommt den am frühesten abzuschickenden Tab.
+        modus="global": maximiert die Anzahl abgedeckter Angriffe über alle Angriffe hinweg
+        (siehe GlobaleZuordnung), pro Angriff werden nur die global_kandidaten nächsten Dörfer betrachtet.
+        prozesse > 1 (nur greedy): Kandidatensuche nach Kontinenten auf mehrere Prozesse verteilt
+        (siehe ParallelesMatching), Ergebnis identisch.
+        einheiten: UnitRegistry der Welt (Laufzeiten aus unit_info), Standard: Basislaufzeiten.
+        """
+        print(f"[INFO] {len(angriffe)} Angriffe, {len(eigene_dörfer)} eigene Dörfer verarbeitet")
+
+        if modus not in ("greedy", "global"):
+            raise ValueError(f"Unbekannter Matching-Modus '{modus}'")
+
+        enabled_speed_units = MatchKontext.aktive_speed_einheiten(auto_speed_units)
+        print(f"[INFO] Auto-Speed-Einheiten: {enabled_speed_units}, Auto-Scouts: {auto_scouts_enabled} (Anzahl: {auto_scouts_count})")
+
+        einstellungen = dict(
+            tabgroessen_liste=tabgroessen_liste,
+            welt_speed=welt_speed,
+            einheiten_speed=einheiten_speed,
+            zeitfenster_liste=zeitfenster_liste,
+            boost_level=boost_level,
+            enabled_speed_units=enabled_speed_units,
+            zeitfenster_regeln=zeitfenster_regeln,
+            einheiten=einheiten
+        )
+        kontext = MatchKontext(
+            angriffe, eigene_dörfer,
+            auto_scouts_enabled=auto_scouts_enabled,
+            auto_scouts_count=auto_scouts_count,
+            vektorisiert=vektorisiert,
+            min_send_interval_seconds=min_send_interval_seconds,
+            **einstellungen
+        )
+
+        if modus == "global":
+            from globale_zuordnung import GlobaleZuordnung
+            return GlobaleZuordnung(kontext, global_kandidaten).zuordnen(angriffe)
+
+        parallel = None
+        if prozesse > 1 and angriffe:
+            from parallel_matching import ParallelesMatching
+            parallel = ParallelesMatching(kontext, einstellungen, prozesse, parallel_top_k)
+            parallel.vorbereiten(angriffe)
+
+        matches = []
+        for angriff_idx, angriff in enumerate(angriffe):
+            ankunft = kontext.ankunft(angriff)
+            if parallel:
+                bester = parallel.bester_kandidat(angriff_idx, angriff.ziel_koord, ankunft)
+            else:
+                bester = kontext.bester_kandidat(angriff.ziel_koord, ankunft)
+
+            # Mindestabstand: bester_kandidat liefert nur Tabs mit freiem Sende-Slot
+            if bester:
+                abschick, _, dorf_idx, variante = bester
+                bester_match = kontext.baue_match(angriff.ziel_koord, ankunft, abschick, dorf_idx, variante)
+                kontext.buche(dorf_idx, bester_match)
                 matches.append(bester_match)
 
+        if parallel:
+            print(f"[INFO] {parallel.nachberechnet} Angriffe ohne passenden Vorab-Kandidaten neu bewertet")
         return matches
 
 
@@ -167,16 +427,8 @@ class TabMatching:
         True, wenn ts in mindestens einem Fenster liegt.
         Grenzen inklusiv: von <= ts <= bis
         """
-        if not zeitfenster_liste:
-            # Wenn keine Fenster übergeben werden, gilt: keine Einschränkung
-            return True
-
-        for von, bis in zeitfenster_liste:
-            if von is None or bis is None:
-                continue
-            if von <= ts <= bis:
-                return True
-        return False
+        # Wenn keine Fenster übergeben werden, gilt: keine Einschränkung
+        return ZeitfensterIndex(zeitfenster_liste).enthaelt(ts)
     
     @staticmethod
     def send_attackplanner_to_dsu(
@@ -189,9 +441,11 @@ class TabMatching:
         tribe_skill: float = 0.0,
         support_boost: float = 0.0,
         ms: int = 500,
+        einheiten: UnitRegistry | None = None,
     ) -> dict:
         """
         Sendet Matches an DS-Ultimate AttackPlanner API.
+        einheiten: UnitRegistry der Welt (DS-Keys, DSU-IDs), Standard: alle Einheiten.
         Rückgabe: JSON dict (enthält u.a. 'edit' bei Erfolg)
         """
         url = "https://ds-ultimate.de/toolAPI/attackPlanner/create"
@@ -199,21 +453,12 @@ class TabMatching:
         if not api_key:
             raise ValueError("DSU API_KEY fehlt.")
 
-        # DE->DS Unit Keys
-        ds_names = {
-            "Speerträger": "spear",
-            "Schwertkämpfer": "sword",
-            "Axtkämpfer": "axe",
-            "Späher": "spy",
-            "Leichte Kavallerie": "light",
-            "Schwere Kavallerie": "heavy",
-            "Rammböcke": "ram",
-            "Katapulte": "catapult",
-            # Bogis absichtlich nicht (WIP)
-        }
+        # DE-Name -> DS-Key / DSU-ID
+        register = einheiten or UnitRegistry.standard()
 
         # Koord->ID map (wie bisher)
-        koord_to_id = TabMatching.lade_koord_to_id_map(str(world))
+        koordinaten = [k for m in matches for k in (m.herkunft.koordinaten, m.ziel_koord)]
+        koord_to_id = TabMatching.lade_koord_to_id_map(str(world), koordinaten)
 
         # Unit keys die wir immer mitsenden (archer/marcher NICHT mitsenden)
         unit_keys = [
@@ -222,21 +467,6 @@ class TabMatching:
             "knight", "snob",
         ]
 
-        unit_id = {
-            "spear": 0,
-            "sword": 1,
-            "axe": 2,
-            "archer": 3,
-            "spy": 4,
-            "light": 5,
-            "marcher": 6,
-            "heavy": 7,
-            "ram": 8,
-            "catapult": 9,
-            "knight": 10,
-            "snob": 11,
-        }
-
         # URL-encoded payload (items[0][...])
         payload = {
             "world": str(world),
@@ -246,16 +476,18 @@ class TabMatching:
             "API_KEY": str(api_key),
         }
 
+        # Alle Start- und Zielkoordinaten in einem Schritt auflösen
+        ids = koord_ids(koord_to_id, koordinaten)
+
         for i, match in enumerate(matches):
-            start_id = koord_to_id.get(match.herkunft.koordinaten)
-            ziel_id = koord_to_id.get(match.ziel_koord)
+            start_id, ziel_id = ids[2 * i], ids[2 * i + 1]
             if not start_id or not ziel_id:
                 # skip, wie bisher beim txt export
                 continue
 
-            # slowest_unit: aus einheit_kuerzel (DE) -> DS key
-            slowest_unit_key = ds_names.get(match.einheit_kuerzel) or "spear"
-            slowest_unit_val = unit_id.get(slowest_unit_key, 0)  # default spear
+            # slowest_unit: aus einheit_kuerzel (DE) -> DSU-ID
+            langsamste = register.get(match.einheit_kuerzel)
+            slowest_unit_val = langsamste.dsu_id if langsamste else 0  # default spear
 
 
             base = f"items[{i}]"
@@ -263,7 +495,7 @@ class TabMatching:
             payload[f"{base}[source]"] = str(start_id)
             payload[f"{base}[destination]"] = str(ziel_id)
             payload[f"{base}[slowest_unit]"] = str(int(slowest_unit_val))
-            payload[f"{base}[arrival_time]"] = str(int(match.ankunftszeit.timestamp()))  # Sekunden
+            payload[f"{base}[arrival_time]"] = str(match.ankunft_ms // 1000)  # Sekunden
             payload[f"{base}[type]"] = "0"
             payload[f"{base}[support_boost]"] = str(support_boost)
             payload[f"{base}[tribe_skill]"] = str(tribe_skill)
@@ -273,9 +505,9 @@ class TabMatching:
             # match.einheiten sind DE-Namen -> DS keys
             einheiten_ds = {}
             for name_de, anzahl in (match.einheiten or {}).items():
-                k = ds_names.get(name_de)
-                if k:
-                    einheiten_ds[k] = int(anzahl)
+                einheit = register.get(name_de)
+                if einheit:
+                    einheiten_ds[einheit.ds_key] = int(anzahl)
 
             for k in unit_keys:
                 payload[f"{base}[{k}]"] = str(einheiten_ds.get(k, 0))
@@ -284,7 +516,7 @@ class TabMatching:
             "Accept": "application/json",
         }
 
-        resp = requests.post(url, data=payload, headers=headers, timeout=30)
+        resp = netz.post(url, data=payload, headers=headers)
 
         # DSU gibt ohne Accept ggf. HTML zurück; wir erzwingen Accept. Trotzdem robust:
         try:
@@ -299,56 +531,34 @@ class TabMatching:
         return data
 
     @staticmethod
-    def lade_koord_to_id_map(welt_id: str) -> Dict[str, int]:
-        url = f"https://de{welt_id}.die-staemme.de/map/village.txt.gz"
-        response = requests.get(url)
-        if response.status_code != 200:
-            raise RuntimeError(f"Download der Dorfdaten fehlgeschlagen (Status: {response.status_code}, URL: {url})")
-
-        gzip_file = gzip.GzipFile(fileobj=BytesIO(response.content))
-        content = gzip_file.read().decode("utf-8")
-
-        koord_to_id_map = {}
-        for line in content.strip().splitlines():
-            parts = line.strip().split(",")
-            if len(parts) >= 4:
-                village_id = int(parts[0])
-                x = parts[2]
-                y = parts[3]
-                coord = f"{x}|{y}"
-                koord_to_id_map[coord] = village_id
-
-        return koord_to_id_map
+    def lade_koord_to_id_map(welt_id: str, benoetigt: List[str] | None = None) -> KoordIndex:
+        # Plattencache + bedingte Revalidierung, siehe DorfDaten; Ergebnis verhält sich wie ein dict.
+        # benoetigt: ohne Plattencache darf das Parsen der village.txt enden, sobald diese Koordinaten aufgelöst sind
+        return DorfDaten.koord_index(welt_id, benoetigt)
 
     @staticmethod
-    def export_dsultimate(matches: list, welt_id: str) -> str:
-        ds_names = {
-            "Speerträger": "spear",
-            "Schwertkämpfer": "sword",
-            "Axtkämpfer": "axe",
-            "Späher": "spy",
-            "Leichte Kavallerie": "light",
-            "Schwere Kavallerie": "heavy",
-            "Rammböcke": "ram",
-            "Katapulte": "catapult"
-        }
+    def export_dsultimate(matches: list, welt_id: str, einheiten: UnitRegistry | None = None) -> str:
+        """Export-Text für den DS-Ultimate-Import; einheiten: UnitRegistry der Welt (Standard: alle Einheiten)."""
+        register = einheiten or UnitRegistry.standard()
 
-        koord_to_id = TabMatching.lade_koord_to_id_map(welt_id)
+        koordinaten = [k for m in matches for k in (m.herkunft.koordinaten, m.ziel_koord)]
+        koord_to_id = TabMatching.lade_koord_to_id_map(welt_id, koordinaten)
+        ids = koord_ids(koord_to_id, koordinaten)
         result = []
 
-        for match in matches:
-            start_id = koord_to_id.get(match.herkunft.koordinaten)
-            ziel_id = koord_to_id.get(match.ziel_koord)
+        for i, match in enumerate(matches):
+            start_id, ziel_id = ids[2 * i], ids[2 * i + 1]
 
             if not start_id or not ziel_id:
                 continue
 
-            einheit = ds_names.get(match.einheit_kuerzel, match.einheit_kuerzel.lower())
+            langsamste = register.get(match.einheit_kuerzel)
+            einheit = langsamste.ds_key if langsamste else match.einheit_kuerzel.lower()
 
-            timestamp_ms = int(match.ankunftszeit.timestamp() * 1000)
+            timestamp_ms = match.ankunft_ms
 
             einheiten = {
-                ds_names.get(name, ""): base64.b64encode(str(anzahl).encode("utf-8")).decode("utf-8")
+                register[name].ds_key if name in register else "": base64.b64encode(str(anzahl).encode("utf-8")).decode("utf-8")
                 for name, anzahl in match.einheiten.items()
             }
 
@@ -27,6 +27,21 @@ class MockAngriff:
     einheit: str = ""
 
 
+@pytest.fixture(autouse=True)
+def dorf_daten_cache(tmp_path, monkeypatch):
+    """Keep downloaded village data out of the working tree and independent between tests."""
+    import dorf_daten
+    from welt_einstellungen import WeltEinstellungenSpeicher
+
+    verzeichnis = tmp_path / "dorf_daten_cache"
+    monkeypatch.setattr(dorf_daten, "CACHE_VERZEICHNIS", str(verzeichnis))
+    dorf_daten.DorfDaten.vergessen()
+    WeltEinstellungenSpeicher.vergessen()
+    yield verzeichnis
+    dorf_daten.DorfDaten.vergessen()
+    WeltEinstellungenSpeicher.vergessen()
+
+
 @pytest.fixture
 def berlin_tz():
     """Berlin timezone fixture."""
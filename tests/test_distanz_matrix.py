@@ -0,0 +1,138 @@
+"""Tests for distanz_matrix.py - Vectorized distance engine."""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from distanz_matrix import DistanzMatrix
+from distanz_rechner import DistanzRechner
+from tab_matching import Angriff, TabMatching
+
+
+def _zufalls_koords(rng, anzahl, von=450, bis=550):
+    return [f"{rng.randint(von, bis):03d}|{rng.randint(von, bis):03d}" for _ in range(anzahl)]
+
+
+class TestDistanzMatrix:
+    """Tests for the bulk distance matrix."""
+
+    def test_matches_scalar_distances_exactly(self):
+        """Test that every matrix entry is bit-identical to the scalar path."""
+        rng = random.Random(1)
+        doerfer = _zufalls_koords(rng, 60)
+        ziele = _zufalls_koords(rng, 40)
+        matrix = DistanzMatrix(doerfer, ziele)
+
+        for ziel in ziele:
+            zeile = matrix.zeile(ziel)
+            for i, dorf in enumerate(doerfer):
+                assert zeile[i] == DistanzRechner.berechne_distanz(dorf, ziel)
+
+    def test_targets_are_deduplicated(self):
+        """Test that repeated targets share one matrix row."""
+        matrix = DistanzMatrix(["500|500"], ["510|510", "510|510", "520|520"])
+        assert matrix.distanzen.shape == (2, 1)
+
+    def test_im_umkreis(self):
+        """Test radius filtering returns ascending indices and distances."""
+        matrix = DistanzMatrix(["500|500", "510|500", "503|504"], ["500|500"])
+        indizes, distanzen = matrix.im_umkreis("500|500", 5)
+        assert indizes == [0, 2]
+        assert distanzen == [0.0, 5.0]
+        assert matrix.im_umkreis("500|500", -1) == ([], [])
+
+    def test_abschick_zeilen_match_scalar_rounding(self):
+        """Test that bulk send times equal ankunft - round(distanz * lz * 60000) for every speed."""
+        rng = random.Random(2)
+        doerfer = _zufalls_koords(rng, 200)
+        matrix = DistanzMatrix(doerfer, ["500|500"])
+        distanzen = matrix.zeile("500|500").tolist()
+        # 0.5 Felder bei 1 Min/Feld -> genau 30000 ms, dazu ein exakter .5-Fall für die Rundung
+        distanzen += [0.5, 0.5 / 60000]
+        laufzeiten = [18.0, 22.0 / 1.6, 10.0 / 3, 1.0]
+        ankunft = 1_769_371_200_000
+
+        zeilen = DistanzMatrix.abschick_zeilen(distanzen, ankunft, laufzeiten)
+
+        for lz in laufzeiten:
+            assert zeilen[lz].tolist() == [ankunft - round(d * lz * 60000) for d in distanzen]
+
+    def test_empty_inputs(self):
+        """Test that empty village or target lists are handled."""
+        assert DistanzMatrix([], ["500|500"]).distanzen.shape == (1, 0)
+        assert DistanzMatrix(["500|500"], []).distanzen.shape == (0, 1)
+
+
+class TestVektorisierteTabSuche:
+    """Tests that the vectorized path of finde_tabs equals the scalar path."""
+
+    @staticmethod
+    def _szenario(berlin_tz):
+        from eigene_truppen_parser import EigenesDorf
+
+        rng = random.Random(7)
+        doerfer = [
+            EigenesDorf(
+                dorf_name=f"Dorf {i}",
+                koordinaten=koord,
+                truppen={
+                    "Speerträger": rng.randint(0, 800),
+                    "Schwertkämpfer": rng.randint(0, 800),
+                    "Axtkämpfer": rng.randint(0, 5),
+                    "Späher": rng.randint(0, 10),
+                    "Leichte Kavallerie": rng.randint(0, 3),
+                    "Schwere Kavallerie": rng.randint(0, 300),
+                    "Rammböcke": 0,
+                    "Katapulte": rng.randint(0, 2),
+                },
+            )
+            for i, koord in enumerate(_zufalls_koords(rng, 150))
+        ]
+        start = berlin_tz.localize(datetime(2026, 1, 25, 12, 0, 0))
+        angriffe = [
+            Angriff(ziel_koord=koord, ankunftszeit=start + timedelta(minutes=rng.randint(0, 600)))
+            for koord in _zufalls_koords(rng, 80)
+        ]
+        tabgroessen = [{"Speerträger": 100, "Schwertkämpfer": 100}, {"Schwere Kavallerie": 50}]
+        return angriffe, doerfer, tabgroessen
+
+    @pytest.mark.parametrize("optionen", [
+        {},
+        {"min_send_interval_seconds": 60},
+        {"modus": "global"},
+        {"auto_speed_units": {"Axtkämpfer": True}, "auto_scouts_enabled": False},
+    ], ids=["greedy", "mindestabstand", "global", "auto_speed"])
+    def test_same_matches_as_scalar(self, berlin_tz, optionen):
+        from freezegun import freeze_time
+
+        angriffe, doerfer, tabgroessen = self._szenario(berlin_tz)
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            skalar = TabMatching.finde_tabs(angriffe, doerfer, tabgroessen, **optionen)
+            vektor = TabMatching.finde_tabs(angriffe, doerfer, tabgroessen, vektorisiert=True, **optionen)
+
+        assert len(skalar) > 0
+        assert [(m.herkunft.koordinaten, m.ziel_koord, m.abschickzeit, m.einheiten) for m in vektor] == \
+            [(m.herkunft.koordinaten, m.ziel_koord, m.abschickzeit, m.einheiten) for m in skalar]
+
+    def test_same_matches_with_send_windows(self, berlin_tz):
+        """Test that send windows are applied to the bulk send-time rows like in the scalar loop."""
+        from freezegun import freeze_time
+
+        angriffe, doerfer, tabgroessen = self._szenario(berlin_tz)
+        tag = berlin_tz.localize(datetime(2026, 1, 25))
+        zeitfenster = [
+            (tag + timedelta(hours=10), tag + timedelta(hours=11, minutes=30)),
+            (tag + timedelta(hours=13), tag + timedelta(hours=16)),
+        ]
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            skalar = TabMatching.finde_tabs(angriffe, doerfer, tabgroessen, zeitfenster_liste=zeitfenster)
+            vektor = TabMatching.finde_tabs(
+                angriffe, doerfer, tabgroessen, zeitfenster_liste=zeitfenster, vektorisiert=True
+            )
+
+        assert len(skalar) > 0
+        assert all(any(von <= m.abschickzeit <= bis for von, bis in zeitfenster) for m in vektor)
+        assert [(m.herkunft.koordinaten, m.abschick_ms, m.einheiten) for m in vektor] == \
+            [(m.herkunft.koordinaten, m.abschick_ms, m.einheiten) for m in skalar]
@@ -0,0 +1,206 @@
+"""Tests for dorf_daten.py - On-disk village.txt cache with conditional revalidation."""
+import gzip
+import os
+
+import pytest
+import requests
+import responses
+from freezegun import freeze_time
+
+import dorf_daten
+from dorf_daten import DorfDaten
+from tab_matching import TabMatching
+
+URL = DorfDaten.url("221")
+ETAG = '"abc123"'
+LAST_MODIFIED = "Sun, 25 Jan 2026 08:00:00 GMT"
+
+
+def _gz(*zeilen):
+    return gzip.compress("".join(f"{z}\n" for z in zeilen).encode("utf-8"))
+
+
+@pytest.fixture
+def uhr():
+    with freeze_time("2026-01-25 09:00:00") as eingefroren:
+        yield eingefroren
+
+
+@pytest.fixture
+def server():
+    with responses.RequestsMock() as mock:
+        yield mock
+
+
+def _antwort_200(server, *zeilen):
+    server.add(
+        responses.GET, URL, body=_gz(*zeilen), status=200,
+        headers={"ETag": ETAG, "Last-Modified": LAST_MODIFIED},
+    )
+
+
+class TestDorfDaten:
+    """Tests for DorfDaten.koord_index."""
+
+    def test_download_is_cached_in_process_and_on_disk(self, server, uhr, dorf_daten_cache):
+        _antwort_200(server, "1001,A,500,500,1,100,0", "1002,B,505,505,1,100,0")
+
+        ergebnis = DorfDaten.koord_index("221")
+        assert ergebnis == {"500|500": 1001, "505|505": 1002}
+        assert DorfDaten.koord_index("221") is ergebnis
+        assert (dorf_daten_cache / "de221" / "village.txt.gz").exists()
+
+        # Neuer Prozess innerhalb der TTL: nur Platte, kein Netz
+        DorfDaten.vergessen()
+        uhr.tick(1800)
+        assert DorfDaten.koord_index("221") == ergebnis
+        assert len(server.calls) == 1
+
+    def test_revalidation_after_ttl_with_304(self, server, uhr):
+        _antwort_200(server, "1001,A,500,500,1,100,0")
+        ergebnis = DorfDaten.koord_index("221")
+
+        server.replace(responses.GET, URL, status=304)
+        uhr.tick(3601)
+        assert DorfDaten.koord_index("221") is ergebnis
+
+        anfrage = server.calls[1].request
+        assert anfrage.headers["If-None-Match"] == ETAG
+        assert anfrage.headers["If-Modified-Since"] == LAST_MODIFIED
+
+        # 304 verlängert die TTL auch für den Plattencache
+        DorfDaten.vergessen()
+        uhr.tick(1800)
+        assert DorfDaten.koord_index("221") == ergebnis
+        assert len(server.calls) == 2
+
+    def test_changed_file_is_replaced(self, server, uhr):
+        _antwort_200(server, "1001,A,500,500,1,100,0")
+        DorfDaten.koord_index("221")
+
+        server.replace(responses.GET, URL, body=_gz("1001,A,500,500,1,100,0", "1003,C,510,510,1,100,0"))
+        uhr.tick(3601)
+        assert DorfDaten.koord_index("221") == {"500|500": 1001, "510|510": 1003}
+
+        DorfDaten.vergessen()
+        uhr.tick(60)
+        assert "510|510" in DorfDaten.koord_index("221")
+        assert len(server.calls) == 2
+
+    def test_new_version_gets_its_own_grid_file(self, server, uhr, dorf_daten_cache, monkeypatch):
+        # Gemappte Raster werden nie ersetzt (unter Windows nicht möglich), sondern neu angelegt
+        _antwort_200(server, "1001,A,500,500,1,100,0")
+        alt = DorfDaten.koord_index("221")
+        ordner = dorf_daten_cache / "de221"
+        (alte_datei,) = ordner.glob("village_grid_*.bin")
+
+        ersetzen = os.replace
+
+        def wie_windows(quelle, ziel):
+            if os.path.exists(ziel) and str(ziel).endswith(".bin"):
+                raise PermissionError(f"Datei wird verwendet: {ziel}")
+            ersetzen(quelle, ziel)
+
+        monkeypatch.setattr(os, "replace", wie_windows)
+        server.replace(responses.GET, URL, body=_gz("1003,C,510,510,1,100,0"))
+        uhr.tick(3601)
+        neu = DorfDaten.koord_index("221")
+
+        assert neu == {"510|510": 1003}
+        assert alt == {"500|500": 1001}
+        assert [p.name for p in ordner.glob("village_grid_*.bin")] != [alte_datei.name]
+        DorfDaten.vergessen()
+        assert DorfDaten.koord_index("221") == neu
+
+    def test_stale_cache_is_used_when_server_fails(self, server, uhr):
+        _antwort_200(server, "1001,A,500,500,1,100,0")
+        ergebnis = DorfDaten.koord_index("221")
+
+        server.replace(responses.GET, URL, body=requests.ConnectionError("offline"))
+        uhr.tick(3601)
+        assert DorfDaten.koord_index("221") == ergebnis
+
+    def test_unreachable_without_cache_raises(self, server, uhr):
+        server.add(responses.GET, URL, body=requests.ConnectionError("offline"))
+
+        with pytest.raises(RuntimeError, match="Download der Dorfdaten fehlgeschlagen"):
+            DorfDaten.koord_index("221")
+
+    def test_export_session_downloads_once(self, server, uhr):
+        _antwort_200(server, "1001,A,500,500,1,100,0", "1002,B,505,505,1,100,0")
+
+        for _ in range(3):
+            assert TabMatching.lade_koord_to_id_map("221")["505|505"] == 1002
+        assert len(server.calls) == 1
+
+
+class TestStreamingDownload:
+    """Tests for the single-pass streaming download into the grid index."""
+
+    ZEILEN = [f"{i},Dorf+{i},{i % 1000},{i // 1000},0,100,0" for i in range(1, 30001)]
+
+    def test_multi_chunk_download_matches_full_parse(self, server, uhr, dorf_daten_cache):
+        daten = _gz(*self.ZEILEN)
+        server.add(responses.GET, URL, body=daten, status=200)
+
+        index = DorfDaten.koord_index("221")
+
+        assert len(daten) > 2 * 65536  # mehrere Chunks
+        assert index.vollstaendig and len(index) == 30000
+        assert index["123|004"] == 4123
+        assert (dorf_daten_cache / "de221" / "village.txt.gz").read_bytes() == daten
+        assert len(list((dorf_daten_cache / "de221").glob("village_grid_*.bin"))) == 1
+
+    def test_needed_coordinates_still_build_full_cached_index(self, server, uhr, dorf_daten_cache):
+        daten = _gz(*self.ZEILEN)
+        server.add(responses.GET, URL, body=daten, status=200)
+
+        index = DorfDaten.koord_index("221", ["001|000", "010|000"])
+
+        # Die Datei wird ohnehin ganz abgelegt -> vollständiger Index, Raster gespeichert und gemerkt
+        assert index.vollstaendig and index["500|020"] == 20500
+        assert (dorf_daten_cache / "de221" / "village.txt.gz").read_bytes() == daten
+        assert len(list((dorf_daten_cache / "de221").glob("village_grid_*.bin"))) == 1
+        assert DorfDaten.koord_index("221", ["002|000"]) is index
+        assert len(server.calls) == 1
+
+    def test_export_with_cold_memo_reads_grid_without_network(self, server, uhr):
+        server.add(responses.GET, URL, body=_gz(*self.ZEILEN), status=200)
+        DorfDaten.koord_index("221", ["001|000"])
+
+        DorfDaten.vergessen()
+        uhr.tick(60)
+        index = TabMatching.lade_koord_to_id_map("221", ["123|004"])
+        assert index.vollstaendig and index["123|004"] == 4123
+        assert len(server.calls) == 1
+
+    def test_early_stop_only_without_disk_cache(self, server, uhr, tmp_path, monkeypatch):
+        # Cache-Verzeichnis ist eine Datei -> nichts kann abgelegt werden
+        blockiert = tmp_path / "blockiert"
+        blockiert.write_text("")
+        monkeypatch.setattr(dorf_daten, "CACHE_VERZEICHNIS", str(blockiert))
+        server.add(responses.GET, URL, body=_gz(*self.ZEILEN), status=200)
+
+        index = DorfDaten.koord_index("221", ["001|000", "010|000"])
+
+        assert not index.vollstaendig
+        assert index.ids(["001|000", "010|000"]) == [1, 10]
+        assert "500|020" not in index
+
+    def test_truncated_stream_falls_back_to_cache(self, server, uhr, dorf_daten_cache):
+        _antwort_200(server, "1001,A,500,500,1,100,0")
+        DorfDaten.koord_index("221")
+
+        server.replace(responses.GET, URL, body=_gz(*self.ZEILEN)[:5000], status=200)
+        uhr.tick(3601)
+        DorfDaten.vergessen()
+        assert DorfDaten.koord_index("221") == {"500|500": 1001}
+        assert not (dorf_daten_cache / "de221" / "village.txt.gz.tmp").exists()
+
+    def test_truncated_stream_without_cache_raises(self, server, uhr, dorf_daten_cache):
+        server.add(responses.GET, URL, body=_gz(*self.ZEILEN)[:5000], status=200)
+
+        with pytest.raises(RuntimeError, match="Download der Dorfdaten fehlgeschlagen"):
+            DorfDaten.koord_index("221")
+        assert not (dorf_daten_cache / "de221" / "village.txt.gz").exists()
+        assert not (dorf_daten_cache / "de221" / "village.txt.gz.tmp").exists()
@@ -0,0 +1,75 @@
+"""Tests for dorf_raster.py - Spatial grid index over own villages."""
+import math
+import random
+
+import pytest
+
+from dorf_raster import DorfRaster, kontinent_von, parse_koord
+
+
+class TestParseKoord:
+    """Tests for coordinate parsing."""
+
+    def test_parse_koord(self):
+        assert parse_koord("500|501") == (500, 501)
+        assert parse_koord("001|099") == (1, 99)
+
+    def test_kontinent_von(self):
+        assert kontinent_von("430|500") == 54
+        assert kontinent_von("000|000") == 0
+        assert kontinent_von("999|999") == 99
+
+
+class TestDorfRaster:
+    """Tests for radius queries on the village grid."""
+
+    def test_empty_raster(self):
+        """Test that an empty raster returns no villages."""
+        raster = DorfRaster([])
+        assert len(raster) == 0
+        assert raster.im_umkreis("500|500", 100) == []
+
+    def test_negative_radius(self):
+        """Test that a negative radius (arrival already passed) returns nothing."""
+        raster = DorfRaster(["500|500"])
+        assert raster.im_umkreis("500|500", -1) == []
+
+    def test_radius_is_inclusive(self):
+        """Test that villages exactly on the radius are included."""
+        raster = DorfRaster(["500|500", "503|504", "510|500"])
+        assert raster.im_umkreis("500|500", 5) == [0, 1]
+
+    def test_results_keep_input_order(self):
+        """Test that indices are returned in input order, not grid order."""
+        raster = DorfRaster(["560|560", "500|500", "530|530", "501|501"])
+        assert raster.im_umkreis("530|530", 100) == [0, 1, 2, 3]
+
+    def test_hinzufuegen(self):
+        """Test that added villages get the next index and are found."""
+        raster = DorfRaster(["500|500"])
+        assert raster.hinzufuegen("503|504") == 1
+        assert raster.im_umkreis("503|504", 0) == [1]
+        assert raster.im_umkreis("500|500", 5) == [0, 1]
+
+    def test_matches_brute_force(self):
+        """Test that grid queries equal a brute-force distance scan."""
+        rng = random.Random(42)
+        koords = [f"{rng.randint(400, 600):03d}|{rng.randint(400, 600):03d}" for _ in range(500)]
+        raster = DorfRaster(koords, zelle=7)
+
+        for _ in range(50):
+            ziel = f"{rng.randint(400, 600):03d}|{rng.randint(400, 600):03d}"
+            radius = rng.uniform(0, 80)
+            zx, zy = parse_koord(ziel)
+            erwartet = [
+                i for i, k in enumerate(koords)
+                if math.dist(parse_koord(k), (zx, zy)) <= radius
+            ]
+            assert raster.im_umkreis(ziel, radius) == erwartet
+
+    @pytest.mark.parametrize("radius", [0, 1.5, 2000])
+    def test_edge_radii(self, radius):
+        """Test zero, small and map-spanning radii."""
+        raster = DorfRaster(["000|000", "001|001", "999|999"])
+        ergebnis = raster.im_umkreis("000|000", radius)
+        assert ergebnis == [i for i, d in enumerate([0, math.sqrt(2), math.sqrt(2) * 999]) if d <= radius]
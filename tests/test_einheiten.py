@@ -1,6 +1,6 @@
 """Tests for einheiten.py - Unit definitions and travel time calculations."""
 import pytest
-from einheiten import get_laufzeit, laufzeiten_pro_feld, einheiten_aliases
+from einheiten import TravelTimeTable, UnitRegistry, get_laufzeit, laufzeiten_pro_feld, einheiten_aliases
 
 
 class TestLaufzeitenProFeld:
@@ -200,3 +200,120 @@ class TestAliasNormalization:
         # "Rammböcke" has ö
         result = get_laufzeit("rammböcke")
         assert result == 30.0
+
+
+class TestTravelTimeTable:
+    """Tests for the compiled per-run travel time table."""
+
+    def test_minutes_per_field_equal_get_laufzeit(self):
+        """Test that the table yields exactly the values of get_laufzeit."""
+        tabelle = TravelTimeTable(welt_speed=1.3, einheiten_speed=1.7, boost_multiplier=1.15)
+        for name in laufzeiten_pro_feld:
+            assert tabelle.laufzeit(name) == get_laufzeit(name, 1.3, 1.7, 1.15)
+
+    def test_contains(self):
+        """Test membership checks use normalized names only."""
+        tabelle = TravelTimeTable()
+        assert "Speerträger" in tabelle
+        assert "speertraeger" not in tabelle
+
+    def test_langsamste_einheit(self):
+        """Test slowest unit and travel time of a combination."""
+        tabelle = TravelTimeTable(welt_speed=2.0)
+        assert tabelle.langsamste({"Schwere Kavallerie": 50, "Speerträger": 100}) == ("Speerträger", 9.0)
+        assert tabelle.langsamste(["Späher"]) == ("Späher", 4.5)
+
+    def test_langsamste_tie_keeps_first_unit(self):
+        """Test that ties resolve to the first unit, like max()."""
+        tabelle = TravelTimeTable()
+        assert tabelle.langsamste(["Axtkämpfer", "Speerträger"])[0] == "Axtkämpfer"
+        assert tabelle.langsamste(["Speerträger", "Axtkämpfer"])[0] == "Speerträger"
+
+    def test_langsamste_is_cached(self):
+        """Test that repeated lookups return the cached entry."""
+        tabelle = TravelTimeTable()
+        assert tabelle.langsamste(["Katapulte", "Späher"]) is tabelle.langsamste(("Katapulte", "Späher"))
+
+    def test_empty_combination_raises(self):
+        """Test that an empty combination has no travel time."""
+        with pytest.raises(ValueError):
+            TravelTimeTable().langsamste([])
+
+    def test_matcher_does_not_use_get_laufzeit(self, sample_doerfer, sample_angriffe, standard_tabgroessen):
+        """Test that finde_tabs only uses the compiled table."""
+        from unittest.mock import patch
+        from freezegun import freeze_time
+        from tab_matching import TabMatching
+
+        with freeze_time("2026-01-25 08:00:00", tz_offset=1), \
+                patch("einheiten.get_laufzeit", side_effect=AssertionError("get_laufzeit im Matching")):
+            matches = TabMatching.finde_tabs(sample_angriffe, sample_doerfer, standard_tabgroessen)
+
+        assert matches
+
+
+class TestUnitRegistry:
+    """Tests for the per-world unit registry."""
+
+    def test_standard_registry_has_all_units_with_dense_index(self):
+        """Test index, DS key and DSU id of every unit."""
+        register = UnitRegistry.standard()
+
+        assert len(register) == 12
+        assert [e.index for e in register] == list(range(12))
+        assert [e.ds_key for e in register] == [
+            "spear", "sword", "axe", "archer", "spy", "light",
+            "marcher", "heavy", "ram", "catapult", "knight", "snob",
+        ]
+        assert register["Bogenschützen"].dsu_id == 3
+        assert register.nach_ds_key("snob").name == "Adelsgeschlecht"
+        assert register.index("Späher") == 4
+        assert "Paladin" in register and "Miliz" not in register
+
+    def test_suche_resolves_aliases(self):
+        """Test lookup by German name, normalized alias and DS key."""
+        register = UnitRegistry.standard()
+
+        assert register.suche("Speerträger") is register["Speerträger"]
+        assert register.suche("  SPEERTRAEGER ") is register["Speerträger"]
+        assert register.suche("heavy").name == "Schwere Kavallerie"
+        assert register.suche("Miliz") is None
+        assert get_laufzeit("Berittene Bogenschützen") == 10.0
+        assert get_laufzeit("snob") == 35.0
+
+    def test_spalten_of_troop_overview(self):
+        """Test the troop overview columns with and without archers."""
+        register = UnitRegistry.standard()
+
+        assert register.spalten() == [
+            "Speerträger", "Schwertkämpfer", "Axtkämpfer", "Späher",
+            "Leichte Kavallerie", "Schwere Kavallerie", "Rammböcke", "Katapulte",
+        ]
+        assert register.spalten(bogenschuetzen=True) == [
+            "Speerträger", "Schwertkämpfer", "Axtkämpfer", "Bogenschützen", "Späher",
+            "Leichte Kavallerie", "Berittene Bogenschützen", "Schwere Kavallerie", "Rammböcke", "Katapulte",
+        ]
+
+    def test_aus_welt_uses_unit_info(self):
+        """Test that world unit info sets speeds and deactivates missing units, keeping the index."""
+        from welt_einstellungen import WeltEinstellungen
+
+        minuten = {"spear": 18.000000000504, "sword": 22.000000000264, "spy": 9.0, "snob": 35.000000000385}
+        register = UnitRegistry.aus_welt(WeltEinstellungen(1.6, 0.625, minuten))
+
+        assert register["Speerträger"].minuten_pro_feld == 18
+        assert not register["Bogenschützen"].aktiv and register.index("Bogenschützen") == 3
+        assert register.index("Späher") == UnitRegistry.standard().index("Späher")
+
+        tabelle = TravelTimeTable(welt_speed=1.6, einheiten_speed=0.625, einheiten=register)
+        assert tabelle.laufzeit("Speerträger") == pytest.approx(18.0)
+        assert "Bogenschützen" not in tabelle and "Adelsgeschlecht" in tabelle
+
+        assert UnitRegistry.aus_welt(WeltEinstellungen()) is UnitRegistry.standard()
+
+    def test_registry_can_be_pickled(self):
+        """Test that the registry can be passed to worker processes."""
+        import pickle
+
+        register = pickle.loads(pickle.dumps(UnitRegistry.standard()))
+        assert register.suche("speertraeger").index == 0
@@ -0,0 +1,110 @@
+"""Tests for globale_zuordnung.py - Global assignment mode of finde_tabs."""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from tab_matching import Angriff, TabMatching
+
+
+def _dorf(koord, **truppen):
+    return type('Dorf', (), {'koordinaten': koord, 'truppen': {"Speerträger": 0, **truppen}})()
+
+
+class TestGlobaleZuordnung:
+    """Tests for modus='global'."""
+
+    def test_global_covers_attack_that_greedy_misses(self, berlin_tz):
+        """Test that an early attack no longer uses up the only village for a later attack."""
+        from freezegun import freeze_time
+
+        v_fern = _dorf("510|500", Speerträger=100)   # erreicht beide Ziele
+        v_nah = _dorf("501|500", Speerträger=100)    # erreicht nur das erste Ziel
+        attacks = [
+            Angriff(ziel_koord="500|500", ankunftszeit=berlin_tz.localize(datetime(2026, 1, 25, 15, 0, 0))),
+            Angriff(ziel_koord="520|500", ankunftszeit=berlin_tz.localize(datetime(2026, 1, 25, 13, 30, 0))),
+        ]
+        kwargs = dict(tabgroessen_liste=[{"Speerträger": 100}], auto_scouts_enabled=False, auto_speed_units={})
+
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            greedy = TabMatching.finde_tabs(attacks, [v_fern, v_nah], **kwargs)
+            global_ = TabMatching.finde_tabs(attacks, [v_fern, v_nah], modus="global", **kwargs)
+
+        assert len(greedy) == 1
+        assert len(global_) == 2
+        zuordnung = {m.ziel_koord: m.herkunft.koordinaten for m in global_}
+        assert zuordnung == {"500|500": "501|500", "520|500": "510|500"}
+
+    def test_prefers_nearer_village(self, berlin_tz):
+        """Test that with equal coverage the nearer village is used."""
+        from freezegun import freeze_time
+
+        doerfer = [_dorf("530|500", Speerträger=500), _dorf("503|500", Speerträger=500)]
+        attacks = [Angriff(ziel_koord="500|500", ankunftszeit=berlin_tz.localize(datetime(2026, 1, 25, 20, 0, 0)))]
+
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            matches = TabMatching.finde_tabs(
+                attacks, doerfer, [{"Speerträger": 100}], modus="global", auto_speed_units={}
+            )
+
+        assert [m.herkunft.koordinaten for m in matches] == ["503|500"]
+
+    def test_respects_troop_capacity(self, berlin_tz):
+        """Test that no village sends more troops than it has."""
+        from freezegun import freeze_time
+
+        rng = random.Random(5)
+        doerfer = [
+            _dorf(f"{rng.randint(480, 520)}|{rng.randint(480, 520)}",
+                  Speerträger=rng.randint(0, 400), Späher=rng.randint(0, 12), Axtkämpfer=rng.randint(0, 2))
+            for _ in range(40)
+        ]
+        start = berlin_tz.localize(datetime(2026, 1, 25, 11, 0, 0))
+        attacks = [
+            Angriff(ziel_koord=f"{rng.randint(480, 520)}|{rng.randint(480, 520)}",
+                    ankunftszeit=start + timedelta(minutes=rng.randint(0, 300)))
+            for _ in range(120)
+        ]
+
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            greedy = TabMatching.finde_tabs(attacks, doerfer, [{"Speerträger": 100}])
+            global_ = TabMatching.finde_tabs(attacks, doerfer, [{"Speerträger": 100}], modus="global")
+
+        assert len(global_) >= len(greedy)
+
+        verbraucht = {}
+        for m in global_:
+            for einheit, menge in m.einheiten.items():
+                key = (id(m.herkunft), einheit)
+                verbraucht[key] = verbraucht.get(key, 0) + menge
+            assert m.abschickzeit < m.ankunftszeit
+        for dorf in doerfer:
+            for einheit, menge in dorf.truppen.items():
+                assert verbraucht.get((id(dorf), einheit), 0) <= menge
+
+    def test_min_send_interval_in_global_mode(self, berlin_tz):
+        """Test that globally assigned tabs keep the minimum send interval."""
+        from freezegun import freeze_time
+
+        doerfer = [_dorf("505|500", Speerträger=1000)]
+        ankunft = berlin_tz.localize(datetime(2026, 1, 25, 15, 0, 0))
+        attacks = [
+            Angriff(ziel_koord="500|500", ankunftszeit=ankunft),
+            Angriff(ziel_koord="500|500", ankunftszeit=ankunft + timedelta(seconds=5)),
+            Angriff(ziel_koord="500|500", ankunftszeit=ankunft + timedelta(minutes=5)),
+        ]
+
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            matches = TabMatching.finde_tabs(
+                attacks, doerfer, [{"Speerträger": 100}], modus="global",
+                auto_speed_units={}, min_send_interval_seconds=60
+            )
+
+        zeiten = sorted(m.abschickzeit for m in matches)
+        assert len(matches) == 2
+        assert (zeiten[1] - zeiten[0]).total_seconds() >= 60
+
+    def test_unknown_mode_raises(self):
+        """Test that an unknown mode is rejected."""
+        with pytest.raises(ValueError, match="Matching-Modus"):
+            TabMatching.finde_tabs([], [], [], modus="optimal")
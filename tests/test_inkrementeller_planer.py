@@ -0,0 +1,191 @@
+"""Tests for inkrementeller_planer.py - Incremental re-matching of a tab plan."""
+from datetime import datetime
+
+import pytest
+from freezegun import freeze_time
+
+from inkrementeller_planer import InkrementellerPlaner
+from tab_matching import Angriff, TabMatching
+from tests.conftest import MockDorf
+
+KWARGS = dict(tabgroessen_liste=[{"Speerträger": 100}], auto_scouts_enabled=False, auto_speed_units={})
+
+
+def _dorf(koord, speer):
+    return MockDorf(dorf_name=koord, koordinaten=koord, truppen={"Speerträger": speer})
+
+
+@pytest.fixture
+def angriff(berlin_tz):
+    def _angriff(ziel, stunde=20):
+        return Angriff(ziel_koord=ziel, ankunftszeit=berlin_tz.localize(datetime(2026, 1, 25, stunde, 0, 0)))
+    return _angriff
+
+
+@pytest.fixture(autouse=True)
+def eingefroren():
+    with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+        yield
+
+
+class TestInkrementellerPlaner:
+    """Tests for InkrementellerPlaner."""
+
+    def test_initial_plan_equals_greedy(self, sample_doerfer, sample_angriffe, standard_tabgroessen):
+        """Test that planning everything as one delta gives the same tabs as finde_tabs."""
+        planer = InkrementellerPlaner(sample_doerfer, standard_tabgroessen)
+        diff = planer.aktualisiere(neue_angriffe=sample_angriffe)
+
+        erwartet = TabMatching.finde_tabs(sample_angriffe, sample_doerfer, standard_tabgroessen)
+        assert planer.matches == erwartet
+        assert diff.neu == erwartet
+        assert diff.entfernt == []
+
+    def test_new_attack_keeps_existing_tabs(self, angriff):
+        """Test that adding an attack only plans the new attack."""
+        planer = InkrementellerPlaner([_dorf("502|500", 100), _dorf("505|500", 100)], **KWARGS)
+        planer.aktualisiere(neue_angriffe=[angriff("500|500")])
+        vorher = list(planer.matches)
+
+        diff = planer.aktualisiere(neue_angriffe=[angriff("501|500")])
+
+        assert diff.entfernt == []
+        assert [m.herkunft.koordinaten for m in diff.neu] == ["502|500"]
+        assert planer.matches[0] is vorher[0]
+
+    def test_removed_attack_frees_troops_for_open_attack(self, angriff):
+        """Test that troops of a removed attack go to an attack that was left open."""
+        planer = InkrementellerPlaner([_dorf("502|500", 100)], **KWARGS)
+        erster, zweiter = angriff("500|500"), angriff("504|500")
+        planer.aktualisiere(neue_angriffe=[erster, zweiter])
+        assert planer.offene_angriffe == [zweiter]
+
+        diff = planer.aktualisiere(entfernte_angriffe=[angriff("500|500")])
+
+        assert [m.ziel_koord for m in diff.entfernt] == ["500|500"]
+        assert [m.ziel_koord for m in diff.neu] == ["504|500"]
+        assert planer.offene_angriffe == []
+
+    def test_village_losing_troops_moves_tab(self, angriff):
+        """Test that a village with fewer troops gives up its tab, which is planned elsewhere."""
+        planer = InkrementellerPlaner([_dorf("502|500", 100), _dorf("510|500", 100)], **KWARGS)
+        planer.aktualisiere(neue_angriffe=[angriff("500|500")])
+        # Greedy: weiter entferntes Dorf = früheste Abschickzeit
+        assert planer.matches[0].herkunft.koordinaten == "510|500"
+
+        diff = planer.aktualisiere(geaenderte_doerfer=[_dorf("510|500", 50)])
+
+        assert [m.herkunft.koordinaten for m in diff.entfernt] == ["510|500"]
+        assert [m.herkunft.koordinaten for m in diff.neu] == ["502|500"]
+        assert planer.kontext.ledger.zeile(1)["Speerträger"] == 50
+
+    def test_unchanged_village_reports_no_diff(self, angriff):
+        """Test that re-sending the same troop overview changes nothing."""
+        dorf = _dorf("502|500", 200)
+        planer = InkrementellerPlaner([dorf], **KWARGS)
+        planer.aktualisiere(neue_angriffe=[angriff("500|500")])
+
+        diff = planer.aktualisiere(geaenderte_doerfer=[_dorf("502|500", 200)])
+
+        assert diff.neu == [] and diff.entfernt == []
+        assert planer.kontext.ledger.zeile(0)["Speerträger"] == 100
+        assert dorf.truppen == {"Speerträger": 200}
+
+    def test_new_village_covers_open_attack(self, angriff):
+        """Test that an unknown village in the delta is added and used for open attacks."""
+        planer = InkrementellerPlaner([_dorf("502|500", 10)], **KWARGS)
+        planer.aktualisiere(neue_angriffe=[angriff("500|500")])
+        assert planer.matches == []
+
+        diff = planer.aktualisiere(geaenderte_doerfer=[_dorf("503|500", 100)])
+
+        assert [m.herkunft.koordinaten for m in diff.neu] == ["503|500"]
+
+    def test_uebernehme_existing_plan(self, angriff):
+        """Test that a plan from finde_tabs is adopted with its troops booked."""
+        doerfer = [_dorf("502|500", 100)]
+        angriffe = [angriff("500|500"), angriff("504|500")]
+        matches = TabMatching.finde_tabs(angriffe, doerfer, **KWARGS)
+
+        planer = InkrementellerPlaner(doerfer, **KWARGS)
+        planer.uebernehme(angriffe, matches)
+
+        assert planer.matches == matches
+        assert planer.offene_angriffe == [angriffe[1]]
+        assert planer.kontext.ledger.zeile(0)["Speerträger"] == 0
+
+    def test_min_interval_checks_both_neighbours(self, angriff):
+        """Test that a new tab may not be planned right before an existing one."""
+        planer = InkrementellerPlaner(
+            [_dorf("502|500", 100), _dorf("498|500", 100)], min_send_interval_seconds=60, **KWARGS
+        )
+        planer.aktualisiere(neue_angriffe=[angriff("500|500")])
+
+        diff = planer.aktualisiere(neue_angriffe=[angriff("500|500")])
+
+        assert diff.neu == []
+        assert len(planer.offene_angriffe) == 1
+
+    def test_removed_village_releases_its_tabs(self, angriff):
+        """Test that a village missing from the troop overview gives up its tabs and troops."""
+        planer = InkrementellerPlaner([_dorf("502|500", 100), _dorf("510|500", 100)], **KWARGS)
+        planer.aktualisiere(neue_angriffe=[angriff("500|500")])
+        assert planer.matches[0].herkunft.koordinaten == "510|500"
+
+        diff = planer.aktualisiere(entfernte_doerfer=["510|500"])
+
+        assert [m.herkunft.koordinaten for m in diff.entfernt] == ["510|500"]
+        assert [m.herkunft.koordinaten for m in diff.neu] == ["502|500"]
+        assert planer.kontext.ledger.zeile(1)["Speerträger"] == 0
+        assert planer.am_dorf[1] == set()
+
+    def test_replanned_identical_tab_is_no_change(self, angriff):
+        """Test that a freed tab planned again from the same village with the same troops is not reported."""
+        kwargs = dict(KWARGS, tabgroessen_liste=[{"Speerträger": 100}, {"Schwertkämpfer": 100}])
+        nur_schwert = MockDorf(dorf_name="X", koordinaten="502|500", truppen={"Schwertkämpfer": 100})
+        planer = InkrementellerPlaner([nur_schwert], **kwargs)
+        planer.aktualisiere(neue_angriffe=[angriff("501|500")])
+        planer.aktualisiere(
+            neue_angriffe=[angriff("500|500")],
+            geaenderte_doerfer=[MockDorf(dorf_name="X", koordinaten="502|500", truppen={"Speerträger": 100, "Schwertkämpfer": 100})]
+        )
+        schwert, speer = planer.matches
+        assert "Schwertkämpfer" in schwert.einheiten and "Speerträger" in speer.einheiten
+
+        # Weniger Speere: beide Tabs werden frei, der Schwert-Tab passt danach unverändert wieder
+        diff = planer.aktualisiere(geaenderte_doerfer=[
+            MockDorf(dorf_name="X", koordinaten="502|500", truppen={"Speerträger": 50, "Schwertkämpfer": 100})
+        ])
+
+        assert diff.entfernt == [speer]
+        assert diff.neu == []
+        assert planer.matches[0].einheiten == schwert.einheiten
+
+    def test_only_open_attacks_near_freed_village_are_rechecked(self, angriff):
+        """Test that freed troops only re-evaluate open attacks the village can still reach."""
+        planer = InkrementellerPlaner([_dorf("502|500", 10)], **KWARGS)
+        planer.aktualisiere(neue_angriffe=[angriff("500|500"), angriff("900|900", stunde=10)])
+        assert len(planer.offene_angriffe) == 2
+
+        erreichbar = planer._offen_in_reichweite({0})
+
+        assert erreichbar == {0}
+
+    def test_scout_shortfall_only_trims_auto_scouts(self, angriff):
+        """Test that fewer scouts shrink the auto-scouts of the latest tabs instead of dropping tabs."""
+        kwargs = dict(KWARGS, auto_scouts_enabled=True, auto_scouts_count=5)
+        truppen = {"Speerträger": 200, "Späher": 10}
+        planer = InkrementellerPlaner([MockDorf(dorf_name="X", koordinaten="502|500", truppen=truppen)], **kwargs)
+        planer.aktualisiere(neue_angriffe=[angriff("500|500"), angriff("501|500")])
+        frueh, spaet = planer.matches
+        assert frueh.einheiten["Späher"] == 5 and spaet.einheiten["Späher"] == 5
+
+        diff = planer.aktualisiere(geaenderte_doerfer=[
+            MockDorf(dorf_name="X", koordinaten="502|500", truppen={"Speerträger": 200, "Späher": 3})
+        ])
+
+        assert diff.entfernt == [spaet, frueh]
+        assert [m.einheiten.get("Späher", 0) for m in diff.neu] == [0, 3]
+        assert [m.einheiten.get("Späher", 0) for m in planer.matches] == [3, 0]
+        assert planer.offene_angriffe == []
+        assert planer.kontext.ledger.zeile(0)["Späher"] == 0
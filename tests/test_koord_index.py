@@ -0,0 +1,76 @@
+"""Tests for koord_index.py - Dense coordinate -> village-id grid."""
+import random
+
+import pytest
+
+import koord_index
+from koord_index import KoordIndex, koord_ids
+
+ZEILEN = [
+    "1001,Dorf+A,500,500,7,100,0",
+    "1002,Dorf+B,5,7,7,100,0",       # village.txt schreibt Koordinaten ohne führende Nullen
+    "1003,Dorf+C,999,0,0,26,0",
+    "kaputt",
+    "x,Dorf,1,2,0,0,0",
+    "1004,Außerhalb,1000,5,0,0,0",
+]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def modus(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(koord_index, "np", None)
+    return request.param
+
+
+class TestKoordIndex:
+    """Tests for KoordIndex."""
+
+    def test_behaves_like_the_old_dict(self, modus):
+        index = KoordIndex.aus_zeilen(ZEILEN)
+
+        assert index == {"500|500": 1001, "005|007": 1002, "999|000": 1003}
+        assert index["005|007"] == index["5|7"] == 1002
+        assert index.get("501|500") is None
+        assert index.get("kein|dorf") is None
+        assert "1000|5" not in index
+        assert len(index) == 3
+
+    def test_ids_resolve_all_coordinates_at_once(self, modus):
+        index = KoordIndex.aus_zeilen(ZEILEN)
+
+        assert index.ids(["500|500", "999|000", "123|456", "500|500", "005|007"]) == [1001, 1003, 0, 1001, 1002]
+        assert index.ids(["500|500", "unsinn"]) == [1001, 0]
+        assert index.ids([]) == []
+        assert koord_ids({"500|500": 1}, ["500|500", "1|1"]) == [1, 0]
+
+    def test_grid_lookup(self):
+        pytest.importorskip("numpy")
+        index = KoordIndex.aus_zeilen(ZEILEN)
+
+        assert index.raster[500, 500] == 1001
+        assert index.raster[5, 7] == 1002
+        assert index.raster.shape == (1000, 1000)
+
+    def test_save_and_mmap_load(self, modus, tmp_path):
+        rng = random.Random(3)
+        zeilen = [f"{i},D,{rng.randrange(1000)},{rng.randrange(1000)},0,0,0" for i in range(1, 5000)]
+        original = KoordIndex.aus_zeilen(zeilen)
+        pfad = str(tmp_path / "village_grid.bin")
+
+        original.speichern(pfad)
+        geladen = KoordIndex.laden(pfad)
+
+        assert (tmp_path / "village_grid.bin").stat().st_size == 4_000_000
+        koords = list(original)
+        assert geladen.ids(koords) == original.ids(koords)
+        assert dict(geladen) == dict(original)
+
+    def test_wrong_file_size_is_rejected(self, tmp_path):
+        pfad = tmp_path / "village_grid.bin"
+        pfad.write_bytes(b"\0" * 16)
+
+        with pytest.raises(ValueError):
+            KoordIndex.laden(str(pfad))
@@ -0,0 +1,135 @@
+"""Tests for netz.py - Shared pooled HTTP sessions with retries and counters."""
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import netz
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-Alive
+
+    def log_message(self, *args):
+        pass
+
+    def _antworten(self):
+        server = self.server
+        server.anfragen.append((self.command, self.path, self.client_address[1]))
+        laenge = int(self.headers.get("Content-Length") or 0)
+        if laenge:
+            self.rfile.read(laenge)
+        status = server.status.pop(0) if server.status else 200
+        if self.path == "/langsam":
+            time.sleep(0.5)
+        body = b"ok" * 5
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _antworten
+    do_POST = _antworten
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Timeout-Tests trennen die Verbindung absichtlich vor der Antwort -> kein Traceback auf stderr
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+@pytest.fixture
+def server():
+    httpd = _Server(("127.0.0.1", 0), _Handler)
+    httpd.anfragen = []
+    httpd.status = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def netz_frisch(monkeypatch):
+    monkeypatch.setattr(netz, "BACKOFF_FAKTOR", 0)
+    netz.zuruecksetzen()
+    yield
+    netz.zuruecksetzen()
+
+
+def _freier_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestNetz:
+    """Tests for the shared HTTP layer."""
+
+    def test_get_is_retried_on_5xx(self, server):
+        server.status = [503, 502]
+
+        response = netz.get(server.url + "/settings")
+
+        assert response.status_code == 200
+        assert len(server.anfragen) == 3
+
+    def test_post_is_not_retried_on_5xx(self, server):
+        server.status = [503]
+
+        response = netz.post(server.url + "/export", data={"a": "1"})
+
+        assert response.status_code == 503
+        assert len(server.anfragen) == 1
+        assert netz.statistik()[server.url].fehler == 1
+
+    def test_read_timeout_is_bounded(self, server, monkeypatch):
+        monkeypatch.setattr(netz, "WIEDERHOLUNGEN", 1)
+
+        # Nach ausgeschöpften Wiederholungen meldet requests den Lese-Timeout als ConnectionError
+        with pytest.raises(requests.RequestException, match="Read timed out"):
+            netz.get(server.url + "/langsam", timeout=(1, 0.1))
+        assert len(server.anfragen) == 2
+        assert netz.statistik()[server.url].fehler == 1
+
+    def test_connection_is_reused(self, server):
+        for _ in range(5):
+            netz.get(server.url + "/settings")
+
+        assert len({port for _, _, port in server.anfragen}) == 1
+
+    def test_one_session_per_host(self, server):
+        assert netz.session(server.url + "/a") is netz.session(server.url + "/b?x=1")
+        assert netz.session(server.url) is not netz.session("https://de221.die-staemme.de/")
+
+    def test_counters_per_host(self, server):
+        netz.get(server.url + "/a")
+        netz.get(server.url + "/b", stream=True).close()
+        server.status = [404]
+        netz.get(server.url + "/c")
+
+        werte = netz.statistik()[server.url]
+        assert (werte.anfragen, werte.fehler, werte.bytes) == (3, 1, 30)
+        assert werte.sekunden > 0
+
+        # Momentaufnahme, keine Referenz auf die Zähler
+        werte.anfragen = 99
+        assert netz.statistik()[server.url].anfragen == 3
+
+    def test_connection_error_is_counted(self, monkeypatch):
+        monkeypatch.setattr(netz, "WIEDERHOLUNGEN", 1)
+        url = f"http://127.0.0.1:{_freier_port()}"
+
+        with pytest.raises(requests.ConnectionError):
+            netz.get(url + "/settings")
+        assert netz.statistik()[url].fehler == 1
@@ -0,0 +1,77 @@
+"""Tests for parallel_matching.py - Process-pool candidate search partitioned by continent."""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from freezegun import freeze_time
+
+from parallel_matching import ParallelesMatching, _kandidaten_partition
+from tab_matching import Angriff, MatchKontext, TabMatching
+from tests.conftest import MockDorf
+
+
+def _zufallsplan(berlin_tz, anzahl_doerfer=150, anzahl_angriffe=120, seed=7):
+    rng = random.Random(seed)
+    koord = lambda: f"{rng.randint(460, 560):03d}|{rng.randint(460, 560):03d}"
+    doerfer = [
+        MockDorf(
+            dorf_name=f"Dorf {i}",
+            koordinaten=koord(),
+            truppen={
+                "Speerträger": rng.choice([0, 100, 300]),
+                "Schwertkämpfer": rng.choice([0, 100, 200]),
+                "Schwere Kavallerie": rng.choice([0, 50, 150]),
+                "Axtkämpfer": rng.choice([0, 1]),
+                "Späher": rng.randint(0, 10),
+            }
+        )
+        for i in range(anzahl_doerfer)
+    ]
+    basis = berlin_tz.localize(datetime(2026, 1, 25, 12, 0, 0))
+    angriffe = [
+        Angriff(ziel_koord=koord(), ankunftszeit=basis + timedelta(minutes=rng.randint(0, 1440)))
+        for _ in range(anzahl_angriffe)
+    ]
+    return doerfer, angriffe
+
+
+class TestParallelesMatching:
+    """Tests for finde_tabs(prozesse=...)."""
+
+    @pytest.mark.parametrize("top_k", [1, 8])
+    def test_identical_to_sequential(self, berlin_tz, top_k):
+        """Test that the parallel greedy gives exactly the sequential result, also when top_k runs out."""
+        doerfer, angriffe = _zufallsplan(berlin_tz)
+        tabgroessen = [{"Speerträger": 100}, {"Schwertkämpfer": 100, "Schwere Kavallerie": 50}]
+
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            sequentiell = TabMatching.finde_tabs(angriffe, doerfer, tabgroessen)
+            parallel = TabMatching.finde_tabs(
+                angriffe, doerfer, tabgroessen,
+                prozesse=2, parallel_top_k=top_k
+            )
+
+        assert len(sequentiell) > 20
+        assert parallel == sequentiell
+
+    def test_halo_contains_reachable_neighbour_villages(self, berlin_tz):
+        """Test that a partition gets villages of neighbouring continents within reach, but not far ones."""
+        doerfer = [
+            MockDorf(dorf_name="Heim", koordinaten="550|550", truppen={"Speerträger": 100}),
+            MockDorf(dorf_name="Nachbar", koordinaten="603|550", truppen={"Speerträger": 100}),
+            MockDorf(dorf_name="Fern", koordinaten="900|900", truppen={"Speerträger": 100}),
+        ]
+        angriffe = [Angriff(ziel_koord="599|550", ankunftszeit=berlin_tz.localize(datetime(2026, 1, 26, 12, 0, 0)))]
+
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            einstellungen = dict(tabgroessen_liste=[{"Speerträger": 100}], enabled_speed_units=[])
+            kontext = MatchKontext(angriffe, doerfer, **einstellungen)
+            auftraege = ParallelesMatching(kontext, einstellungen, prozesse=2).partitionen(angriffe)
+
+            assert len(auftraege) == 1
+            assert [koord for _, koord, _ in auftraege[0]["doerfer"]] == ["550|550", "603|550"]
+
+            (angriff_idx, kandidaten, abgeschnitten), = _kandidaten_partition(auftraege[0])
+
+        assert angriff_idx == 0 and not abgeschnitten
+        assert [dorf_idx for _, _, dorf_idx, _, _ in kandidaten] == [0, 1]
@@ -0,0 +1,70 @@
+"""Tests for parse_cache.py - LRU cache for parse results keyed by text hash and parser version."""
+from eigene_truppen_parser import EigeneTruppenParser
+from parse_cache import ParseCache
+from sos_parser import SosParser
+
+TRUPPEN = "Dorf 1 (500|500) K55 eigene 1 2 3 4 5 6 7 8 9 10"
+
+
+class ZaehlenderParser:
+    """Counts parse calls."""
+
+    def __init__(self, parse):
+        self.aufrufe = 0
+        self._parse = parse
+
+    def __call__(self, text):
+        self.aufrufe += 1
+        return self._parse(text)
+
+
+class TestParseCache:
+    """Tests for ParseCache."""
+
+    def test_each_text_is_parsed_once(self):
+        cache = ParseCache()
+        parse = ZaehlenderParser(EigeneTruppenParser.parse)
+
+        ergebnisse = [cache.parse(EigeneTruppenParser, TRUPPEN, parse) for _ in range(5)]
+
+        assert parse.aufrufe == 1
+        assert all(e is ergebnisse[0] for e in ergebnisse)
+        assert (cache.treffer, cache.fehlversuche) == (4, 1)
+
+    def test_options_and_parser_are_part_of_the_key(self):
+        cache = ParseCache()
+        normal = cache.parse(EigeneTruppenParser, TRUPPEN, EigeneTruppenParser.parse, False)
+        bogen = cache.parse(
+            EigeneTruppenParser, TRUPPEN, lambda t: EigeneTruppenParser.parse(t, bogenschuetzen=True), True
+        )
+
+        assert "Bogenschützen" not in normal[0].truppen
+        assert bogen[0].truppen["Katapulte"] == 10
+        assert cache.parse(SosParser, TRUPPEN, SosParser.parse) == []
+        assert cache.fehlversuche == 3
+
+    def test_parser_version_invalidates(self, monkeypatch):
+        cache = ParseCache()
+        parse = ZaehlenderParser(EigeneTruppenParser.parse)
+        cache.parse(EigeneTruppenParser, TRUPPEN, parse)
+
+        monkeypatch.setattr(EigeneTruppenParser, "VERSION", EigeneTruppenParser.VERSION + 1)
+        cache.parse(EigeneTruppenParser, TRUPPEN, parse)
+
+        assert parse.aufrufe == 2
+
+    def test_least_recently_used_is_evicted(self):
+        cache = ParseCache(max_eintraege=2)
+        parse = ZaehlenderParser(EigeneTruppenParser.parse)
+        texte = [TRUPPEN.replace("Dorf 1", f"Dorf {i}") for i in range(3)]
+
+        cache.parse(EigeneTruppenParser, texte[0], parse)
+        cache.parse(EigeneTruppenParser, texte[1], parse)
+        cache.parse(EigeneTruppenParser, texte[0], parse)   # 0 zuletzt benutzt
+        cache.parse(EigeneTruppenParser, texte[2], parse)   # verdrängt 1
+        assert parse.aufrufe == 3
+
+        cache.parse(EigeneTruppenParser, texte[0], parse)
+        assert parse.aufrufe == 3
+        cache.parse(EigeneTruppenParser, texte[1], parse)
+        assert parse.aufrufe == 4
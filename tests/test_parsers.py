@@ -2,8 +2,9 @@
 import pytest
 from datetime import datetime
 import pytz
-from sos_parser import SosParser, Angriff
+from sos_parser import SosParser, SosParseStand, Angriff
 from eigene_truppen_parser import EigeneTruppenParser, EigenesDorf
+from support_parser import SupportParser
 
 
 class TestSosParser:
@@ -248,6 +249,7 @@ Dorf K55 (555|555) K55 eigene 2000 1500 1000 200 300 400 100 150"""
         result = EigeneTruppenParser.parse(text)
         
         assert len(result) == 2
+        assert [d.kontinent for d in result] == [45, 55]
 
     def test_parse_coordinate_edge_cases(self):
         """Test parsing edge case coordinates."""
@@ -297,6 +299,213 @@ Dorf 3 (520|520) K45 eigene 500 400 300 50 100 150 25 40"""
         assert result[0].truppen["Rammböcke"] == 7
         assert result[0].truppen["Katapulte"] == 8
 
+    def test_archer_world_columns(self):
+        """Test that an archer world export maps ten columns including both archer units."""
+        text = "Bogen (500|500) K45 eigene 1 2 3 4 5 6 7 8 9 10 0 0"
+
+        result = EigeneTruppenParser.parse(text, bogenschuetzen=True)
+
+        assert result[0].truppen == {
+            "Speerträger": 1, "Schwertkämpfer": 2, "Axtkämpfer": 3, "Bogenschützen": 4, "Späher": 5,
+            "Leichte Kavallerie": 6, "Berittene Bogenschützen": 7, "Schwere Kavallerie": 8,
+            "Rammböcke": 9, "Katapulte": 10,
+        }
+
+    def test_name_containing_eigene_and_parentheses(self):
+        """Test that 'eigene' and brackets inside the village name do not confuse the tokenizer."""
+        text = "Meine eigene (Burg) (123|456) K41\teigene\t1 2 3 4 5 6 7 8\tBefehle"
+
+        result = EigeneTruppenParser.parse(text)
+
+        assert len(result) == 1
+        assert result[0].dorf_name == "Meine eigene (Burg)"
+        assert result[0].koordinaten == "123|456"
+        assert result[0].kontinent == 41
+        assert result[0].truppen["Katapulte"] == 8
+
+    def test_line_break_between_header_and_eigene(self):
+        """Test that 'eigene' on the line after the village header still belongs to that village."""
+        text = "Dorf 1 (500|500) K45\neigene 1 2 3 4 5 6 7 8\nDorf 2 (510|510) K45 eigene 1 1 1 1 1 1 1 1"
+
+        result = EigeneTruppenParser.parse(text)
+
+        assert [(d.dorf_name, d.koordinaten) for d in result] == [("Dorf 1", "500|500"), ("Dorf 2", "510|510")]
+        assert result[0].truppen["Katapulte"] == 8
+
+    def test_troop_values_wrapped_onto_next_lines(self):
+        """Test that troop numbers continuing on the following (and blank) lines are collected."""
+        text = "Dorf 1 (500|500) K45 eigene 1 2 3\n4 5 6\n\n7 8 0 1\nDorf 2 (510|510) K45 eigene\n9 9 9 9 9 9 9 9"
+
+        result = EigeneTruppenParser.parse(text)
+
+        assert len(result) == 2
+        assert list(result[0].truppen.values()) == [1, 2, 3, 4, 5, 6, 7, 8]
+        assert result[1].dorf_name == "Dorf 2" and result[1].truppen["Speerträger"] == 9
+
+    def test_several_villages_on_one_line(self, capsys):
+        """Test that scanning continues after a completed village on the same line."""
+        text = (
+            "Dorf 1 (500|500) K45 eigene 1 2 3 4 5 6 7 8 0 1 "
+            "Dorf 2 (510|510) K45 eigene 2 2 2 2 2 2 2 2 Dorf 3 (520|520) K45 eigene 3 3 Dorf 4 (530|530) K45 eigene 4 4"
+        )
+
+        result = EigeneTruppenParser.parse(text)
+
+        assert [d.dorf_name for d in result] == ["Dorf 1", "Dorf 2"]
+        assert result[1].truppen["Speerträger"] == 2
+        warnung = capsys.readouterr().out
+        assert "WARNUNG: 2 Dorf/Dörfer" in warnung and "Dorf 3 (520|520)" in warnung and "Dorf 4 (530|530)" in warnung
+
+    def test_no_output_per_village_and_one_summary_warning(self, capsys):
+        """Test that parsing is silent per village and reports skipped villages once."""
+        text = """Dorf 1 (500|500) K45 eigene 1000 800 600
+Dorf 2 (510|510) K45 eigene 2000 1500 1000 200 300 400 100 150
+Dorf 3 (520|520) K45 eigene 5 5"""
+
+        result = EigeneTruppenParser.parse(text)
+
+        ausgabe = capsys.readouterr().out.strip().splitlines()
+        assert len(result) == 1
+        assert len(ausgabe) == 1
+        assert ausgabe[0].startswith("WARNUNG: 2 Dorf/Dörfer")
+        assert "Dorf 1 (500|500)" in ausgabe[0] and "Dorf 3 (520|520)" in ausgabe[0]
+
+
+class TestSupportParser:
+    """Tests for SupportParser."""
+
+    def test_relative_and_absolute_arrivals(self, berlin_tz):
+        """Test that heute/morgen refer to the server date and absolute dates are read as Berlin time."""
+        text = """Serverzeit: 23:21:42 16/01/2026
+Unterstützung Dorf A (500|500) heute um 12:00:00
+Unterstützung Dorf B (501|500) Morgen um 01:02:03
+Unterstützung Dorf C (502|500) 17.01.26 13:00:00
+Unterstützung Dorf D (503|500) 01.07.2026 14:00:00
+Angriff Dorf E (504|500) heute um 12:00:00"""
+
+        result = SupportParser.parse(text)
+
+        assert [s.ziel_koord for s in result] == ["500|500", "501|500", "502|500", "503|500"]
+        assert [s.ankunftszeit for s in result] == [
+            berlin_tz.localize(datetime(2026, 1, 16, 12, 0, 0)),
+            berlin_tz.localize(datetime(2026, 1, 17, 1, 2, 3)),
+            berlin_tz.localize(datetime(2026, 1, 17, 13, 0, 0)),
+            berlin_tz.localize(datetime(2026, 7, 1, 14, 0, 0)),
+        ]
+        assert result[3].ankunftszeit.utcoffset().total_seconds() == 7200
+
+    def test_invalid_dates_are_skipped(self):
+        text = """Serverzeit: 23:21:42 16/01/2026
+Unterstützung (500|500) 31.02.26 12:00:00
+Unterstützung (501|500) heute um 25:00:00
+Unterstützung (502|500) heute um 12:00:00"""
+        assert [s.ziel_koord for s in SupportParser.parse(text)] == ["502|500"]
+
+
+class TestIterParse:
+    """Tests for the streaming iter_parse variants."""
+
+    SOS = (
+        "[b]Dorf:[/b] [coord]500|500[/coord]\r\n"
+        "[command]attack[/command] Axtkämpfer [coord]510|510[/coord] --> Ankunftszeit: 25.01.26 12:00:00\r\n"
+        "[b]Dorf:[/b] [coord]505|505[/coord]\r\n"
+        "[command]attack[/command] [coord]515|515[/coord] --> Ankunftszeit: 25.01.26 13:00:00\r\n"
+    )
+    TRUPPEN = (
+        "Dorf Süd (500|500) K55 eigene 1 2 3 4 5 6 7 8\n"
+        "Dorf Nord (510|490) K45 eigene 10 20 30 40 50 60 70 80\n"
+    )
+
+    @pytest.fixture
+    def dateien(self, tmp_path):
+        sos = tmp_path / "sos.txt"
+        sos.write_bytes(self.SOS.encode("utf-8"))
+        truppen = tmp_path / "truppen.txt"
+        truppen.write_bytes(self.TRUPPEN.encode("utf-8"))
+        return sos, truppen
+
+    def test_text_file_matches_parse(self, dateien):
+        sos, truppen = dateien
+        with open(sos, encoding="utf-8", newline="") as f:
+            assert list(SosParser.iter_parse(f)) == SosParser.parse(self.SOS)
+        with open(truppen, encoding="utf-8") as f:
+            assert list(EigeneTruppenParser.iter_parse(f)) == EigeneTruppenParser.parse(self.TRUPPEN)
+
+    def test_binary_file_and_mmap(self, dateien):
+        import mmap
+
+        sos, truppen = dateien
+        with open(sos, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            angriffe = list(SosParser.iter_parse(mm))
+        with open(truppen, "rb") as f:
+            doerfer = list(EigeneTruppenParser.iter_parse(f))
+
+        assert [(a.ziel_koord, a.einheit) for a in angriffe] == [("500|500", "Axtkämpfer"), ("505|505", "")]
+        assert [d.dorf_name for d in doerfer] == ["Dorf Süd", "Dorf Nord"]
+        assert doerfer[1].kontinent == 45
+
+    def test_records_are_yielded_lazily(self):
+        def zeilen():
+            yield "[b]Dorf:[/b] [coord]500|500[/coord]"
+            yield "[command]attack[/command] [coord]510|510[/coord] --> Ankunftszeit: 25.01.26 12:00:00"
+            raise AssertionError("nicht weiter lesen")
+
+        assert next(SosParser.iter_parse(zeilen())).ziel_koord == "500|500"
+
+
+class TestParseFortsetzen:
+    """Tests for incremental SOS parsing of appended text."""
+
+    BLOECKE = [
+        "[b]Dorf:[/b] [coord]500|500[/coord]\n"
+        "[command]attack[/command] [coord]510|510[/coord] --> Ankunftszeit: 25.01.26 12:00:00\n",
+        "[command]attack[/command] [coord]511|511[/coord] --> Ankunftszeit: 25.01.26 12:30:00\n",
+        "[b]Dorf:[/b] [coord]505|505[/coord]\n"
+        "[command]attack[/command] [coord]515|515[/coord] --> Ankunftszeit: 25.01.26 13:00:00",
+    ]
+
+    def test_appended_blocks_match_full_parse(self):
+        stand = SosParseStand()
+        text = ""
+        for block in self.BLOECKE:
+            text += block
+            assert SosParser.parse_fortsetzen(stand, text) == SosParser.parse(text)
+
+        # Zieldorf aus dem ersten Block gilt für den zweiten weiter
+        assert [a.ziel_koord for a in SosParser.parse_fortsetzen(stand, text)] == ["500|500", "500|500", "505|505"]
+        assert stand.zeilen == 4
+        assert stand.zieldorf == "505|505"
+
+    def test_only_the_suffix_is_parsed(self, monkeypatch):
+        stand = SosParseStand()
+        text = "".join(self.BLOECKE[:2])
+        SosParser.parse_fortsetzen(stand, text)
+
+        gelesen = []
+        original = SosParser.iter_parse
+        monkeypatch.setattr(
+            SosParser, "iter_parse", staticmethod(lambda quelle, stand=None: (gelesen.append(quelle), original(quelle, stand))[1])
+        )
+        assert len(SosParser.parse_fortsetzen(stand, text + self.BLOECKE[2])) == 3
+        assert "".join(gelesen) == self.BLOECKE[2]
+
+    def test_incomplete_last_line_is_reread(self):
+        stand = SosParseStand()
+        zeile = self.BLOECKE[1]
+        text = self.BLOECKE[0] + zeile[:40]
+        assert len(SosParser.parse_fortsetzen(stand, text)) == 1
+        assert len(SosParser.parse_fortsetzen(stand, self.BLOECKE[0] + zeile)) == 2
+
+    def test_edited_prefix_starts_over(self):
+        stand = SosParseStand()
+        text = "".join(self.BLOECKE)
+        SosParser.parse_fortsetzen(stand, text)
+
+        bearbeitet = text.replace("500|500", "501|501", 1)
+        result = SosParser.parse_fortsetzen(stand, bearbeitet)
+        assert result == SosParser.parse(bearbeitet)
+        assert result[0].ziel_koord == "501|501"
+
 
 class TestParserIntegration:
     """Integration tests for parsers."""
@@ -0,0 +1,50 @@
+"""Tests for sende_slots.py - Send-slot scheduler for the minimum send interval."""
+import pytest
+
+import zeit
+from sende_slots import SendeSlotPlaner
+
+
+@pytest.fixture
+def t():
+    basis = zeit.lokal_ms(2026, 1, 25, 12)
+    return lambda sekunden: basis + sekunden * 1000
+
+
+class TestSendeSlotPlaner:
+    """Tests for SendeSlotPlaner."""
+
+    def test_inactive_without_interval(self, t):
+        slots = SendeSlotPlaner(0)
+        slots.belegen(t(0))
+        assert slots.frei(t(0))
+        assert len(slots) == 0
+        slots.freigeben(t(0))
+
+    def test_checks_both_neighbours(self, t):
+        """Test that a slot between two booked times must keep the gap to each of them."""
+        slots = SendeSlotPlaner(60)
+        slots.belegen(t(0))
+        slots.belegen(t(200))
+
+        assert not slots.frei(t(30))    # zu nah am Vorgänger
+        assert not slots.frei(t(170))   # zu nah am Nachfolger
+        assert not slots.frei(t(-59))   # vor allen, aber zu nah
+        assert slots.frei(t(100))
+        assert slots.frei(t(60)) and slots.frei(t(140))  # genau der Mindestabstand
+
+    def test_booking_order_does_not_matter(self, t):
+        slots = SendeSlotPlaner(60)
+        for sekunden in (300, 0, 150):
+            slots.belegen(t(sekunden))
+        assert slots.zeiten == sorted(slots.zeiten)
+        assert not slots.frei(t(100))
+
+    def test_freigeben(self, t):
+        slots = SendeSlotPlaner(60)
+        slots.belegen(t(0))
+        slots.belegen(t(0))
+        slots.freigeben(t(0))
+        assert len(slots) == 1 and not slots.frei(t(10))
+        slots.freigeben(t(0))
+        assert slots.frei(t(10))
@@ -0,0 +1,86 @@
+"""Tests for tab_kapazitaet.py - Vectorized possible-tabs capacity for all combinations."""
+import random
+
+import pytest
+
+import tab_kapazitaet
+from eigene_truppen_parser import EigenesDorf
+from tab_kapazitaet import Kapazitaet, TabKapazitaet
+
+EINHEITEN = ["Speerträger", "Schwertkämpfer", "Axtkämpfer", "Späher", "Leichte Kavallerie"]
+
+
+def _dorf(**truppen):
+    return EigenesDorf(dorf_name="Dorf", koordinaten="500|500", truppen=truppen)
+
+
+def _alte_schleife(doerfer, kombi):
+    """The previous per-combination loop with float('inf') sentinels."""
+    gesamt = 0
+    for dorf in doerfer:
+        max_tabs_dorf = float("inf")
+        for einheit, benoetigt in kombi.items():
+            if benoetigt > 0:
+                max_tabs_dorf = min(max_tabs_dorf, dorf.truppen.get(einheit, 0) // benoetigt)
+        if max_tabs_dorf != float("inf"):
+            gesamt += max_tabs_dorf
+    return int(gesamt)
+
+
+@pytest.fixture(params=["numpy", "python"])
+def modus(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(tab_kapazitaet, "np", None)
+    return request.param
+
+
+class TestTabKapazitaet:
+    """Tests for TabKapazitaet.berechne."""
+
+    def test_sum_of_per_village_minimum_and_bottleneck(self, modus):
+        doerfer = [_dorf(Speerträger=1000, Axtkämpfer=250), _dorf(Speerträger=90, Axtkämpfer=5000)]
+        kombis = [{"Speerträger": 100, "Axtkämpfer": 50}, {"Axtkämpfer": 1000}]
+
+        assert TabKapazitaet.berechne(doerfer, kombis) == [
+            Kapazitaet(tabs=5, engpass="Speerträger"),   # 5 + 0; Speer allein: 10, Axt allein: 105
+            Kapazitaet(tabs=5, engpass="Axtkämpfer"),
+        ]
+
+    def test_combinations_without_requirements(self, modus):
+        doerfer = [_dorf(Speerträger=1000)]
+
+        assert TabKapazitaet.berechne(doerfer, [{}, {"Späher": 0}, {"Späher": 5}]) == [
+            Kapazitaet(0, None), Kapazitaet(0, None), Kapazitaet(0, "Späher"),
+        ]
+        assert TabKapazitaet.berechne(doerfer, []) == []
+        assert TabKapazitaet.berechne([], [{"Späher": 5}]) == [Kapazitaet(0, "Späher")]
+
+    def test_matches_previous_loop_on_random_accounts(self, modus):
+        rng = random.Random(5)
+        doerfer = [
+            _dorf(**{e: rng.randint(0, 8000) for e in EINHEITEN if rng.random() < 0.9}) for _ in range(300)
+        ]
+        kombis = [
+            {e: rng.choice([0, 1, 50, 300, 1000]) for e in rng.sample(EINHEITEN, rng.randint(1, 4))}
+            for _ in range(40)
+        ]
+
+        ergebnis = TabKapazitaet.berechne(doerfer, kombis)
+
+        assert [k.tabs for k in ergebnis] == [_alte_schleife(doerfer, kombi) for kombi in kombis]
+        for kombi, kapazitaet in zip(kombis, ergebnis):
+            if kapazitaet.engpass:
+                einzeln = {e: sum(d.truppen.get(e, 0) // m for d in doerfer) for e, m in kombi.items() if m > 0}
+                assert einzeln[kapazitaet.engpass] == min(einzeln.values())
+
+    def test_numpy_and_python_agree(self, monkeypatch):
+        pytest.importorskip("numpy")
+        rng = random.Random(9)
+        doerfer = [_dorf(**{e: rng.randint(0, 50) for e in EINHEITEN}) for _ in range(50)]
+        kombis = [{e: rng.randint(1, 10) for e in rng.sample(EINHEITEN, 3)} for _ in range(30)]
+
+        vektorisiert = TabKapazitaet.berechne(doerfer, kombis)
+        monkeypatch.setattr(tab_kapazitaet, "np", None)
+        assert TabKapazitaet.berechne(doerfer, kombis) == vektorisiert
@@ -1,9 +1,11 @@
 """Tests for tab_matching.py - Core tab matching logic."""
 import pytest
+from collections.abc import Mapping
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 import pytz
 
+import zeit
 from tab_matching import Angriff, TabMatching, TabMatch
 from tests.conftest import berlin_tz
 
@@ -525,6 +527,108 @@ class TestTabMatchingFindeTabs:
                 # So einheit_kuerzel should be Speerträger
                 assert match.einheit_kuerzel in match.einheiten, "Slowest unit should be in the tab"
 
+    def test_unreachable_villages_are_not_evaluated(self, berlin_tz):
+        """Test that villages outside the reachable radius never enter the combo loop."""
+        from freezegun import freeze_time
+        from distanz_rechner import DistanzRechner
+
+        nah = type('Dorf', (), {'koordinaten': '502|500', 'truppen': {'Speerträger': 500}})()
+        fern = type('Dorf', (), {'koordinaten': '900|900', 'truppen': {'Speerträger': 500}})()
+
+        attacks = [Angriff(ziel_koord="500|500", ankunftszeit=berlin_tz.localize(datetime(2026, 1, 25, 12, 0, 0)))]
+
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            with patch.object(DistanzRechner, "berechne_distanz", wraps=DistanzRechner.berechne_distanz) as spy:
+                matches = TabMatching.finde_tabs(
+                    angriffe=attacks,
+                    eigene_dörfer=[fern, nah],
+                    tabgroessen_liste=[{"Speerträger": 100}],
+                    auto_scouts_enabled=False,
+                    auto_speed_units={}
+                )
+
+        assert len(matches) == 1
+        assert matches[0].herkunft.koordinaten == "502|500"
+        assert spy.call_count == 1
+
+
+class TestKandidatenAuswahl:
+    """Tests for the running-best / bounded-heap candidate selection of MatchKontext."""
+
+    def _kontext(self, sample_doerfer, multiple_tabgroessen):
+        from tab_matching import MatchKontext
+        return MatchKontext([], sample_doerfer, multiple_tabgroessen)
+
+    def test_bester_kandidat_equals_sorted_first(self, sample_doerfer, multiple_tabgroessen, berlin_tz):
+        """Test that the running best is the first element of the stably sorted candidate list."""
+        from freezegun import freeze_time
+
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            kontext = self._kontext(sample_doerfer, multiple_tabgroessen)
+            for ziel in ["505|505", "515|515", "500|500"]:
+                ankunft = zeit.epoch_ms(berlin_tz.localize(datetime(2026, 1, 25, 18, 0, 0)))
+                indizes, distanzen = kontext.doerfer_in_reichweite(ziel, kontext.reichweite(ankunft))
+                alle = sorted(kontext.kandidaten(ziel, ankunft, indizes, distanzen), key=lambda t: (t[0], t[1]))
+
+                assert kontext.bester_kandidat(ziel, ankunft) == alle[0]
+                assert kontext.beste_kandidaten(ziel, ankunft, 3) == alle[:3]
+
+    def test_ties_keep_village_order(self, berlin_tz):
+        """Test that equal send time and distance go to the first village."""
+        from freezegun import freeze_time
+        from tab_matching import MatchKontext
+
+        doerfer = [
+            type('Dorf', (), {'koordinaten': '503|500', 'truppen': {'Speerträger': 100}})(),
+            type('Dorf', (), {'koordinaten': '497|500', 'truppen': {'Speerträger': 100}})(),
+        ]
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            kontext = MatchKontext([], doerfer, [{"Speerträger": 100}], enabled_speed_units=[])
+            ankunft = zeit.epoch_ms(berlin_tz.localize(datetime(2026, 1, 25, 18, 0, 0)))
+            assert kontext.bester_kandidat("500|500", ankunft)[2] == 0
+            assert [k[2] for k in kontext.beste_kandidaten("500|500", ankunft, 5)] == [0, 1]
+            assert kontext.bester_kandidat("900|900", ankunft) is None
+
+    def test_world_unit_registry(self, berlin_tz):
+        """Test that tab sizes accept unit aliases and units missing on the world get no speed variant."""
+        from freezegun import freeze_time
+        from einheiten import UnitRegistry
+        from tab_matching import MatchKontext
+        from welt_einstellungen import WeltEinstellungen
+
+        doerfer = [type('Dorf', (), {'koordinaten': '503|500', 'truppen': {'Speerträger': 100, 'Katapulte': 5}})()]
+        ohne_katapulte = UnitRegistry.aus_welt(WeltEinstellungen(1.0, 1.0, {"spear": 18, "axe": 18, "heavy": 11}))
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            kontext = MatchKontext(
+                [], doerfer, [{"spear": 100, "schwere kavallerie": 10}],
+                enabled_speed_units=["Axtkämpfer", "Katapulte"], einheiten=ohne_katapulte
+            )
+
+        varianten = kontext.tab_vorlagen[0]
+        assert varianten[0][0] == {"Speerträger": 100, "Schwere Kavallerie": 10}
+        assert [v[0] for v in varianten[1:]] == [{"Speerträger": 100, "Schwere Kavallerie": 10, "Axtkämpfer": 1}]
+
+    def test_min_send_interval_falls_through_to_next_village(self, berlin_tz):
+        """Test that a blocked send slot moves the attack to the next-best village instead of dropping it."""
+        from freezegun import freeze_time
+
+        doerfer = [
+            type('Dorf', (), {'koordinaten': '505|500', 'truppen': {'Speerträger': 1000}})(),
+            type('Dorf', (), {'koordinaten': '503|500', 'truppen': {'Speerträger': 1000}})(),
+        ]
+        ankunft = berlin_tz.localize(datetime(2026, 1, 25, 15, 0, 0))
+        attacks = [
+            Angriff(ziel_koord="500|500", ankunftszeit=ankunft),
+            Angriff(ziel_koord="500|500", ankunftszeit=ankunft + timedelta(seconds=5)),
+        ]
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            matches = TabMatching.finde_tabs(
+                attacks, doerfer, [{"Speerträger": 100}], auto_speed_units={}, min_send_interval_seconds=60
+            )
+
+        assert [m.herkunft.koordinaten for m in matches] == ["505|500", "503|500"]
+        assert abs((matches[1].abschickzeit - matches[0].abschickzeit).total_seconds()) >= 60
+
 
 class TestPruefeInEinemBeliebigenZeitfenster:
     """Tests for the pruefe_in_einem_beliebigen_zeitfenster method."""
@@ -626,7 +730,7 @@ class TestExportFunctions:
         assert "1001" in result  # Source village ID
         assert "1002" in result  # Target village ID
 
-    @patch('tab_matching.requests.get')
+    @patch('netz.get')
     def test_lade_koord_to_id_map_success(self, mock_get):
         """Test successful loading of coordinate to ID mapping."""
         import gzip
@@ -640,18 +744,19 @@ class TestExportFunctions:
         
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.content = compressed.getvalue()
+        mock_response.iter_content.return_value = [compressed.getvalue()]
+        mock_response.headers = {}
         mock_get.return_value = mock_response
         
         result = TabMatching.lade_koord_to_id_map("221")
         
-        assert isinstance(result, dict)
+        assert isinstance(result, Mapping)
         assert "500|500" in result
         assert result["500|500"] == 1001
         assert "505|505" in result
         assert result["505|505"] == 1002
 
-    @patch('tab_matching.requests.get')
+    @patch('netz.get')
     def test_lade_koord_to_id_map_failure(self, mock_get):
         """Test handling of failed coordinate mapping download."""
         mock_response = MagicMock()
@@ -661,7 +766,7 @@ class TestExportFunctions:
         with pytest.raises(RuntimeError, match="Download der Dorfdaten fehlgeschlagen"):
             TabMatching.lade_koord_to_id_map("999")
 
-    @patch('tab_matching.requests.post')
+    @patch('netz.post')
     @patch('tab_matching.TabMatching.lade_koord_to_id_map')
     def test_send_attackplanner_to_dsu(self, mock_lade_koord, mock_post, sample_doerfer, berlin_tz):
         """Test sending attack planner to DS Ultimate API."""
@@ -697,6 +802,35 @@ class TestExportFunctions:
         assert "edit" in result
         mock_post.assert_called_once()
 
+    @patch('netz.post')
+    @patch('tab_matching.TabMatching.lade_koord_to_id_map')
+    def test_exporters_use_world_registry(self, mock_lade_koord, mock_post, sample_doerfer, berlin_tz):
+        """Test that both exporters take DS keys and DSU ids from the registry passed in."""
+        from dataclasses import replace
+        from einheiten import UnitRegistry
+
+        mock_lade_koord.return_value = {"500|500": 1001, "505|505": 1002}
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.return_value = {"edit": "link"}
+        welt = UnitRegistry(
+            replace(e, ds_key="sword2", dsu_id=42) if e.name == "Schwertkämpfer" else e
+            for e in UnitRegistry.standard()
+        )
+        match = TabMatch(
+            herkunft=sample_doerfer[0],
+            ziel_koord="505|505",
+            abschickzeit=berlin_tz.localize(datetime(2026, 1, 25, 10, 0, 0)),
+            ankunftszeit=berlin_tz.localize(datetime(2026, 1, 25, 12, 0, 0)),
+            einheiten={"Speerträger": 100, "Schwertkämpfer": 100},
+            einheit_kuerzel="Schwertkämpfer"
+        )
+
+        assert "&sword2&" in TabMatching.export_dsultimate([match], "221", welt)
+        assert "&sword&" in TabMatching.export_dsultimate([match], "221")
+
+        TabMatching.send_attackplanner_to_dsu([match], "221", "key", einheiten=welt)
+        assert mock_post.call_args.kwargs["data"]["items[0][slowest_unit]"] == "42"
+
     @patch('tab_matching.TabMatching.lade_koord_to_id_map')
     def test_send_attackplanner_missing_api_key(self, mock_lade_koord):
         """Test that missing API key raises error."""
@@ -0,0 +1,100 @@
+"""Tests for truppen_ledger.py - Array-backed troop ledger."""
+from datetime import datetime
+
+import pytest
+
+from tab_matching import Angriff, TabMatching
+from truppen_ledger import EINHEITEN, EINHEIT_INDEX, TruppenLedger
+
+
+def _zeile(truppen):
+    """Erwartete Ledger-Zeile: alle Spalten, fehlende Einheiten 0."""
+    return {name: truppen.get(name, 0) for name in EINHEITEN}
+
+
+class TestTruppenLedger:
+    """Tests for the villages x units troop matrix."""
+
+    def test_unit_columns_follow_the_unit_registry(self):
+        """Test that column order is the registry's dense index."""
+        from einheiten import UnitRegistry, laufzeiten_pro_feld
+
+        assert EINHEITEN == list(laufzeiten_pro_feld) == UnitRegistry.standard().namen
+        assert all(EINHEIT_INDEX[name] == idx for idx, name in enumerate(EINHEITEN))
+        assert len(EINHEITEN) == 12
+
+    def test_construct_from_villages(self, sample_doerfer):
+        """Test that the ledger mirrors the villages' troops."""
+        ledger = TruppenLedger(sample_doerfer)
+
+        assert len(ledger) == 3
+        assert ledger.daten.itemsize == 4
+        assert ledger.zeile(1) == _zeile(sample_doerfer[1].truppen)
+
+    def test_missing_and_unknown_units(self):
+        """Test that missing units are 0 and unknown units are ignored."""
+        dorf = type('Dorf', (), {'truppen': {'Speerträger': 10, 'Bogenschützen': 99, 'Miliz': 5}})()
+        ledger = TruppenLedger([dorf])
+
+        assert ledger.bestand(0, EINHEIT_INDEX["Speerträger"]) == 10
+        assert ledger.bestand(0, EINHEIT_INDEX["Bogenschützen"]) == 99
+        assert ledger.bestand(0, EINHEIT_INDEX["Katapulte"]) == 0
+        assert sum(ledger.zeile(0).values()) == 109
+
+    def test_reicht_abbuchen_gutschreiben(self, sample_doerfer):
+        """Test availability checks and bookings."""
+        ledger = TruppenLedger(sample_doerfer)
+        bedarf = TruppenLedger.bedarf({"Speerträger": 400, "Schwere Kavallerie": 100})
+
+        assert ledger.reicht(2, bedarf)
+        ledger.abbuchen(2, bedarf)
+        assert ledger.bestand(2, EINHEIT_INDEX["Speerträger"]) == 100
+        assert not ledger.reicht(2, bedarf)
+
+        ledger.gutschreiben(2, bedarf)
+        assert ledger.zeile(2) == _zeile(sample_doerfer[2].truppen)
+
+    def test_snapshot_and_rollback(self, sample_doerfer):
+        """Test that rollback restores the exact snapshot state."""
+        ledger = TruppenLedger(sample_doerfer)
+        snapshot = ledger.snapshot()
+
+        ledger.abbuchen(0, TruppenLedger.bedarf({"Speerträger": 1000, "Späher": 100}))
+        ledger.setze_dorf(1, {"Speerträger": 1})
+        assert ledger.bestand(0, EINHEIT_INDEX["Speerträger"]) == 0
+
+        ledger.rollback(snapshot)
+        assert [ledger.zeile(i) for i in range(3)] == [_zeile(d.truppen) for d in sample_doerfer]
+
+    def test_anhaengen(self, sample_doerfer):
+        """Test that a new village gets the next row."""
+        ledger = TruppenLedger(sample_doerfer[:1])
+        assert ledger.anhaengen({"Späher": 7}) == 1
+        assert len(ledger) == 2
+        assert ledger.zeile(1)["Späher"] == 7
+        assert ledger.zeile(0) == _zeile(sample_doerfer[0].truppen)
+
+    def test_bedarf_rejects_unknown_units(self):
+        """Test that unknown unit names cannot be booked silently."""
+        with pytest.raises(KeyError):
+            TruppenLedger.bedarf({"Miliz": 1})
+
+
+class TestFindeTabsMitLedger:
+    """Tests that finde_tabs works on the ledger instead of copies."""
+
+    def test_caller_villages_are_not_touched(self, sample_doerfer, berlin_tz):
+        from freezegun import freeze_time
+
+        vorher = [(d.truppen.copy(), d.rest_truppen.copy()) for d in sample_doerfer]
+        attacks = [
+            Angriff(ziel_koord="505|505", ankunftszeit=berlin_tz.localize(datetime(2026, 1, 25, 15, 0, 0))),
+            Angriff(ziel_koord="505|505", ankunftszeit=berlin_tz.localize(datetime(2026, 1, 25, 15, 1, 0))),
+        ]
+
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            matches = TabMatching.finde_tabs(attacks, sample_doerfer, [{"Speerträger": 500}])
+
+        assert len(matches) == 2
+        assert all(any(m.herkunft is d for d in sample_doerfer) for m in matches)
+        assert [(d.truppen, d.rest_truppen) for d in sample_doerfer] == vorher
@@ -0,0 +1,86 @@
+"""Tests for welt_einstellungen.py - Persistent per-world settings from the XML interface."""
+import json
+
+import pytest
+import requests
+import responses
+
+from welt_einstellungen import WeltEinstellungenSpeicher
+
+CONFIG_URL = WeltEinstellungenSpeicher.url("221", "get_config")
+UNIT_INFO_URL = WeltEinstellungenSpeicher.url("221", "get_unit_info")
+
+CONFIG_XML = """<?xml version="1.0" encoding="UTF-8" ?>
+<config>
+    <speed>1.6</speed>
+    <unit_speed>0.625</unit_speed>
+    <moral>1</moral>
+    <game><archer>1</archer><knight>0</knight><tech>2</tech></game>
+</config>"""
+
+UNIT_INFO_XML = """<?xml version="1.0" encoding="UTF-8" ?>
+<config>
+    <spear><build_time>1020</build_time><pop>1</pop><speed>18.000000000504</speed></spear>
+    <sword><build_time>1500</build_time><pop>1</pop><speed>22.000000000264</speed></sword>
+    <archer><build_time>1800</build_time><pop>1</pop><speed>18.000000000504</speed></archer>
+    <snob><build_time>18000</build_time><pop>100</pop><speed>35.000000000385</speed></snob>
+</config>"""
+
+
+@pytest.fixture
+def server():
+    with responses.RequestsMock() as mock:
+        mock.add(responses.GET, CONFIG_URL, body=CONFIG_XML)
+        mock.add(responses.GET, UNIT_INFO_URL, body=UNIT_INFO_XML)
+        yield mock
+
+
+class TestWeltEinstellungen:
+    """Tests for WeltEinstellungenSpeicher.laden."""
+
+    def test_loads_once_from_the_xml_interface(self, server, dorf_daten_cache):
+        einstellungen = WeltEinstellungenSpeicher.laden("221")
+
+        assert einstellungen.welt_speed == 1.6
+        assert einstellungen.einheiten_speed == 0.625
+        assert einstellungen.minuten_pro_feld["sword"] == pytest.approx(22)
+        assert set(einstellungen.minuten_pro_feld) == {"spear", "sword", "archer", "snob"}
+        assert einstellungen.bogenschuetzen and not einstellungen.paladin
+        assert (dorf_daten_cache / "de221" / "einstellungen.json").exists()
+        assert WeltEinstellungenSpeicher.laden("221") is einstellungen
+        assert len(server.calls) == 2
+
+    def test_disk_store_is_reused_without_network(self, server):
+        erste = WeltEinstellungenSpeicher.laden("221")
+        WeltEinstellungenSpeicher.vergessen()
+
+        with responses.RequestsMock():  # jede Anfrage würde hier fehlschlagen
+            assert WeltEinstellungenSpeicher.laden("221") == erste
+        assert len(server.calls) == 2
+
+    def test_outdated_or_broken_file_is_reloaded(self, server, dorf_daten_cache):
+        pfad = dorf_daten_cache / "de221" / "einstellungen.json"
+        pfad.parent.mkdir(parents=True)
+        pfad.write_text(json.dumps({"version": 0, "welt_speed": 9}), encoding="utf-8")
+
+        assert WeltEinstellungenSpeicher.laden("221").welt_speed == 1.6
+        assert json.loads(pfad.read_text(encoding="utf-8"))["version"] == WeltEinstellungenSpeicher.VERSION
+
+        WeltEinstellungenSpeicher.vergessen()
+        pfad.write_text("{kaputt", encoding="utf-8")
+        assert WeltEinstellungenSpeicher.laden("221").einheiten_speed == 0.625
+        assert len(server.calls) == 4
+
+    def test_unreachable_server_raises_and_stores_nothing(self, dorf_daten_cache):
+        with responses.RequestsMock() as mock:
+            mock.add(responses.GET, CONFIG_URL, body=requests.ConnectionError("offline"))
+            with pytest.raises(RuntimeError, match="Download der Welteinstellungen fehlgeschlagen"):
+                WeltEinstellungenSpeicher.laden("221")
+        assert not (dorf_daten_cache / "de221" / "einstellungen.json").exists()
+
+    def test_incomplete_config_raises(self):
+        with responses.RequestsMock() as mock:
+            mock.add(responses.GET, CONFIG_URL, body="<config><speed>1</speed></config>")
+            mock.add(responses.GET, UNIT_INFO_URL, body=UNIT_INFO_XML)
+            with pytest.raises(RuntimeError, match="unvollständig"):
+                WeltEinstellungenSpeicher.laden("221")
@@ -0,0 +1,94 @@
+"""Tests for welt_vorlader.py - Background prefetch of world data."""
+import threading
+
+import pytest
+
+import dorf_daten
+from dorf_daten import DorfDaten
+from welt_einstellungen import WeltEinstellungen, WeltEinstellungenSpeicher
+from welt_vorlader import WeltVorlader, wenn_fertig
+
+
+@pytest.fixture
+def vorlader():
+    v = WeltVorlader()
+    yield v
+    v.beenden()
+
+
+@pytest.fixture
+def laden(monkeypatch):
+    """Ersetzt beide Ladevorgänge; sie blockieren, bis freigabe gesetzt ist, und zählen ihre Aufrufe."""
+    freigabe = threading.Event()
+    aufrufe = {"einstellungen": 0, "koord_index": 0}
+    fehler = {}
+
+    def lader(name, ergebnis):
+        def laden_(welt_id, *args):
+            aufrufe[name] += 1
+            freigabe.wait(5)
+            if fehler.pop(name, None):
+                raise RuntimeError(f"{name} offline")
+            return ergebnis
+        return laden_
+
+    monkeypatch.setattr(WeltEinstellungenSpeicher, "laden", lader("einstellungen", WeltEinstellungen(2.0, 0.5)))
+    monkeypatch.setattr(DorfDaten, "koord_index", lader("koord_index", {"500|500": 1}))
+    return freigabe, aufrufe, fehler
+
+
+class TestWeltVorlader:
+    """Tests for WeltVorlader and wenn_fertig."""
+
+    def test_start_does_not_block_and_runs_once_per_world(self, vorlader, laden):
+        freigabe, aufrufe, _ = laden
+
+        auftraege = vorlader.starten("221")
+        assert not any(f.done() for f in auftraege.values())
+        assert vorlader.starten("221") == auftraege
+
+        freigabe.set()
+        assert auftraege["einstellungen"].result(5) == WeltEinstellungen(2.0, 0.5)
+        assert auftraege["koord_index"].result(5) == {"500|500": 1}
+        assert vorlader.starten("221") == auftraege
+        assert aufrufe == {"einstellungen": 1, "koord_index": 1}
+
+        vorlader.starten("222")["koord_index"].result(5)
+        assert aufrufe["koord_index"] == 2
+
+    def test_failed_load_is_retried(self, vorlader, laden):
+        freigabe, aufrufe, fehler = laden
+        fehler["koord_index"] = True
+        freigabe.set()
+
+        erster = vorlader.starten("221")["koord_index"]
+        with pytest.raises(RuntimeError):
+            erster.result(5)
+
+        zweiter = vorlader.starten("221")["koord_index"]
+        assert zweiter is not erster
+        assert zweiter.result(5) == {"500|500": 1}
+
+    def test_village_index_is_renewed_after_ttl(self, vorlader, laden, monkeypatch):
+        freigabe, aufrufe, _ = laden
+        freigabe.set()
+        vorlader.starten("221")["koord_index"].result(5)
+
+        monkeypatch.setattr(dorf_daten, "TTL_SEKUNDEN", 0)
+        auftraege = vorlader.starten("221")
+        auftraege["koord_index"].result(5)
+        assert aufrufe == {"einstellungen": 1, "koord_index": 2}
+
+    def test_wenn_fertig_polls_instead_of_blocking(self, vorlader, laden):
+        freigabe, _, _ = laden
+        geplant = []
+        erledigt = []
+
+        wenn_fertig(lambda ms, f: geplant.append(f), vorlader.starten("221").values(), lambda: erledigt.append(1))
+        assert erledigt == [] and len(geplant) == 1
+
+        freigabe.set()
+        for future in vorlader.starten("221").values():
+            future.result(5)
+        geplant.pop()()
+        assert erledigt == [1] and geplant == []
@@ -0,0 +1,84 @@
+"""Tests for zeit.py - Integer epoch-ms time core with cached DST table."""
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import zeit
+
+
+class TestZeit:
+    """Tests that the DST table agrees with pytz."""
+
+    @pytest.mark.parametrize("wanduhr", [
+        datetime(2026, 1, 25, 10, 0, 0),
+        datetime(2026, 7, 1, 12, 30, 15),
+        datetime(2026, 3, 29, 1, 59, 59),   # letzte Sekunde Winterzeit
+        datetime(2026, 3, 29, 2, 30, 0),    # übersprungene Stunde
+        datetime(2026, 3, 29, 3, 0, 0),
+        datetime(2026, 10, 25, 2, 30, 0),   # doppelte Stunde
+        datetime(2026, 10, 25, 3, 0, 0),
+    ])
+    def test_lokal_ms_like_localize(self, berlin_tz, wanduhr):
+        erwartet = berlin_tz.localize(wanduhr)
+        assert zeit.epoch_ms(wanduhr) == int(erwartet.timestamp() * 1000)
+        assert zeit.berlin(wanduhr) == erwartet
+        assert str(zeit.berlin(wanduhr)) == str(erwartet)
+
+    def test_als_berlin_matches_pytz(self, berlin_tz):
+        rng = random.Random(12)
+        for _ in range(2000):
+            ms = rng.randint(zeit.lokal_ms(2000, 1, 1), zeit.lokal_ms(2036, 12, 31))
+            erwartet = datetime.fromtimestamp(ms / 1000, timezone.utc).astimezone(berlin_tz)
+            ergebnis = zeit.als_berlin(ms)
+            assert ergebnis == erwartet
+            assert ergebnis.utcoffset() == erwartet.utcoffset()
+            assert zeit.epoch_ms(ergebnis) == ms
+
+    def test_around_transitions(self):
+        beginn, ende = zeit._sommerzeit(2026)
+        assert not zeit.ist_sommerzeit(beginn - 1) and zeit.ist_sommerzeit(beginn)
+        assert zeit.ist_sommerzeit(ende - 1) and not zeit.ist_sommerzeit(ende)
+        assert zeit.als_berlin(beginn).hour == 3
+        assert zeit.als_berlin(ende - 1).hour == 2 and zeit.als_berlin(ende).hour == 2
+
+    def test_aware_datetimes_in_other_timezones(self):
+        utc = datetime(2026, 1, 25, 9, 0, 0, tzinfo=timezone.utc)
+        assert zeit.epoch_ms(utc) == zeit.lokal_ms(2026, 1, 25, 10)
+        assert zeit.epoch_ms(utc + timedelta(milliseconds=1)) - zeit.epoch_ms(utc) == 1
+
+    def test_jetzt_ms_is_frozen_like_datetime_now(self):
+        from freezegun import freeze_time
+
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            assert zeit.jetzt_ms() == zeit.epoch_ms(datetime.now())
+
+
+class TestDatumUhrzeit:
+    """Tests for the cached date / hand-parsed time-of-day core of the parsers."""
+
+    @pytest.mark.parametrize("datum,uhrzeit", [
+        ("25.01.26", "12:00:00"), ("29.03.26", "02:30:00"), ("25.10.26", "02:30:00"),
+        ("25.01.2026", "23:59:59"), ("16/01/2026", "00:00:00"), ("01.01.70", "01:00:00"),
+    ])
+    def test_like_strptime_and_localize(self, berlin_tz, datum, uhrzeit):
+        format = {8: "%d.%m.%y", 10: "%d.%m.%Y" if "." in datum else "%d/%m/%Y"}[len(datum)]
+        erwartet = berlin_tz.localize(datetime.strptime(f"{datum} {uhrzeit}", f"{format} %H:%M:%S"))
+        ms = zeit.wand_zu_epoch(zeit.datum_wand_ms(datum) + zeit.uhrzeit_ms(uhrzeit))
+        assert ms == int(erwartet.timestamp() * 1000)
+
+    @pytest.mark.parametrize("datum", ["99.99.99", "31.02.26", "25-01-26", "25.01/26", "2026-01-25"])
+    def test_invalid_dates(self, datum):
+        with pytest.raises(ValueError):
+            zeit.datum_wand_ms(datum)
+
+    @pytest.mark.parametrize("uhrzeit", ["24:00:00", "12:60:00", "12:00:60", "1:00:00", "12.00.00"])
+    def test_invalid_times(self, uhrzeit):
+        with pytest.raises(ValueError):
+            zeit.uhrzeit_ms(uhrzeit)
+
+    def test_date_is_cached(self):
+        zeit.datum_wand_ms("24.12.26")
+        treffer = zeit.datum_wand_ms.cache_info().hits
+        zeit.datum_wand_ms("24.12.26")
+        assert zeit.datum_wand_ms.cache_info().hits == treffer + 1
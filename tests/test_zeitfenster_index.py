@@ -0,0 +1,146 @@
+"""Tests for zeitfenster_index.py - Interval index over send-time windows."""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+import zeit
+from tab_matching import Angriff, TabMatching
+from zeitfenster_index import ZeitfensterIndex, ZeitplanRegel, _expandiere_regeln
+
+
+@pytest.fixture
+def t(berlin_tz):
+    def _t(stunde, minute=0, sekunde=0):
+        return berlin_tz.localize(datetime(2026, 1, 25, stunde, minute, sekunde))
+    return _t
+
+
+class TestZeitfensterIndex:
+    """Tests for ZeitfensterIndex."""
+
+    def test_without_windows_everything_is_allowed(self, t):
+        for liste in (None, []):
+            index = ZeitfensterIndex(liste)
+            assert index.enthaelt(t(3))
+            assert index.naechster_erlaubter(t(3)) == t(3)
+
+    def test_only_invalid_windows_allow_nothing(self, t):
+        """Test that a list of incomplete windows still restricts (like the linear scan)."""
+        index = ZeitfensterIndex([(None, t(12)), (t(14), t(13))])
+        assert len(index) == 0
+        assert not index.enthaelt(t(12))
+        assert index.naechster_erlaubter(t(0)) is None
+
+    def test_merges_overlapping_and_touching_windows(self, t):
+        index = ZeitfensterIndex([(t(14), t(16)), (t(10), t(12)), (t(11), t(13)), (t(13), t(14))])
+        assert len(index) == 1
+        assert index.enthaelt(t(10)) and index.enthaelt(t(16))
+        assert not index.enthaelt(t(16, 0, 1))
+
+    def test_boundaries_are_inclusive(self, t):
+        index = ZeitfensterIndex([(t(10), t(12)), (t(14), t(16))])
+        assert index.enthaelt(t(12))
+        assert not index.enthaelt(t(12, 0, 1))
+        assert index.enthaelt(t(14))
+
+    def test_naechster_erlaubter(self, t):
+        index = ZeitfensterIndex([(t(10), t(12)), (t(14), t(16))])
+        assert index.naechster_erlaubter(t(9)) == t(10)
+        assert index.naechster_erlaubter(t(11)) == t(11)
+        assert index.naechster_erlaubter(t(13)) == t(14)
+        assert index.naechster_erlaubter(t(16, 0, 1)) is None
+
+    def test_matches_linear_scan(self, t):
+        """Test that the index agrees with checking every window one by one."""
+        rng = random.Random(3)
+        basis = t(0)
+        fenster = []
+        for _ in range(40):
+            von = basis + timedelta(minutes=rng.randint(0, 24 * 60))
+            fenster.append((von, von + timedelta(minutes=rng.randint(0, 90))))
+        index = ZeitfensterIndex(fenster)
+
+        for _ in range(500):
+            ts = basis + timedelta(seconds=rng.randint(0, 25 * 3600))
+            assert index.enthaelt(ts) == any(von <= ts <= bis for von, bis in fenster)
+
+
+class TestZeitplanRegel:
+    """Tests for recurring daily/weekly windows."""
+
+    @pytest.mark.parametrize("tage,von,bis", [((), "07:00", "08:00"), ((7,), "07:00", "08:00"),
+                                               ((0,), "7 Uhr", "08:00"), ((0,), "07:00", "24:30")])
+    def test_invalid_rules(self, tage, von, bis):
+        with pytest.raises(ValueError):
+            ZeitplanRegel(tage, von, bis)
+
+    def test_beschreibung(self):
+        assert ZeitplanRegel(tuple(range(7)), "07:00", "23:30").beschreibung() == "täglich 07:00-23:30"
+        assert ZeitplanRegel((0, 1, 2, 3, 4), "18:00", "24:00").beschreibung() == "Mo-Fr 18:00-24:00"
+        assert ZeitplanRegel((5, 6), "10:00", "12:00").beschreibung() == "Sa, So 10:00-12:00"
+
+    def test_dict_roundtrip(self):
+        regel = ZeitplanRegel((0, 4), "22:00", "02:00")
+        assert ZeitplanRegel.aus_dict(regel.als_dict()) == regel
+
+    def test_rules_compile_into_index(self, t):
+        """Test a daily rule and a weekday evening rule over a two-day horizon (25.01.2026 is a Sunday)."""
+        regeln = [ZeitplanRegel(tuple(range(7)), "07:00", "12:00"), ZeitplanRegel((0, 1, 2, 3, 4), "18:00", "24:00")]
+        index = ZeitfensterIndex(regeln=regeln, horizont=(zeit.epoch_ms(t(9)), zeit.epoch_ms(t(9) + timedelta(days=1))))
+
+        assert index.enthaelt(t(7)) and index.enthaelt(t(12))
+        assert not index.enthaelt(t(19))  # Sonntag: keine Abendregel
+        assert index.enthaelt(t(19) + timedelta(days=1))
+        assert index.enthaelt(t(0) + timedelta(days=2))  # 24:00 am Montag
+        assert index.naechster_erlaubter(t(13)) == t(7) + timedelta(days=1)
+
+    def test_window_across_midnight(self, t):
+        index = ZeitfensterIndex(regeln=[ZeitplanRegel((5,), "22:00", "02:00")], horizont=(zeit.epoch_ms(t(0)), zeit.epoch_ms(t(12))))
+        assert index.enthaelt(t(1, 59))  # begann Samstag 22:00
+        assert not index.enthaelt(t(2, 0, 1))
+
+    def test_dst_day(self, berlin_tz):
+        """Test that a rule keeps its wall-clock times on the day clocks go forward."""
+        index = ZeitfensterIndex(
+            regeln=[ZeitplanRegel(tuple(range(7)), "07:00", "23:30")],
+            horizont=(zeit.lokal_ms(2026, 3, 29), zeit.lokal_ms(2026, 3, 29, 12))
+        )
+        assert index.enthaelt(berlin_tz.localize(datetime(2026, 3, 29, 7, 0)))
+        assert not index.enthaelt(berlin_tz.localize(datetime(2026, 3, 29, 6, 59)))
+
+    def test_expansion_is_cached_per_horizon(self, t):
+        regeln = [ZeitplanRegel(tuple(range(7)), "08:00", "09:00")]
+        ZeitfensterIndex(regeln=regeln, horizont=(zeit.epoch_ms(t(9)), zeit.epoch_ms(t(20))))
+        treffer = _expandiere_regeln.cache_info().hits
+        ZeitfensterIndex(regeln=regeln, horizont=(zeit.epoch_ms(t(10)), zeit.epoch_ms(t(22))))
+        assert _expandiere_regeln.cache_info().hits == treffer + 1
+
+    def test_finde_tabs_with_rules(self, sample_doerfer, standard_tabgroessen, t):
+        """Test that rules restrict the send times of finde_tabs."""
+        from freezegun import freeze_time
+
+        attacks = [Angriff(ziel_koord="505|505", ankunftszeit=t(20))]
+        regeln = [ZeitplanRegel(tuple(range(7)), "10:00", "12:00")]
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            nur_regel = TabMatching.finde_tabs(attacks, sample_doerfer, standard_tabgroessen, zeitfenster_regeln=regeln)
+            gesperrt = TabMatching.finde_tabs(
+                attacks, sample_doerfer, standard_tabgroessen, zeitfenster_regeln=[ZeitplanRegel((0,), "11:00", "12:00")]
+            )
+
+        assert len(nur_regel) == 1 and t(10) <= nur_regel[0].abschickzeit <= t(12)
+        assert gesperrt == []
+
+
+class TestReichweiteMitZeitfenster:
+    """Tests that finde_tabs uses the next allowed send time for its reach."""
+
+    def test_windows_in_the_past_give_no_tabs(self, sample_doerfer, standard_tabgroessen, t):
+        from freezegun import freeze_time
+
+        attacks = [Angriff(ziel_koord="505|505", ankunftszeit=t(20))]
+        with freeze_time("2026-01-25 09:00:00", tz_offset=1):
+            matches = TabMatching.finde_tabs(
+                attacks, sample_doerfer, standard_tabgroessen, zeitfenster_liste=[(t(6), t(8))]
+            )
+        assert matches == []
@@ -0,0 +1,81 @@
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+from einheiten import UnitRegistry
+
+# Feste Spaltenreihenfolge des Ledgers = dichter Index der UnitRegistry (für alle Welten gleich)
+EINHEITEN: List[str] = UnitRegistry.standard().namen
+EINHEIT_INDEX: Dict[str, int] = {e.name: e.index for e in UnitRegistry.standard()}
+
+
+class TruppenLedger:
+    """
+    Kompakter Truppenbestand aller eigenen Dörfer: eine int32-Matrix Dörfer x Einheiten
+    (zeilenweise in einem array('i')). Ersetzt die deepcopy der EigenesDorf-Objekte im
+    Matching - die Dörfer des Aufrufers werden nie verändert.
+    """
+
+    def __init__(self, doerfer: Iterable = ()):
+        self.breite = len(EINHEITEN)
+        self.daten = array("i")
+
+        for dorf in doerfer:
+            zeile = [0] * self.breite
+            for name, menge in dorf.truppen.items():
+                idx = EINHEIT_INDEX.get(name)
+                if idx is not None:
+                    zeile[idx] = menge
+            self.daten.extend(zeile)
+
+    def __len__(self) -> int:
+        return len(self.daten) // self.breite
+
+    @staticmethod
+    def bedarf(einheiten: Dict[str, int]) -> Tuple[Tuple[int, int], ...]:
+        """Einheiten-Dict (deutsche Namen) -> ((Spalte, Menge), ...) für die schnellen Methoden."""
+        return tuple((EINHEIT_INDEX[name], menge) for name, menge in einheiten.items())
+
+    def bestand(self, dorf_idx: int, einheit_idx: int) -> int:
+        return self.daten[dorf_idx * self.breite + einheit_idx]
+
+    def zeile(self, dorf_idx: int) -> Dict[str, int]:
+        basis = dorf_idx * self.breite
+        return dict(zip(EINHEITEN, self.daten[basis:basis + self.breite]))
+
+    def reicht(self, dorf_idx: int, bedarf: Tuple[Tuple[int, int], ...]) -> bool:
+        basis = dorf_idx * self.breite
+        daten = self.daten
+        for idx, menge in bedarf:
+            if daten[basis + idx] < menge:
+                return False
+        return True
+
+    def abbuchen(self, dorf_idx: int, bedarf: Tuple[Tuple[int, int], ...]):
+        basis = dorf_idx * self.breite
+        for idx, menge in bedarf:
+            self.daten[basis + idx] -= menge
+
+    def gutschreiben(self, dorf_idx: int, bedarf: Tuple[Tuple[int, int], ...]):
+        basis = dorf_idx * self.breite
+        for idx, menge in bedarf:
+            self.daten[basis + idx] += menge
+
+    def setze_dorf(self, dorf_idx: int, truppen: Dict[str, int]):
+        """Überschreibt den Bestand eines Dorfes (z.B. nach geänderter Truppenübersicht)."""
+        basis = dorf_idx * self.breite
+        for idx, name in enumerate(EINHEITEN):
+            self.daten[basis + idx] = truppen.get(name, 0)
+
+    def anhaengen(self, truppen: Dict[str, int]) -> int:
+        """Neues Dorf als letzte Zeile, gibt dessen Index zurück."""
+        self.daten.extend([0] * self.breite)
+        dorf_idx = len(self) - 1
+        self.setze_dorf(dorf_idx, truppen)
+        return dorf_idx
+
+    def snapshot(self) -> array:
+        """Kopie des kompletten Bestands (ein memcpy) für späteres rollback()."""
+        return array("i", self.daten)
+
+    def rollback(self, snapshot: array):
+        self.daten[:] = snapshot
@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass, field
+from typing import Dict
+
+import requests
+
+import dorf_daten
+import netz
+
+
+@dataclass
+class WeltEinstellungen:
+    welt_speed: float = 1.0
+    einheiten_speed: float = 1.0
+    # Spielinterner Einheitenname (spear, sword, ...) -> Minuten pro Feld auf dieser Welt (get_unit_info)
+    minuten_pro_feld: Dict[str, float] = field(default_factory=dict)
+    bogenschuetzen: bool = False
+    paladin: bool = False
+
+
+# Welt -> Einstellungen; sie ändern sich während einer Welt nicht
+_memo: Dict[str, WeltEinstellungen] = {}
+_lock = threading.Lock()
+
+
+class WeltEinstellungenSpeicher:
+    """
+    Welteinstellungen pro Welt: einmal aus den XML-Schnittstellen interface.php?func=get_config und
+    get_unit_info geladen, unter <Cache>/de<welt>/einstellungen.json abgelegt und danach ohne
+    Netzzugriff wiederverwendet.
+    """
+
+    VERSION = 1  # bei geändertem Dateiformat erhöhen, alte Dateien werden dann neu geladen
+
+    @staticmethod
+    def url(welt_id: str, funktion: str) -> str:
+        return f"https://de{welt_id}.die-staemme.de/interface.php?func={funktion}"
+
+    @staticmethod
+    def _pfad(welt_id: str) -> str:
+        return os.path.join(dorf_daten.CACHE_VERZEICHNIS, f"de{welt_id}", "einstellungen.json")
+
+    @staticmethod
+    def laden(welt_id: str) -> WeltEinstellungen:
+        with _lock:
+            einstellungen = _memo.get(welt_id)
+        if einstellungen is not None:
+            return einstellungen
+
+        pfad = WeltEinstellungenSpeicher._pfad(welt_id)
+        einstellungen = WeltEinstellungenSpeicher._lies(pfad)
+        if einstellungen is None:
+            einstellungen = WeltEinstellungenSpeicher._herunterladen(welt_id)
+            WeltEinstellungenSpeicher._schreibe(pfad, einstellungen)
+
+        with _lock:
+            _memo[welt_id] = einstellungen
+        return einstellungen
+
+    @staticmethod
+    def _herunterladen(welt_id: str) -> WeltEinstellungen:
+        config = WeltEinstellungenSpeicher._xml(welt_id, "get_config")
+        unit_info = WeltEinstellungenSpeicher._xml(welt_id, "get_unit_info")
+        try:
+            einstellungen = WeltEinstellungen(
+                welt_speed=float(config.findtext("speed")),
+                einheiten_speed=float(config.findtext("unit_speed")),
+                minuten_pro_feld={einheit.tag: float(einheit.findtext("speed")) for einheit in unit_info},
+                bogenschuetzen=config.findtext("game/archer", "0").strip() != "0",
+                paladin=config.findtext("game/knight", "0").strip() != "0",
+            )
+        except (TypeError, ValueError) as e:
+            raise RuntimeError(f"Welteinstellungen von de{welt_id} unvollständig: {e}") from e
+        print(
+            f"[INFO] Welteinstellungen de{welt_id}: Weltgeschwindigkeit {einstellungen.welt_speed}, "
+            f"Einheitengeschwindigkeit {einstellungen.einheiten_speed}"
+        )
+        return einstellungen
+
+    @staticmethod
+    def _xml(welt_id: str, funktion: str) -> ET.Element:
+        url = WeltEinstellungenSpeicher.url(welt_id, funktion)
+        try:
+            response = netz.get(url)
+        except requests.RequestException as e:
+            raise RuntimeError(f"Download der Welteinstellungen fehlgeschlagen ({e}, URL: {url})") from e
+        if response.status_code != 200:
+            raise RuntimeError(f"Download der Welteinstellungen fehlgeschlagen (Status: {response.status_code}, URL: {url})")
+        try:
+            return ET.fromstring(response.content)
+        except ET.ParseError as e:
+            raise RuntimeError(f"Welteinstellungen nicht lesbar ({e}, URL: {url})") from e
+
+    @staticmethod
+    def _lies(pfad: str) -> WeltEinstellungen | None:
+        try:
+            with open(pfad, "r", encoding="utf-8") as f:
+                daten = json.load(f)
+            if daten.pop("version", None) != WeltEinstellungenSpeicher.VERSION:
+                return None
+            return WeltEinstellungen(**daten)
+        except (OSError, ValueError, TypeError, AttributeError):
+            return None
+
+    @staticmethod
+    def _schreibe(pfad: str, einstellungen: WeltEinstellungen):
+        try:
+            os.makedirs(os.path.dirname(pfad), exist_ok=True)
+            tmp = pfad + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": WeltEinstellungenSpeicher.VERSION, **asdict(einstellungen)}, f, indent=2)
+            os.replace(tmp, pfad)
+        except OSError as e:
+            print(f"[WARNUNG] Welteinstellungen konnten nicht gespeichert werden: {e}")
+
+    @staticmethod
+    def vergessen():
+        """Vergisst die im Prozess gemerkten Einstellungen (der Plattencache bleibt)."""
+        with _lock:
+            _memo.clear()
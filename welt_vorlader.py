@@ -0,0 +1,61 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Tuple
+
+import dorf_daten
+from dorf_daten import DorfDaten
+from welt_einstellungen import WeltEinstellungenSpeicher
+
+
+class WeltVorlader:
+    """
+    Lädt Welteinstellungen und Koordinaten-Index einer Welt in Hintergrund-Threads vor, sobald die
+    Welt-ID bekannt ist. Berechnung und Export warten über wenn_fertig() auf die Futures, ohne die
+    Tk-Schleife zu blockieren. Pro Welt läuft jeder Ladevorgang nur einmal; fehlgeschlagene werden
+    beim nächsten starten() wiederholt, der Koordinaten-Index nach Ablauf der Cache-TTL erneuert.
+    """
+
+    def __init__(self, threads: int = 2):
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="welt-vorladen")
+        # Welt -> Name -> (Startzeit [s], Future)
+        self._auftraege: Dict[str, Dict[str, Tuple[float, Future]]] = {}
+        self._lock = threading.Lock()
+
+    def starten(self, welt_id: str) -> Dict[str, Future]:
+        """Startet die noch nicht laufenden Ladevorgänge. Rückgabe: Name -> Future."""
+        ladevorgaenge = {
+            # Welteinstellungen ändern sich während einer Welt nicht
+            "einstellungen": (WeltEinstellungenSpeicher.laden, None),
+            "koord_index": (DorfDaten.koord_index, dorf_daten.TTL_SEKUNDEN),
+        }
+        jetzt = time.time()
+        with self._lock:
+            auftraege = self._auftraege.setdefault(welt_id, {})
+            for name, (laden, ttl) in ladevorgaenge.items():
+                gestartet, future = auftraege.get(name, (0.0, None))
+                if future is None or WeltVorlader._fehlgeschlagen(future) or (
+                    ttl is not None and future.done() and jetzt - gestartet >= ttl
+                ):
+                    auftraege[name] = (jetzt, self._pool.submit(laden, welt_id))
+            return {name: future for name, (_, future) in auftraege.items()}
+
+    @staticmethod
+    def _fehlgeschlagen(future: Future) -> bool:
+        return future.done() and (future.cancelled() or future.exception() is not None)
+
+    def beenden(self):
+        """Verwirft noch nicht begonnene Ladevorgänge (laufende enden über die netz-Timeouts)."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def wenn_fertig(after: Callable, futures: Iterable[Future], weiter: Callable, intervall_ms: int = 50):
+    """
+    Ruft weiter() auf, sobald alle futures fertig sind. Bis dahin wird per after(ms, funktion)
+    (z. B. tk.Tk.after) erneut nachgesehen, statt in der Tk-Schleife auf result() zu warten.
+    """
+    futures = list(futures)
+    if all(future.done() for future in futures):
+        weiter()
+    else:
+        after(intervall_ms, lambda: wenn_fertig(after, futures, weiter, intervall_ms))
@@ -0,0 +1,19 @@
+import mmap
+from typing import Iterator
+
+
+def iter_zeilen(quelle, encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Zeilen (ohne Zeilenende) aus einem str, einer Text-/Binärdatei, einem mmap oder einem
+    beliebigen Iterable von Zeilen - ohne den gesamten Inhalt als einen String zu kopieren.
+    Bytes werden mit encoding dekodiert (ungültige Zeichen ersetzt).
+    """
+    if isinstance(quelle, str):
+        yield from quelle.splitlines()
+        return
+
+    zeilen = iter(quelle.readline, b"") if isinstance(quelle, mmap.mmap) else quelle
+    for zeile in zeilen:
+        if isinstance(zeile, bytes):
+            zeile = zeile.decode(encoding, errors="replace")
+        yield zeile.rstrip("\r\n")
@@ -0,0 +1,112 @@
+"""
+Interne Zeitdarstellung: int Epoch-Millisekunden (UTC). Matcher, Parser und Support-Filter
+rechnen nur mit ints; Berlin-Datetimes entstehen erst an der Grenze zu GUI und Export.
+Sommerzeit nach EU-Regel (seit 1996): letzter Sonntag im März bzw. Oktober, jeweils 01:00 UTC.
+"""
+import time
+from bisect import bisect_right
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+import pytz
+
+BERLIN = pytz.timezone("Europe/Berlin")
+# Die beiden tzinfo-Instanzen, die BERLIN.localize liefert (MEZ +1h / MESZ +2h)
+_MEZ = BERLIN.localize(datetime(2001, 1, 1)).tzinfo
+_MESZ = BERLIN.localize(datetime(2001, 7, 1)).tzinfo
+
+STUNDE_MS = 3_600_000
+TAG_MS = 24 * STUNDE_MS
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_TAG = date(1970, 1, 1).toordinal()
+
+
+def _letzter_sonntag(jahr: int, monat: int) -> int:
+    """Tag (Ordinal seit 1970-01-01) des letzten Sonntags eines Monats mit 31 Tagen."""
+    letzter = date(jahr, monat, 31)
+    return letzter.toordinal() - (letzter.weekday() + 1) % 7 - _EPOCH_TAG
+
+
+def _sommerzeit(jahr: int):
+    """(Beginn, Ende) der Sommerzeit eines Jahres in Epoch-ms UTC."""
+    return (
+        _letzter_sonntag(jahr, 3) * TAG_MS + STUNDE_MS,
+        _letzter_sonntag(jahr, 10) * TAG_MS + STUNDE_MS
+    )
+
+
+# Umstellungstabelle [Beginn 1970, Ende 1970, Beginn 1971, ...]: ungerade Position nach bisect = Sommerzeit
+_UMSTELLUNGEN = [grenze for jahr in range(1970, 2200) for grenze in _sommerzeit(jahr)]
+# Dieselbe Tabelle in Wanduhrzeit: Sommerzeit ab 03:00 MESZ (= Beginn + 2h) bis vor 02:00 MEZ (= Ende + 1h).
+# Doppelte bzw. übersprungene Stunden gelten dadurch wie bei BERLIN.localize (is_dst=False) als Winterzeit.
+_UMSTELLUNGEN_WAND = [grenze + (2 * STUNDE_MS if i % 2 == 0 else STUNDE_MS) for i, grenze in enumerate(_UMSTELLUNGEN)]
+
+
+def ist_sommerzeit(ms: int) -> bool:
+    return bisect_right(_UMSTELLUNGEN, ms) % 2 == 1
+
+
+def _ist_sommerzeit_wand(wand: int) -> bool:
+    return bisect_right(_UMSTELLUNGEN_WAND, wand) % 2 == 1
+
+
+def wand_zu_epoch(wand: int) -> int:
+    """Berliner Wanduhrzeit (ms seit 1970-01-01 00:00, ohne Zeitzone) -> Epoch-ms."""
+    return wand - (2 * STUNDE_MS if _ist_sommerzeit_wand(wand) else STUNDE_MS)
+
+
+def _wand_ms(jahr: int, monat: int, tag: int, stunde: int, minute: int, sekunde: int, milli: int) -> int:
+    return (date(jahr, monat, tag).toordinal() - _EPOCH_TAG) * TAG_MS + ((stunde * 60 + minute) * 60 + sekunde) * 1000 + milli
+
+
+def lokal_ms(jahr: int, monat: int, tag: int, stunde: int = 0, minute: int = 0, sekunde: int = 0, milli: int = 0) -> int:
+    """Berliner Wanduhrzeit -> Epoch-ms."""
+    return wand_zu_epoch(_wand_ms(jahr, monat, tag, stunde, minute, sekunde, milli))
+
+
+@lru_cache(maxsize=4096)
+def datum_wand_ms(datum: str) -> int:
+    """
+    'TT.MM.JJ', 'TT.MM.JJJJ' oder 'TT/MM/JJJJ' -> Wanduhrzeit von Mitternacht in ms, gecacht pro
+    Datums-String (große SOS-Listen wiederholen dasselbe Datum tausendfach). ValueError bei ungültigem Datum.
+    """
+    if len(datum) not in (8, 10) or datum[2] != datum[5] or datum[2] not in "./":
+        raise ValueError(f"Ungültiges Datum '{datum}'")
+    tag, monat, jahr = int(datum[:2]), int(datum[3:5]), int(datum[6:])
+    if len(datum) == 8:
+        # wie strptime %y: 69-99 -> 19xx, 00-68 -> 20xx
+        jahr += 1900 if jahr >= 69 else 2000
+    return (date(jahr, monat, tag).toordinal() - _EPOCH_TAG) * TAG_MS
+
+
+def uhrzeit_ms(uhrzeit: str) -> int:
+    """'HH:MM:SS' -> ms seit Mitternacht. ValueError bei ungültiger Uhrzeit."""
+    if len(uhrzeit) != 8 or uhrzeit[2] != ":" or uhrzeit[5] != ":":
+        raise ValueError(f"Ungültige Uhrzeit '{uhrzeit}'")
+    stunde, minute, sekunde = int(uhrzeit[:2]), int(uhrzeit[3:5]), int(uhrzeit[6:])
+    if stunde > 23 or minute > 59 or sekunde > 59:
+        raise ValueError(f"Ungültige Uhrzeit '{uhrzeit}'")
+    return ((stunde * 60 + minute) * 60 + sekunde) * 1000
+
+
+def epoch_ms(dt: datetime) -> int:
+    """datetime -> Epoch-ms; naive Zeitpunkte gelten als Berliner Wanduhrzeit."""
+    if dt.tzinfo is None:
+        return lokal_ms(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.microsecond // 1000)
+    return (dt - _EPOCH) // timedelta(milliseconds=1)
+
+
+def als_berlin(ms: int) -> datetime:
+    """Epoch-ms -> tz-aware Berliner datetime (gleiche tzinfo wie BERLIN.localize)."""
+    tz, versatz = (_MESZ, 2 * STUNDE_MS) if ist_sommerzeit(ms) else (_MEZ, STUNDE_MS)
+    return (datetime(1970, 1, 1) + timedelta(milliseconds=ms + versatz)).replace(tzinfo=tz)
+
+
+def berlin(dt: datetime) -> datetime:
+    """Naive Berliner Wanduhrzeit mit der passenden tzinfo versehen (wie BERLIN.localize, ohne pytz-Suche)."""
+    sommer = _ist_sommerzeit_wand(_wand_ms(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, 0))
+    return dt.replace(tzinfo=_MESZ if sommer else _MEZ)
+
+
+def jetzt_ms() -> int:
+    return int(time.time() * 1000)
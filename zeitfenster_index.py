@@ -0,0 +1,143 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+import zeit
+
+WOCHENTAGE = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
+
+
+@dataclass(frozen=True)
+class ZeitplanRegel:
+    """
+    Wiederkehrendes Sende-Fenster, z.B. täglich 07:00-23:30 oder Mo-Fr 18:00-24:00.
+    wochentage: 0 = Montag ... 6 = Sonntag. Ist bis <= von, läuft das Fenster über Mitternacht.
+    """
+    wochentage: Tuple[int, ...]
+    von: str
+    bis: str
+
+    def __post_init__(self):
+        if not self.wochentage or any(tag not in range(7) for tag in self.wochentage):
+            raise ValueError(f"Ungültige Wochentage: {self.wochentage}")
+        ZeitplanRegel.minuten(self.von)
+        ZeitplanRegel.minuten(self.bis)
+
+    @staticmethod
+    def minuten(uhrzeit: str) -> int:
+        """'HH:MM' -> Minuten seit Mitternacht, '24:00' ist als Ende erlaubt."""
+        try:
+            stunde, minute = (int(teil) for teil in uhrzeit.strip().split(":"))
+        except ValueError:
+            raise ValueError(f"Ungültige Uhrzeit '{uhrzeit}', erwartet HH:MM")
+        if not (0 <= stunde <= 24 and 0 <= minute < 60) or (stunde == 24 and minute):
+            raise ValueError(f"Ungültige Uhrzeit '{uhrzeit}', erwartet HH:MM")
+        return stunde * 60 + minute
+
+    def beschreibung(self) -> str:
+        tage = sorted(set(self.wochentage))
+        if len(tage) == 7:
+            text = "täglich"
+        elif tage == list(range(tage[0], tage[-1] + 1)) and len(tage) > 2:
+            text = f"{WOCHENTAGE[tage[0]]}-{WOCHENTAGE[tage[-1]]}"
+        else:
+            text = ", ".join(WOCHENTAGE[tag] for tag in tage)
+        return f"{text} {self.von}-{self.bis}"
+
+    def als_dict(self) -> dict:
+        return {"wochentage": list(self.wochentage), "von": self.von, "bis": self.bis}
+
+    @staticmethod
+    def aus_dict(daten: dict) -> "ZeitplanRegel":
+        return ZeitplanRegel(tuple(daten["wochentage"]), daten["von"], daten["bis"])
+
+    def fenster(self, tag: date) -> Tuple[int, int] | None:
+        """Fenster dieser Regel, das an tag beginnt (Berliner Zeit), als Epoch-ms oder None."""
+        if tag.weekday() not in self.wochentage:
+            return None
+        von, bis = ZeitplanRegel.minuten(self.von), ZeitplanRegel.minuten(self.bis)
+        if bis <= von:
+            bis += 24 * 60
+        # Stunden über 24 in den Folgetag tragen, damit die Sommerzeit des Endzeitpunkts gilt
+        ende = tag + timedelta(days=bis // (24 * 60))
+        return (
+            zeit.lokal_ms(tag.year, tag.month, tag.day, von // 60, von % 60),
+            zeit.lokal_ms(ende.year, ende.month, ende.day, bis % (24 * 60) // 60, bis % 60)
+        )
+
+
+@lru_cache(maxsize=32)
+def _expandiere_regeln(regeln: Tuple[ZeitplanRegel, ...], erster_tag: date, letzter_tag: date) -> Tuple[Tuple[int, int], ...]:
+    """Alle Fenster der Regeln, die zwischen erster_tag und letzter_tag beginnen, als Epoch-ms-Paare (gecacht pro Horizont)."""
+    fenster = []
+    tag = erster_tag
+    while tag <= letzter_tag:
+        for regel in regeln:
+            f = regel.fenster(tag)
+            if f:
+                fenster.append(f)
+        tag += timedelta(days=1)
+    return tuple(fenster)
+
+
+class ZeitfensterIndex:
+    """
+    Sende-Zeitfenster einmal pro Berechnung normalisiert: Fenster ohne Von/Bis verworfen,
+    nach Beginn sortiert, überlappende oder aneinanderstoßende Fenster zusammengelegt und in
+    Epoch-ms umgerechnet. Abfragen per bisect in O(log w) statt linearer Suche.
+    Grenzen inklusiv (von <= ts <= bis), ohne übergebene Fenster gibt es keine Einschränkung.
+    Wiederkehrende Regeln werden für den Horizont (von, bis; Epoch-ms) in Fenster expandiert
+    und mit den absoluten Fenstern vereinigt.
+    """
+
+    def __init__(self, zeitfenster_liste=None, regeln: Iterable[ZeitplanRegel] = (), horizont=None):
+        regeln = tuple(regeln)
+        self.unbeschraenkt = not zeitfenster_liste and not regeln
+        self.von: List[int] = []
+        self.bis: List[int] = []
+
+        fenster = [
+            (zeit.epoch_ms(von), zeit.epoch_ms(bis))
+            for von, bis in (zeitfenster_liste or [])
+            if von is not None and bis is not None and von <= bis
+        ]
+        if regeln and horizont:
+            # Ganze Tage, damit der Cache bei wiederholten Berechnungen am selben Tag greift;
+            # ein Tag Vorlauf für Fenster, die vor Mitternacht beginnen
+            start, ende = horizont
+            erster_tag = zeit.als_berlin(start).date() - timedelta(days=1)
+            fenster.extend(_expandiere_regeln(regeln, erster_tag, zeit.als_berlin(ende).date()))
+        fenster.sort()
+
+        for von, bis in fenster:
+            if self.bis and von <= self.bis[-1]:
+                self.bis[-1] = max(self.bis[-1], bis)
+            else:
+                self.von.append(von)
+                self.bis.append(bis)
+
+    def __len__(self) -> int:
+        return len(self.von)
+
+    def enthaelt_ms(self, t: int) -> bool:
+        if self.unbeschraenkt:
+            return True
+        i = bisect_right(self.von, t) - 1
+        return i >= 0 and t <= self.bis[i]
+
+    def enthaelt(self, ts: datetime) -> bool:
+        """True, wenn ts in mindestens einem Fenster liegt."""
+        return self.enthaelt_ms(zeit.epoch_ms(ts))
+
+    def naechster_erlaubter_ms(self, t: int) -> int | None:
+        """Frühester erlaubter Sendezeitpunkt >= t (t selbst, Beginn des nächsten Fensters oder None)."""
+        if self.enthaelt_ms(t):
+            return t
+        i = bisect_right(self.von, t)
+        return self.von[i] if i < len(self.von) else None
+
+    def naechster_erlaubter(self, ts: datetime) -> datetime | None:
+        naechster = self.naechster_erlaubter_ms(zeit.epoch_ms(ts))
+        return None if naechster is None else zeit.als_berlin(naechster)